@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Cloud commands for the smart air vent
+A PubNub subscribe listener runs on the SDK's own thread and only appends
+incoming messages to a CommandMailbox (a deque, so posting never takes a
+lock the control loop could be waiting on). The control loop drains the
+mailbox once per tick, applies the commands to its VentController and
+records command-to-actuation latency.
+
+Command messages (JSON objects on the control channel):
+  {"type": "override", "angle": 0-180, "duration": seconds (optional)}
+  {"type": "clear_override"}
+  {"type": "thresholds", "temp_high": 27, "humidity_high": 75, ...}
+  Any command may carry "id" (echoed in the log) and "sent" (sender epoch
+  time, used to report cloud transit time).
+'''
+
+import collections
+import math
+import queue
+import time
+
+from vent_control import RULES
+
+MAILBOX_SIZE = 32      # Oldest commands are dropped if the loop falls this far behind
+LATENCY_WINDOW = 100   # Latency statistics cover the most recent commands
+
+# ===== MAILBOX =====
+class CommandMailbox:
+    '''Single-consumer mailbox; post() is safe from any thread and never blocks'''
+
+    def __init__(self, size=MAILBOX_SIZE):
+        self.queue = collections.deque(maxlen=size)
+        self.posted = 0
+
+    def post(self, message):
+        # deque.append is atomic, so the listener thread needs no lock
+        self.queue.append((time.monotonic(), time.time(), message))
+        self.posted += 1
+
+    def drain(self):
+        '''Return every waiting (received_monotonic, received_epoch, message)'''
+        items = []
+        while True:
+            try:
+                items.append(self.queue.popleft())
+            except IndexError:
+                return items
+
+class ProcessMailbox:
+    '''Mailbox whose post() side can run in another process (multiprocessing queue)
+
+    Same post()/drain() interface as CommandMailbox. Timestamps use the
+    system-wide monotonic clock, so queued latency still adds up across
+    processes. Commands are dropped when the queue is full.
+    '''
+
+    def __init__(self, queue):
+        self.queue = queue
+        self.posted = 0
+        self.dropped = 0
+
+    def post(self, message):
+        try:
+            self.queue.put_nowait((time.monotonic(), time.time(), message))
+            self.posted += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def drain(self):
+        items = []
+        while True:
+            try:
+                items.append(self.queue.get_nowait())
+            except queue.Empty:
+                return items
+
+# ===== COMMANDS =====
+THRESHOLD_NAMES = tuple(RULES.thresholds)  # Thresholds declared in vent_rules.json
+
+def _is_number(value):
+    return not isinstance(value, bool) and isinstance(value, (int, float)) and math.isfinite(value)
+
+def parse_command(message):
+    '''Validate a command message, raise ValueError if it is malformed'''
+    if not isinstance(message, dict):
+        raise ValueError("command must be a JSON object")
+    kind = message.get("type")
+    if kind == "override":
+        angle = message.get("angle")
+        if not _is_number(angle) or not 0 <= angle <= 180:
+            raise ValueError("override angle must be 0-180")
+        duration = message.get("duration")
+        if duration is not None and (not _is_number(duration) or duration <= 0):
+            raise ValueError("override duration must be a positive number")
+        return {"type": kind, "angle": int(angle), "duration": duration}
+    if kind == "clear_override":
+        return {"type": kind}
+    if kind == "thresholds":
+        thresholds = {name: message[name] for name in THRESHOLD_NAMES if name in message}
+        if not thresholds:
+            raise ValueError("no thresholds given")
+        for name, value in thresholds.items():
+            if not _is_number(value):
+                raise ValueError(f"{name} must be a number")
+        # The order of temp_low/temp_high is checked against the controller's
+        # current values when the command is applied (VentController.set_thresholds)
+        return {"type": kind, "thresholds": thresholds}
+    raise ValueError(f"unknown command type: {kind}")
+
+def apply_command(controller, command, current_time):
+    '''Apply a parsed command to a VentController; return True if the vent moved'''
+    if command["type"] == "override":
+        return controller.set_override(command["angle"], current_time, command["duration"])
+    if command["type"] == "clear_override":
+        controller.clear_override()
+        return False
+    controller.set_thresholds(**command["thresholds"])
+    return False
+
+# ===== LATENCY =====
+class LatencyStats:
+    '''Rolling command latency statistics (seconds)'''
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.samples = {
+            "transit": collections.deque(maxlen=window),    # sender -> listener (needs synced clocks)
+            "queued": collections.deque(maxlen=window),     # listener -> picked up by the loop
+            "actuation": collections.deque(maxlen=window),  # listener -> vent finished moving
+        }
+
+    def add(self, kind, seconds):
+        self.samples[kind].append(seconds)
+
+    def summary(self):
+        summary = {}
+        for kind, samples in self.samples.items():
+            if samples:
+                ordered = sorted(samples)
+                summary[kind] = {
+                    "count": len(ordered),
+                    "mean_ms": round(sum(ordered) / len(ordered) * 1000, 1),
+                    "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+                    "max_ms": round(ordered[-1] * 1000, 1),
+                }
+        return summary
+
+def process_commands(mailbox, controller, latency, current_time, log=print):
+    '''Drain the mailbox and apply every command; called once per loop tick'''
+    for received, received_epoch, message in mailbox.drain():
+        picked_up = time.monotonic()
+        latency.add("queued", picked_up - received)
+        if isinstance(message, dict) and isinstance(message.get("sent"), (int, float)):
+            latency.add("transit", max(0.0, received_epoch - message["sent"]))
+        try:
+            command = parse_command(message)
+            moved = apply_command(controller, command, current_time)
+        except ValueError as e:
+            if log:
+                log(f"[Command] Rejected {message!r}: {e}")
+            continue
+        if moved:
+            latency.add("actuation", time.monotonic() - received)
+        if log:
+            command_id = message.get("id", "-")
+            log(f"[Command] {command['type']} ({command_id}) applied in "
+                f"{(time.monotonic() - received) * 1000:.0f}ms")
+
+# ===== PUBNUB LISTENER =====
+def start_listener(pubnub, channel, mailbox):
+    '''Subscribe to the control channel; messages go straight into the mailbox'''
+    from pubnub.callbacks import SubscribeCallback
+
+    class MailboxListener(SubscribeCallback):
+        def message(self, pubnub, event):
+            mailbox.post(event.message)
+
+        def status(self, pubnub, status):
+            pass
+
+        def presence(self, pubnub, presence):
+            pass
+
+    listener = MailboxListener()
+    pubnub.add_listener(listener)
+    pubnub.subscribe().channels(channel).execute()
+    return listener
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Hot reload of controller settings from a JSON file
+A ConfigReloader watches one file of {"SETTING": value} pairs. It re-reads
+the file when SIGHUP arrives or when the file's modification time or size
+changes. The whole file is validated before anything is applied, so a
+typo leaves the running configuration untouched. poll() returns only the
+settings whose values changed, grouped by subsystem, so the caller can
+swap just those subsystems. Settings in the RESTART group are applied
+only at startup; changing them later is reported but needs a restart.
+
+poll() is meant to be called from the control loop itself (a scheduler
+task). The SIGHUP handler only sets a flag, so changes are never applied
+halfway through a sensor read or a vent move.
+'''
+
+import json
+import logging
+import math
+import os
+import signal
+
+RESTART = "restart"  # Subsystem name for settings that are only read at startup
+
+# ===== VALIDATORS =====
+# Each takes the JSON value and returns the value to use, or raises ValueError
+
+def positive_number(value):
+    if (isinstance(value, bool) or not isinstance(value, (int, float))
+            or not math.isfinite(value) or value <= 0):
+        raise ValueError("must be a positive number")
+    return float(value)
+
+def boolean(value):
+    if not isinstance(value, bool):
+        raise ValueError("must be true or false")
+    return value
+
+def gpio_pin(value):
+    if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value <= 27:
+        raise ValueError("must be a BCM GPIO number 0-27")
+    return value
+
+def log_level(value):
+    '''A level name such as "DEBUG", or a numeric level'''
+    if isinstance(value, bool) or not isinstance(value, (str, int)):
+        raise ValueError(f"log level must be a name or a number, not {value!r}")
+    if isinstance(value, int):
+        if value < 0:
+            raise ValueError(f"log level must not be negative, not {value}")
+    elif not isinstance(logging.getLevelName(value), int):
+        raise ValueError(f"unknown log level {value!r}")
+    return value
+
+def log_levels(value):
+    if not isinstance(value, dict):
+        raise ValueError("must be an object of subsystem: level")
+    return {subsystem: log_level(level) for subsystem, level in value.items()}
+
+def address(value):
+    '''("host", port) from a JSON ["host", port] pair, or None'''
+    if value is None:
+        return None
+    if (not isinstance(value, list) or len(value) != 2 or not isinstance(value[0], str)
+            or not isinstance(value[1], int)):
+        raise ValueError('must be ["host", port] or null')
+    return (value[0], value[1])
+
+def choice(*options):
+    def validate(value):
+        if value not in options:
+            raise ValueError(f"must be one of {', '.join(map(repr, options))}")
+        return value
+    return validate
+
+def numbers(*names):
+    '''Object mapping some of `names` to numbers, e.g. thresholds'''
+    def validate(value):
+        if not isinstance(value, dict) or set(value) - set(names):
+            raise ValueError(f"must be an object with keys from {', '.join(names)}")
+        for name, number in value.items():
+            if isinstance(number, bool) or not isinstance(number, (int, float)):
+                raise ValueError(f"{name} must be a number")
+        return dict(value)
+    return validate
+
+def optional_text(value):
+    if value is not None and not isinstance(value, str):
+        raise ValueError("must be a string or null")
+    return value
+
+def optional_object(value):
+    if value is not None and not isinstance(value, dict):
+        raise ValueError("must be an object or null")
+    return value
+
+def built_by(factory):
+    '''Object or null that factory(value) accepts, e.g. a filter configuration
+
+    The object is built once while validating, so a value the subsystem
+    would reject never gets applied.
+    '''
+    def validate(value):
+        if optional_object(value):
+            try:
+                factory(value)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"is invalid: {e}")
+        return value
+    return validate
+
+# ===== RELOADER =====
+class ConfigReloader:
+    '''Re-read a settings file on SIGHUP or change and report what changed'''
+
+    def __init__(self, path, settings, current, log=None):
+        # settings: {name: (validator, subsystem)} for every setting the file may hold
+        # current: {name: value} of the settings as they are running now
+        # log: logger used for ignored/invalid settings, None to stay silent
+        self.path = path
+        self.settings = settings
+        self.current = dict(current)
+        self.log = log
+        self.requested = False
+        self.signature = None  # (mtime, size) of the file when last read
+        self.reloads = 0
+
+    def install_signal_handler(self):
+        '''Reload on SIGHUP (must be called from the main thread)'''
+        signal.signal(signal.SIGHUP, lambda signum, frame: self.request())
+
+    def request(self):
+        self.requested = True
+
+    def _changed_on_disk(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self.signature:
+            return False
+        self.signature = signature
+        return True
+
+    def load(self):
+        '''Read and validate the whole file; raise ValueError if anything is wrong'''
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"cannot read {self.path}: {e}")
+        if not isinstance(data, dict):
+            raise ValueError(f"{self.path} must hold a JSON object")
+        values = {}
+        for name, value in data.items():
+            if name not in self.settings:
+                if self.log:
+                    self.log.warning("Ignoring unknown setting %s", name)
+                continue
+            validate, _ = self.settings[name]
+            try:
+                values[name] = validate(value)
+            except ValueError as e:
+                raise ValueError(f"{name} {e}")
+        return values
+
+    def poll(self):
+        '''Return {subsystem: {name: value}} of changed settings, or {} if nothing changed'''
+        changed_on_disk = self._changed_on_disk()
+        if not (self.requested or changed_on_disk):
+            return {}
+        self.requested = False
+        try:
+            values = self.load()
+        except ValueError as e:
+            if self.log:
+                self.log.error("Configuration not reloaded: %s", e)
+            return {}
+        changes = {}
+        for name, value in values.items():
+            if self.current.get(name) != value:
+                changes.setdefault(self.settings[name][1], {})[name] = value
+        self.current.update(values)
+        self.reloads += 1
+        return changes
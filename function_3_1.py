@@ -1,299 +1,889 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-
-'''
-Raspberry Pi Integrated Sensor System with PubNub Integration
-Combines the following functions:
-1. Temperature/humidity sensor (DHT11) reading and display on LCD 1602A
-2. PIR motion detection
-3. Servo motor control for air vent
-4. MQ-2 gas/smoke sensor detection
-5. Real-time data publishing to PubNub cloud
-
-Author: Integrated from original separate files
-Date: 2025-04-04
-'''
-
-import RPi.GPIO as GPIO
-import time
-import dht11
-from pubnub.pnconfiguration import PNConfiguration
-from pubnub.pubnub import PubNub
-from pubnub.exceptions import PubNubException
-import json
-
-# ===== PUBNUB CONFIGURATION =====
-pnconfig = PNConfiguration()
-pnconfig.publish_key = "pub-c-cc09a5e0-ae7e-4f0b-91ba-3c06deac8056"
-pnconfig.subscribe_key = "sub-c-600de055-e08b-4dfd-8f69-231ee45b2313"
-pnconfig.uuid = "z728"
-pubnub = PubNub(pnconfig)
-CHANNEL = "zhaox207"
-
-# ===== PIN CONFIGURATION =====
-# DHT11 temperature and humidity sensor
-DHT_PIN = 4  # GPIO4
-
-# LCD 1602A display
-LCD_RS = 26  # GPIO26
-LCD_E = 19   # GPIO19
-LCD_D4 = 13  # GPIO13
-LCD_D5 = 6   # GPIO6
-LCD_D6 = 5   # GPIO5
-LCD_D7 = 11  # GPIO11
-
-# PIR motion sensor
-PIR_PIN = 17  # GPIO17
-
-# Servo motor
-SERVO_PIN = 18  # GPIO18
-
-# MQ-2 gas sensor
-MQ2_PIN = 16  # GPIO16
-
-# ===== LCD DISPLAY CONSTANTS =====
-LCD_WIDTH = 16    # LCD character width
-LCD_LINE_1 = 0x80 # LCD RAM address for 1st line
-LCD_LINE_2 = 0xC0 # LCD RAM address for 2nd line
-LCD_LINE_3 = 0x94 # LCD RAM address for 3rd line (if available)
-LCD_LINE_4 = 0xD4 # LCD RAM address for 4th line (if available)
-LCD_CHR = True    # Send data
-LCD_CMD = False   # Send command
-E_PULSE = 0.0005  # E pulse width
-E_DELAY = 0.0005  # E delay
-
-# LCD DISPLAY FUNCTIONS (Unchanged from previous script)
-# ... [Keep the existing lcd_init(), lcd_byte(), lcd_toggle_enable(), lcd_string(), lcd_clear() functions] ...
-
-# ===== SERVO CONTROL FUNCTIONS (Unchanged) =====
-# ... [Keep the existing servo_init() and set_angle() functions] ...
-
-# ===== PIR MOTION SENSOR FUNCTIONS (Unchanged) =====
-# ... [Keep the existing pir_init() and check_motion() functions] ...
-
-# ===== MQ-2 GAS SENSOR FUNCTIONS =====
-def mq2_init():
-    '''Initialize MQ-2 gas sensor'''
-    GPIO.setup(MQ2_PIN, GPIO.IN)
-    print(f"MQ-2 gas sensor initialized on GPIO{MQ2_PIN}")
-    
-    # Wait for sensor to stabilize
-    print("Waiting for MQ-2 sensor to stabilize...")
-    time.sleep(10)
-    print("MQ-2 sensor ready")
-
-def check_gas():
-    '''Check if gas/smoke is detected'''
-    # Note: Depends on sensor's output logic. 
-    # Some sensors return LOW when gas is detected, some return HIGH
-    # Modify according to your specific sensor's behavior
-    return GPIO.input(MQ2_PIN) == 0  # Assumes LOW means gas detected
-
-# ===== PUBNUB FUNCTIONS =====
-def publish_to_pubnub(temp, humidity, motion, gas_detected):
-    '''Publish sensor data to PubNub'''
-    try:
-        message = {
-            "temperature": temp,
-            "humidity": humidity,
-            "motion": motion,
-            "gas_detected": gas_detected
-        }
-        
-        envelope = pubnub.publish().channel(CHANNEL).message(message).sync()
-        if envelope.status.is_error():
-            print(f"[PubNub] Error: {envelope.status.error}")
-        else:
-            print(f"[PubNub] Message published successfully")
-    except PubNubException as e:
-        print(f"[PubNub] Exception: {e}")
-    except Exception as e:
-        print(f"[PubNub] Unexpected error: {e}")
-
-# ===== SMART CONTROL LOGIC =====
-def decide_vent_position(temp, humidity, motion_detected, gas_detected, last_motion_time, current_time):
-    '''Decide vent position based on sensor data'''
-    # Configuration parameters
-    TEMP_HIGH = 26  # High temperature threshold (Celsius)
-    TEMP_LOW = 18   # Low temperature threshold (Celsius)
-    HUMIDITY_HIGH = 70  # High humidity threshold (percentage)
-    NO_MOTION_CLOSE_TIME = 300  # Time to close vent after no motion (seconds)
-    
-    # Default position: half open (90 degrees)
-    position = 90
-    reason = "Normal ventilation"
-    
-    # High priority: Gas detection
-    if gas_detected:
-        position = 180  # Fully open for ventilation
-        reason = "Gas/Smoke Detected"
-        return position, reason
-    
-    # Adjust based on temperature
-    if temp > TEMP_HIGH:
-        position = 180  # High temp, fully open
-        reason = f"High temp ({temp}C)"
-    elif temp < TEMP_LOW:
-        position = 0  # Low temp, closed
-        reason = f"Low temp ({temp}C)"
-    
-    # Adjust based on humidity (only when temperature is in normal range)
-    if TEMP_LOW <= temp <= TEMP_HIGH and humidity > HUMIDITY_HIGH:
-        position = 180  # High humidity, fully open
-        reason = f"High humidity ({humidity}%)"
-    
-    # Adjust based on motion detection
-    no_motion_time = current_time - last_motion_time
-    if not motion_detected and no_motion_time > NO_MOTION_CLOSE_TIME:
-        # Long time no motion, close vent to save energy
-        position = 0
-        reason = f"No motion ({int(no_motion_time//60)}min)"
-    
-    return position, reason
-
-# ===== MAIN PROGRAM =====
-def main():
-    try:
-        # Set GPIO mode
-        GPIO.setwarnings(False)
-        GPIO.setmode(GPIO.BCM)
-        GPIO.cleanup()  # Clean up previous settings
-        
-        # Initialize LCD
-        lcd_init()
-        print("LCD screen initialized")
-        
-        # Initialize DHT11
-        dht_sensor = dht11.DHT11(pin=DHT_PIN)
-        print("DHT11 temperature/humidity sensor initialized")
-        
-        # Initialize servo
-        servo_init()
-        
-        # Initialize PIR sensor
-        pir_init()
-        
-        # Initialize MQ-2 gas sensor
-        mq2_init()
-        
-        # Display welcome message
-        lcd_string("Smart Air Vent", LCD_LINE_1)
-        lcd_string("Initializing...", LCD_LINE_2)
-        time.sleep(2)
-        
-        motion_count = 0
-        last_motion_time = time.time()  # Initialize to current time
-        error_count = 0
-        servo_position = 90  # Initial servo position (half open)
-        set_angle(servo_position)  # Set initial position
-        last_detected_motion = False  # Last motion state
-        last_detected_gas = False  # Last gas detection state
-        display_toggle_time = time.time()  # Last display toggle time
-        last_vent_change_time = 0  # Last vent position change time
-        current_reason = "Initial state"  # Current reason for vent position
-        last_pubnub_time = 0  # Last time data was published to PubNub
-        
-        print("System startup complete, monitoring...")
-        
-        while True:
-            current_time = time.time()
-            time_str = time.strftime("%H:%M:%S")
-            
-            # 1. Read DHT11 temperature/humidity data
-            result = dht_sensor.read()
-            current_second = int(time.strftime("%S"))
-            display_mode = (current_second // 5) % 4  # Cycle display mode every 5 seconds 
-            
-            if result.is_valid():
-                temp = result.temperature
-                humidity = result.humidity
-                
-                # Detect current motion state
-                current_motion = check_motion()
-                if current_motion and not last_detected_motion:
-                    if current_time - last_motion_time > 1:  # Avoid consecutive triggers
-                        motion_count += 1
-                        print(f"[{time_str}] Motion detected! Total: {motion_count}")
-                        last_motion_time = current_time
-                
-                # Detect current gas state
-                current_gas = check_gas()
-                if current_gas and not last_detected_gas:
-                    print(f"[{time_str}] Gas/Smoke detected!")
-                
-                # Update detection states
-                last_detected_motion = current_motion
-                last_detected_gas = current_gas
-                
-                # Decide vent position
-                if current_time - last_vent_change_time > 10:  # Adjust vent position at most once every 10 seconds
-                    new_position, reason = decide_vent_position(
-                        temp, humidity, current_motion, current_gas, 
-                        last_motion_time, current_time
-                    )
-                    
-                    # If position needs to change, control servo
-                    if new_position != servo_position:
-                        print(f"[{time_str}] Adjusting vent: {servo_position}° -> {new_position}° (Reason: {reason})")
-                        servo_position = new_position
-                        set_angle(servo_position)
-                        current_reason = reason
-                        last_vent_change_time = current_time
-                
-                # Decide what to display based on display mode
-                if display_mode == 0:  # Display temperature/humidity
-                    temp_str = f"Temp: {temp}C"
-                    hum_str = f"Hum: {humidity}% {time_str[-5:]}"
-                    
-                    lcd_string(temp_str, LCD_LINE_1)
-                    lcd_string(hum_str, LCD_LINE_2)
-                elif display_mode == 1:  # Display PIR data
-                    lcd_string("Motion Detector", LCD_LINE_1)
-                    status = "ACTIVE" if current_motion else "Inactive"
-                    lcd_string(f"Status: {status}", LCD_LINE_2)
-                elif display_mode == 2:  # Display vent status
-                    vent_status = "Off" if servo_position == 0 else "On"
-                    if 0 < servo_position < 180:
-                        vent_status = f"{int(servo_position/180*100)}%"
-                    
-                    lcd_string(f"Vent: {vent_status}", LCD_LINE_1)
-                    lcd_string(f"Reason: {current_reason[:16]}", LCD_LINE_2)  # Limit to 16 characters
-                else:  # Display gas/smoke status
-                    gas_status = "GAS ALERT!" if current_gas else "Gas: Normal"
-                    lcd_string("Gas/Smoke Sensor", LCD_LINE_1)
-                    lcd_string(gas_status, LCD_LINE_2)
-                
-                print(f"[{time_str}] Temp: {temp}°C, Humidity: {humidity}%, Vent: {servo_position}°, Gas: {current_gas}")
-                error_count = 0
-                
-                # Publish data to PubNub every 5 seconds
-                if current_time - last_pubnub_time > 5:
-                    publish_to_pubnub(temp, humidity, current_motion, current_gas)
-                    last_pubnub_time = current_time
-                    
-            else:
-                error_count += 1
-                print(f"[{time_str}] Sensor read failed, attempt: {error_count}")
-                
-                if error_count > 5:
-                    lcd_string("Sensor Error!", LCD_LINE_1)
-                    lcd_string("Check Connection", LCD_LINE_2)
-            
-            # Pause to reduce CPU usage
-            time.sleep(1)
-            
-    except KeyboardInterrupt:
-        print("\nProgram exited")
-    finally:
-        lcd_string("System Shutdown", LCD_LINE_1)
-        lcd_string("Goodbye!", LCD_LINE_2)
-        time.sleep(1)
-        
-        # Clean up and close
-        if 'pwm' in globals():
-            pwm.stop()
-        GPIO.cleanup()
-        print("System shut down, GPIO cleaned up")
-
-if __name__ == "__main__":
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Raspberry Pi Integrated Sensor System with PubNub Integration
+Combines the following functions:
+1. Temperature/humidity sensor (DHT11) reading and display on LCD 1602A
+2. PIR motion detection
+3. Servo motor control for air vent
+4. MQ-2 gas/smoke sensor detection
+5. Real-time data publishing to PubNub cloud
+
+Author: Integrated from original separate files
+Date: 2025-04-04
+'''
+
+import RPi.GPIO as GPIO
+import time
+from pubnub.pnconfiguration import PNConfiguration
+from pubnub.pubnub import PubNub
+from pubnub.exceptions import PubNubException
+import json
+import collections
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+from vent_control import RULES, VentController, check_thresholds
+from sensor_trace import TraceRecorder
+from pwm_backend import create_pwm
+from dht11_edges import create_dht
+from sensor_filters import DEFAULT_FILTERS, SensorFilters
+from telemetry_collector import make_message
+from telemetry_codec import encode_sample, record_text, write_log_record
+from cloud_commands import (MAILBOX_SIZE, THRESHOLD_NAMES, CommandMailbox, LatencyStats, ProcessMailbox,
+                            process_commands, start_listener)
+from shared_snapshot import SharedSnapshot
+from vent_logging import get_logger, set_levels, setup_logging, shutdown_logging
+from task_scheduler import Scheduler
+import config_reload
+from config_reload import RESTART, ConfigReloader
+from lcd_glyphs import GlyphCache, bar_graph, trend_arrow
+from lcd_layout import GEOMETRIES, Layout, Page
+from lcd_transport import PCF8574Transport, open_bus
+
+# ===== PUBNUB CONFIGURATION =====
+pnconfig = PNConfiguration()
+pnconfig.publish_key = "pub-c-cc09a5e0-ae7e-4f0b-91ba-3c06deac8056"
+pnconfig.subscribe_key = "sub-c-600de055-e08b-4dfd-8f69-231ee45b2313"
+pnconfig.uuid = "z728"
+pubnub = PubNub(pnconfig)
+CHANNEL = "zhaox207"
+CONTROL_CHANNEL = CHANNEL + "-control"  # Vent overrides and threshold changes (see cloud_commands.py)
+CLOUD_COMMANDS = True  # Listen for commands on CONTROL_CHANNEL
+
+# ===== PIN CONFIGURATION =====
+# DHT11 temperature and humidity sensor
+DHT_PIN = 4  # GPIO4
+DHT_BACKEND = "auto"  # "edges" (gpiochip edge timestamps), "library" (dht11 module) or "auto"
+# Median/EMA/outlier filtering of DHT11 readings before the vent decision
+# (see sensor_filters.py); None passes raw readings through
+SENSOR_FILTERS = DEFAULT_FILTERS
+
+# LCD 1602A display
+LCD_RS = 26  # GPIO26
+LCD_E = 19   # GPIO19
+LCD_D4 = 13  # GPIO13
+LCD_D5 = 6   # GPIO6
+LCD_D6 = 5   # GPIO5
+LCD_D7 = 11  # GPIO11
+# Or drive it through a PCF8574 I2C backpack (SDA/SCL only, frees the six pins above)
+LCD_TRANSPORT = "gpio"  # "gpio" or "i2c"
+LCD_I2C_BUS = 1         # /dev/i2c-1
+LCD_I2C_ADDRESS = 0x27  # 0x3F on PCF8574A backpacks
+
+# PIR motion sensor
+PIR_PIN = 17  # GPIO17
+
+# Servo motor
+SERVO_PIN = 18  # GPIO18
+PWM_BACKEND = "auto"  # "auto" (kernel hardware PWM if available), "hardware" or "software"
+
+# MQ-2 gas sensor
+MQ2_PIN = 16  # GPIO16
+
+# ===== STARTUP CONFIGURATION =====
+# Warm up the servo, PIR and MQ-2 sensors in background threads and start
+# monitoring right away (DHT11 needs no warm-up). False restores the old
+# serial startup with the welcome screen.
+CONCURRENT_STARTUP = True
+
+# ===== SENSOR TRACE RECORDING =====
+# Set to a file path (e.g. "/home/pi/sensor_trace.bin") to record every
+# sensor sample for later replay with sensor_trace.py, None to disable
+TRACE_FILE = None
+
+# ===== TELEMETRY COLLECTOR =====
+# Also send each published sample over UDP to a telemetry_collector.py
+# instance, e.g. ("192.168.1.10", 7070); None to disable. When the
+# collector forwards the consolidated fleet stream to PubNub, set
+# PUBLISH_TO_PUBNUB = False so this node stops publishing on its own.
+COLLECTOR_ADDRESS = None
+PUBLISH_TO_PUBNUB = True
+DEVICE_ID = pnconfig.uuid
+
+# ===== TELEMETRY FORMAT =====
+# "json": the JSON objects existing PubNub subscribers parse; "binary":
+# compact records from telemetry_codec.py (base64 text on PubNub, raw bytes
+# to the collector), only once every subscriber decodes them
+PAYLOAD_FORMAT = "json"
+# Set to a file path to append every published sample as a binary record
+# (read it back with telemetry_codec.py), None to disable
+TELEMETRY_LOG = None
+
+# ===== SCHEDULING =====
+# Periods of the tasks driven by task_scheduler.Scheduler (seconds)
+SAMPLE_PERIOD = 1.0              # Sensor read, vent decision and LCD update
+COMMAND_PERIOD = 0.2             # Cloud command mailbox drain
+PUBLISH_PERIOD = 5.0             # PubNub / collector / telemetry log
+SCHEDULER_REPORT_PERIOD = 60.0   # Log jitter/overrun/missed deadline statistics
+
+# ===== LOGGING =====
+# Log lines are queued and written by a background thread (see vent_logging.py)
+LOG_FILE = None    # e.g. "/home/pi/vent.log" (JSON lines, rotated and gzip-compressed)
+LOG_LEVEL = "INFO"
+LOG_LEVELS = {}    # Per-subsystem levels, e.g. {"pubnub": "WARNING", "sensor": "DEBUG"}
+
+startup_log = get_logger("startup")
+sensor_log = get_logger("sensor")
+servo_log = get_logger("servo")
+control_log = get_logger("control")
+pubnub_log = get_logger("pubnub")
+collector_log = get_logger("collector")
+command_log = get_logger("command")
+scheduler_log = get_logger("scheduler")
+config_log = get_logger("config")
+display_log = get_logger("display")
+
+# ===== MULTI-PROCESS MODE =====
+# Run the LCD and the network side (PubNub, collector, cloud commands) in
+# processes of their own, so TLS and JSON work no longer competes with the
+# DHT11 reads and LCD strobes for one interpreter's GIL. This process keeps
+# the sensors and the servo and writes every sample into a shared memory
+# snapshot (shared_snapshot.py) that the others read without locking;
+# remote_control.py can read it too (SENSOR_SNAPSHOT).
+# Display and network settings are fixed when those processes start.
+MULTIPROCESS = False
+SNAPSHOT_NAME = "smart_vent_snapshot"
+DISPLAY_PERIOD = 0.2  # Seconds between snapshot checks in the display process
+# Cores per process, e.g. {"acquisition": {1}, "display": {2}, "network": {3}};
+# None leaves placement to the kernel
+CPU_AFFINITY = None
+
+# ===== CONFIGURATION FILE =====
+# JSON file of {"SETTING": value} overriding the constants in this file, e.g.
+# {"PUBLISH_PERIOD": 10, "THRESHOLDS": {"temp_high": 27}, "PIR_PIN": 22}.
+# It is read at startup and re-applied while running on SIGHUP
+# (kill -HUP <pid>) or when the file changes; only the subsystems whose
+# settings changed are swapped, warmed-up sensors and the vent position are
+# kept. None disables it.
+CONFIG_FILE = None
+CONFIG_CHECK_PERIOD = 2.0  # Seconds between checks for a changed file
+THRESHOLDS = {}  # Overrides for the vent_rules.json thresholds, e.g. {"temp_high": 27}
+
+def threshold_overrides(value):
+    '''THRESHOLDS validator: the overrides merged over vent_rules.json must be usable'''
+    value = config_reload.numbers(*THRESHOLD_NAMES)(value)
+    check_thresholds({**RULES.thresholds, **value})
+    return value
+
+# Settings the file may hold -> (validator, subsystem swapped when it changes)
+SETTINGS = {
+    "THRESHOLDS": (threshold_overrides, "control"),
+    "SAMPLE_PERIOD": (config_reload.positive_number, "scheduler"),
+    "COMMAND_PERIOD": (config_reload.positive_number, "scheduler"),
+    "PUBLISH_PERIOD": (config_reload.positive_number, "scheduler"),
+    "SCHEDULER_REPORT_PERIOD": (config_reload.positive_number, "scheduler"),
+    "PUBLISH_TO_PUBNUB": (config_reload.boolean, "publish"),
+    "COLLECTOR_ADDRESS": (config_reload.address, "publish"),
+    "PAYLOAD_FORMAT": (config_reload.choice("binary", "json"), "publish"),
+    "LOG_LEVEL": (config_reload.log_level, "logging"),
+    "LOG_LEVELS": (config_reload.log_levels, "logging"),
+    "SENSOR_FILTERS": (config_reload.built_by(SensorFilters), "filters"),
+    "PAGE_ROTATION": (config_reload.positive_number, "display"),
+    "DHT_PIN": (config_reload.gpio_pin, "dht"),
+    "DHT_BACKEND": (config_reload.choice("auto", "edges", "library"), "dht"),
+    "PIR_PIN": (config_reload.gpio_pin, "pir"),
+    "MQ2_PIN": (config_reload.gpio_pin, "mq2"),
+    # Read at startup only
+    "SERVO_PIN": (config_reload.gpio_pin, RESTART),
+    "PWM_BACKEND": (config_reload.choice("auto", "hardware", "software"), RESTART),
+    "LCD_TRANSPORT": (config_reload.choice("gpio", "i2c"), RESTART),
+    "CONCURRENT_STARTUP": (config_reload.boolean, RESTART),
+    "CLOUD_COMMANDS": (config_reload.boolean, RESTART),
+    "TRACE_FILE": (config_reload.optional_text, RESTART),
+    "TELEMETRY_LOG": (config_reload.optional_text, RESTART),
+    "LOG_FILE": (config_reload.optional_text, RESTART),
+}
+TASK_PERIODS = {"sample": "SAMPLE_PERIOD", "commands": "COMMAND_PERIOD",
+                "publish": "PUBLISH_PERIOD", "report": "SCHEDULER_REPORT_PERIOD"}
+# Settings handed to the display and network processes in MULTIPROCESS mode
+CHILD_SETTINGS = tuple(SETTINGS) + ("DEVICE_ID", "SNAPSHOT_NAME", "DISPLAY_PERIOD", "CPU_AFFINITY",
+                                    "LCD_I2C_BUS", "LCD_I2C_ADDRESS")
+
+# ===== LCD DISPLAY CONSTANTS =====
+DISPLAY = "16x2"  # Panel geometry, one of lcd_layout.GEOMETRIES ("16x2", "20x4", ...)
+LCD_WIDTH = GEOMETRIES[DISPLAY].width  # LCD character width
+LCD_LINE_1 = 0x80 # LCD RAM address for 1st line
+LCD_LINE_2 = 0xC0 # LCD RAM address for 2nd line
+LCD_LINE_3 = 0x94 # LCD RAM address for 3rd line (if available)
+LCD_LINE_4 = 0xD4 # LCD RAM address for 4th line (if available)
+LCD_CHR = True    # Send data
+LCD_CMD = False   # Send command
+E_PULSE = 0.0005  # E pulse width
+E_DELAY = 0.0005  # E delay
+TREND_WINDOW = 60 # Seconds of temperature history behind the trend arrow
+PAGE_ROTATION = 5 # Seconds each screen is shown
+
+# Display pages; fields are filled from the values the sample task publishes
+# with layout.update(). A 20x4 panel shows two of these pages per screen.
+PAGES = [
+    Page("climate", ["Temp: {temp}°C {trend}", "Hum: {humidity}% {clock}"]),
+    Page("motion", ["Motion Detector", "Status: {motion}"]),
+    Page("vent", ["Vent: {vent:<4}{vent_bar}", "Reason: {reason}"]),
+    Page("gas", ["Gas/Smoke Sensor", "{gas}"]),
+]
+
+# ===== LCD DISPLAY FUNCTIONS =====
+def lcd_init():
+    '''Initialize LCD display'''
+    global lcd_bus
+    # Set GPIO
+    GPIO.setwarnings(False)
+    GPIO.setmode(GPIO.BCM)
+    if LCD_TRANSPORT == "i2c":
+        lcd_bus = PCF8574Transport(open_bus(LCD_I2C_BUS), LCD_I2C_ADDRESS)
+    else:
+        GPIO.setup(LCD_E, GPIO.OUT)
+        GPIO.setup(LCD_RS, GPIO.OUT)
+        GPIO.setup(LCD_D4, GPIO.OUT)
+        GPIO.setup(LCD_D5, GPIO.OUT)
+        GPIO.setup(LCD_D6, GPIO.OUT)
+        GPIO.setup(LCD_D7, GPIO.OUT)
+
+    # Initialize display
+    lcd_byte(0x33, LCD_CMD) # 110011 Initialize
+    lcd_byte(0x32, LCD_CMD) # 110010 Initialize
+    lcd_byte(0x06, LCD_CMD) # 000110 Cursor move direction
+    lcd_byte(0x0C, LCD_CMD) # 001100 Display On, Cursor Off
+    lcd_byte(0x28, LCD_CMD) # 101000 Data length, number of lines, font size
+    lcd_byte(0x01, LCD_CMD) # 000001 Clear display
+    lcd_flush()
+    glyphs.reset()
+    time.sleep(E_DELAY)
+
+def lcd_byte(bits, mode):
+    '''Send byte to LCD'''
+    if lcd_bus:
+        lcd_bus.send(bits, mode)  # Buffered, goes out on lcd_flush()
+        return
+
+    # Set RS pin
+    GPIO.output(LCD_RS, mode)
+
+    # Send high 4 bits
+    GPIO.output(LCD_D4, False)
+    GPIO.output(LCD_D5, False)
+    GPIO.output(LCD_D6, False)
+    GPIO.output(LCD_D7, False)
+    if bits & 0x10 == 0x10:
+        GPIO.output(LCD_D4, True)
+    if bits & 0x20 == 0x20:
+        GPIO.output(LCD_D5, True)
+    if bits & 0x40 == 0x40:
+        GPIO.output(LCD_D6, True)
+    if bits & 0x80 == 0x80:
+        GPIO.output(LCD_D7, True)
+
+    # Enable pulse
+    lcd_toggle_enable()
+
+    # Send low 4 bits
+    GPIO.output(LCD_D4, False)
+    GPIO.output(LCD_D5, False)
+    GPIO.output(LCD_D6, False)
+    GPIO.output(LCD_D7, False)
+    if bits & 0x01 == 0x01:
+        GPIO.output(LCD_D4, True)
+    if bits & 0x02 == 0x02:
+        GPIO.output(LCD_D5, True)
+    if bits & 0x04 == 0x04:
+        GPIO.output(LCD_D6, True)
+    if bits & 0x08 == 0x08:
+        GPIO.output(LCD_D7, True)
+
+    # Enable pulse
+    lcd_toggle_enable()
+
+def lcd_toggle_enable():
+    '''Toggle enable pulse'''
+    time.sleep(E_DELAY)
+    GPIO.output(LCD_E, True)
+    time.sleep(E_PULSE)
+    GPIO.output(LCD_E, False)
+    time.sleep(E_DELAY)
+
+def lcd_flush():
+    '''Send any bytes the I2C transport is still holding'''
+    if lcd_bus:
+        lcd_bus.flush()
+
+def lcd_string(message, line):
+    '''Send string to LCD (may contain the symbols in lcd_glyphs.GLYPH_CHARS)'''
+    lcd_page((message, line))
+
+def lcd_page(*rows):
+    '''Send several (message, line) rows, loading the glyphs they need first
+
+    Custom glyphs are uploaded to CGRAM only when they are not resident
+    already; each row then starts with its DDRAM address command, which
+    also ends any CGRAM write.
+    '''
+    messages = [message.ljust(LCD_WIDTH, " ")[:LCD_WIDTH] for message, line in rows]
+    for (message, line), codes in zip(rows, glyphs.encode_page(messages)):
+        lcd_byte(line, LCD_CMD)
+        for code in codes:
+            lcd_byte(code, LCD_CHR)
+    lcd_flush()
+
+def lcd_clear():
+    '''Clear LCD display'''
+    lcd_byte(0x01, LCD_CMD)
+    lcd_flush()
+    time.sleep(E_DELAY)
+
+lcd_bus = None  # PCF8574Transport when LCD_TRANSPORT is "i2c"
+glyphs = GlyphCache(lcd_byte, LCD_CMD, LCD_CHR)  # Degree sign, vent bar, trend arrows
+
+# ===== SERVO CONTROL FUNCTIONS =====
+def servo_init():
+    '''Initialize servo motor'''
+    global pwm
+    pwm = create_pwm(SERVO_PIN, 50, PWM_BACKEND)  # 50Hz frequency
+    pwm.start(0)
+    servo_log.info("Servo initialized")
+
+def set_angle(angle):
+    '''Set servo angle'''
+    if angle < 0:
+        angle = 0
+    elif angle > 180:
+        angle = 180
+        
+    duty = 2 + (angle / 18)
+    if not pwm.hardware:
+        GPIO.output(SERVO_PIN, True)  # Pin is owned by the PWM peripheral in hardware mode
+    pwm.ChangeDutyCycle(duty)
+    time.sleep(0.3)  # Give servo time to move
+    if not pwm.hardware:
+        GPIO.output(SERVO_PIN, False)
+    pwm.ChangeDutyCycle(0)  # Stop pulse to prevent jitter
+
+# ===== PIR MOTION SENSOR FUNCTIONS =====
+def pir_init():
+    '''Initialize PIR sensor'''
+    GPIO.setup(PIR_PIN, GPIO.IN)
+    sensor_log.info("PIR sensor initialized on GPIO%d", PIR_PIN)
+    
+    # Wait for PIR sensor to initialize
+    sensor_log.info("Waiting for PIR sensor to stabilize...")
+    time.sleep(2)
+    sensor_log.info("PIR sensor ready")
+
+def check_motion():
+    '''Check if motion is detected'''
+    return GPIO.input(PIR_PIN)
+
+# ===== MQ-2 GAS SENSOR FUNCTIONS =====
+def mq2_init():
+    '''Initialize MQ-2 gas sensor'''
+    GPIO.setup(MQ2_PIN, GPIO.IN)
+    sensor_log.info("MQ-2 gas sensor initialized on GPIO%d", MQ2_PIN)
+    
+    # Wait for sensor to stabilize
+    sensor_log.info("Waiting for MQ-2 sensor to stabilize...")
+    time.sleep(10)
+    sensor_log.info("MQ-2 sensor ready")
+
+def check_gas():
+    '''Check if gas/smoke is detected'''
+    # Note: Depends on sensor's output logic. 
+    # Some sensors return LOW when gas is detected, some return HIGH
+    # Modify according to your specific sensor's behavior
+    return GPIO.input(MQ2_PIN) == 0  # Assumes LOW means gas detected
+
+# ===== DEVICE WARM-UP =====
+warmup_events = {}    # Subsystem name -> Event set once it is ready or has failed
+ready_times = {}      # Subsystem name -> seconds from startup until ready
+warmup_failures = {}  # Subsystem name -> error that stopped it from initializing
+
+def start_warmup(name, init_func, startup_time):
+    '''Run a device initializer in a background thread, mark it ready when done'''
+    ready = threading.Event()
+    warmup_events[name] = ready
+    warmup_failures.pop(name, None)
+
+    def run():
+        try:
+            init_func()
+        except Exception as e:
+            startup_log.error("%s failed to initialize: %s", name, e)
+            warmup_failures[name] = e
+            ready.set()  # Wake anything waiting for it; is_ready() stays False
+            return
+        ready_times[name] = time.monotonic() - startup_time
+        ready.set()
+        startup_log.info("%s ready after %.2fs", name, ready_times[name])
+
+    threading.Thread(target=run, name=f"warmup-{name}", daemon=True).start()
+
+def is_ready(name):
+    '''True once a subsystem has finished warming up (always True in serial startup)'''
+    ready = warmup_events.get(name)
+    return ready is None or (ready.is_set() and name not in warmup_failures)
+
+def report_when_ready(startup_time):
+    '''Print the total ready time once every warming subsystem is up'''
+    def run():
+        for ready in list(warmup_events.values()):
+            ready.wait()
+        if warmup_failures:
+            startup_log.error("Startup finished after %.2fs, failed: %s", time.monotonic() - startup_time,
+                              ", ".join(sorted(warmup_failures)))
+        else:
+            startup_log.info("All subsystems ready after %.2fs", time.monotonic() - startup_time)
+
+    threading.Thread(target=run, name="warmup-report", daemon=True).start()
+
+def servo_warmup():
+    '''Initialize servo and move it to the initial position (half open)'''
+    servo_init()
+    set_angle(90)
+
+def move_vent(angle):
+    '''Move the vent, waiting for the servo if it is still warming up'''
+    ready = warmup_events.get("Servo")
+    if ready is not None:
+        ready.wait()
+    if "Servo" in warmup_failures:
+        raise RuntimeError(f"Servo failed to initialize, cannot move to {angle}°")
+    set_angle(angle)
+
+# ===== PUBNUB FUNCTIONS =====
+def publish_to_pubnub(message):
+    '''Publish one telemetry message (JSON object or base64 record) to PubNub'''
+    try:
+        envelope = pubnub.publish().channel(CHANNEL).message(message).sync()
+        if envelope.status.is_error():
+            pubnub_log.warning("Publish error: %s", envelope.status.error)
+        else:
+            pubnub_log.debug("Message published successfully")
+    except PubNubException as e:
+        pubnub_log.warning("Exception: %s", e)
+    except Exception as e:
+        pubnub_log.warning("Unexpected error: %s", e)
+
+# ===== TELEMETRY COLLECTOR FUNCTIONS =====
+collector_socket = None
+
+def send_to_collector(payload):
+    '''Send one encoded sample to the telemetry collector (fire and forget)'''
+    global collector_socket
+    try:
+        if collector_socket is None:
+            collector_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        collector_socket.sendto(payload, COLLECTOR_ADDRESS)
+    except OSError as e:
+        collector_log.warning("Send failed: %s", e)
+
+# ===== SAMPLE OUTPUT =====
+# A sample is a dict with the VENT_FIELDS of shared_snapshot.py: time, temp,
+# humidity, trend, vent, motion, gas, pir_ready, mq2_ready, error_count, reason
+
+def page_values(sample):
+    '''Values for the display PAGES from one sample'''
+    servo_position = sample["vent"]
+    vent_status = "Off" if servo_position == 0 else "On"
+    if 0 < servo_position < 180:
+        vent_status = f"{int(servo_position/180*100)}%"
+    motion_status = "ACTIVE" if sample["motion"] else "Inactive"
+    if not sample["pir_ready"]:
+        motion_status = "Warming"
+    gas_status = "GAS ALERT!" if sample["gas"] else "Gas: Normal"
+    if not sample["mq2_ready"]:
+        gas_status = "Gas: Warming"
+    return dict(temp=sample["temp"], humidity=sample["humidity"], trend=trend_arrow(sample["trend"]),
+                clock=time.strftime("%M:%S", time.localtime(sample["time"])), motion=motion_status,
+                vent=vent_status, vent_bar=bar_graph(servo_position / 180, 6), reason=sample["reason"],
+                gas=gas_status)
+
+def publish_sample(sample, telemetry_log):
+    '''Publish one sample to PubNub / the collector / the telemetry log'''
+    current_time = sample["time"]
+    temp, humidity = sample["temp"], sample["humidity"]
+    current_motion, current_gas = sample["motion"], sample["gas"]
+    if not sample["mq2_ready"]:
+        current_gas = None  # Unknown while the MQ-2 warms up, not "no gas"
+    servo_position = sample["vent"]
+    record = encode_sample(temp, humidity, current_motion, current_gas,
+                           servo_position, current_time, DEVICE_ID)
+    if PAYLOAD_FORMAT == "binary":
+        cloud_message = record_text(record)
+        collector_payload = record
+    else:
+        cloud_message = {
+            "temperature": temp,
+            "humidity": humidity,
+            "motion": current_motion,
+            "gas_detected": current_gas
+        }
+        collector_payload = make_message(DEVICE_ID, temp, humidity, current_motion,
+                                         current_gas, servo_position, current_time)
+    if PUBLISH_TO_PUBNUB:
+        publish_to_pubnub(cloud_message)
+    if COLLECTOR_ADDRESS:
+        send_to_collector(collector_payload)
+    if telemetry_log:
+        write_log_record(telemetry_log, record)
+        telemetry_log.flush()
+
+# ===== CHILD PROCESSES (MULTIPROCESS mode) =====
+def set_affinity(role):
+    '''Pin this process to the cores CPU_AFFINITY gives its role'''
+    if CPU_AFFINITY and role in CPU_AFFINITY and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, CPU_AFFINITY[role])
+
+def child_setup(role, settings):
+    '''Common start of the display and network processes'''
+    globals().update(settings)
+    set_affinity(role)
+    # Ctrl+C reaches the whole process group; only the parent acts on it and
+    # stops the children with terminate(), which runs their finally blocks
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    setup_logging(None, LOG_LEVEL, LOG_LEVELS)  # Only the parent writes LOG_FILE
+    return SharedSnapshot(SNAPSHOT_NAME)
+
+def display_process(settings):
+    '''Draw the display pages from the shared snapshot'''
+    snapshot = child_setup("display", settings)
+    try:
+        lcd_init()
+        lcd_string("Smart Air Vent", LCD_LINE_1)
+        lcd_string("Warming up...", LCD_LINE_2)
+        layout = Layout(lambda rows: lcd_page(*rows), DISPLAY, PAGES, PAGE_ROTATION)
+        sequence = 0
+        while True:
+            update = snapshot.read_newer(sequence)
+            if update and update[1]:
+                sequence, sample = update
+                if sample["time"]:
+                    layout.update(**page_values(sample))
+                layout.set_alert(["Sensor Error!", "Check Connection"] if sample["error_count"] > 5 else None)
+            layout.refresh(time.time())  # Keeps the warm-up screen until the first sample
+            time.sleep(DISPLAY_PERIOD)
+    except SystemExit:
+        pass
+    finally:
+        lcd_string("System Shutdown", LCD_LINE_1)
+        lcd_string("Goodbye!", LCD_LINE_2)
+        GPIO.cleanup()  # Only the LCD pins belong to this process
+        snapshot.close()
+        shutdown_logging()
+
+def network_process(settings, mailbox):
+    '''Publish samples from the shared snapshot and post cloud commands to the mailbox'''
+    snapshot = child_setup("network", settings)
+    telemetry_log = open(TELEMETRY_LOG, "ab") if TELEMETRY_LOG else None
+    last_published = 0
+    
+    def publish_task():
+        nonlocal last_published
+        _, sample = snapshot.read()
+        if not sample or sample["time"] in (0, last_published):
+            return  # No new valid sample since the last publish
+        publish_sample(sample, telemetry_log)
+        last_published = sample["time"]
+    
+    try:
+        if CLOUD_COMMANDS:
+            start_listener(pubnub, CONTROL_CHANNEL, mailbox)
+            command_log.info("Listening for commands on %s", CONTROL_CHANNEL)
+        scheduler = Scheduler(on_error=lambda task, e: scheduler_log.exception("Task %s failed: %s", task.name, e))
+        scheduler.add("publish", PUBLISH_PERIOD, publish_task, offset=PUBLISH_PERIOD)
+        scheduler.run()
+    except SystemExit:
+        pass
+    finally:
+        if CLOUD_COMMANDS:
+            pubnub.stop()
+        if telemetry_log:
+            telemetry_log.close()
+        snapshot.close()
+        shutdown_logging()
+
+# ===== MAIN PROGRAM =====
+def main():
+    recorder = None
+    telemetry_log = None
+    latency = LatencyStats()
+    scheduler = None
+    reloader = None
+    snapshot = None
+    children = []
+    if CONFIG_FILE:
+        # Settings from the file replace the constants before anything starts
+        reloader = ConfigReloader(CONFIG_FILE, SETTINGS, {name: globals()[name] for name in SETTINGS}, config_log)
+        for values in reloader.poll().values():
+            globals().update(values)
+        reloader.install_signal_handler()
+    setup_logging(LOG_FILE, LOG_LEVEL, LOG_LEVELS)
+    try:
+        # Set GPIO mode
+        GPIO.setwarnings(False)
+        GPIO.setmode(GPIO.BCM)
+        GPIO.cleanup()  # Clean up previous settings
+        startup_time = time.monotonic()
+        
+        if MULTIPROCESS:
+            # Display and network run in their own interpreters; commands
+            # come back from the network process through a queue
+            set_affinity("acquisition")
+            snapshot = SharedSnapshot(SNAPSHOT_NAME, create=True)
+            context = multiprocessing.get_context("spawn")
+            mailbox = ProcessMailbox(context.Queue(MAILBOX_SIZE))
+            settings = {name: globals()[name] for name in CHILD_SETTINGS}
+            children = [context.Process(target=display_process, args=(settings,), name="display"),
+                        context.Process(target=network_process, args=(settings, mailbox), name="network")]
+            for child in children:
+                child.start()
+            startup_log.info("Display and network processes started (pids %s)",
+                             ", ".join(str(child.pid) for child in children))
+        else:
+            # Initialize LCD
+            lcd_init()
+            startup_log.info("LCD screen initialized")
+            mailbox = CommandMailbox()
+        
+        # Initialize DHT11
+        dht_sensor = create_dht(DHT_PIN, DHT_BACKEND)
+        sensor_log.info("DHT11 temperature/humidity sensor initialized (%s)", type(dht_sensor).__name__)
+        
+        if CONCURRENT_STARTUP:
+            # Servo, PIR and MQ-2 warm up in the background; the loop
+            # treats them as "warming" until they report ready
+            if not MULTIPROCESS:
+                lcd_string("Smart Air Vent", LCD_LINE_1)
+                lcd_string("Warming up...", LCD_LINE_2)
+            start_warmup("Servo", servo_warmup, startup_time)
+            start_warmup("PIR", pir_init, startup_time)
+            start_warmup("MQ-2", mq2_init, startup_time)
+            report_when_ready(startup_time)
+        else:
+            # Initialize servo
+            servo_init()
+            
+            # Initialize PIR sensor
+            pir_init()
+            
+            # Initialize MQ-2 gas sensor
+            mq2_init()
+            
+            # Display welcome message
+            if not MULTIPROCESS:
+                lcd_string("Smart Air Vent", LCD_LINE_1)
+                lcd_string("Initializing...", LCD_LINE_2)
+                time.sleep(2)
+            set_angle(90)  # Set initial position
+            startup_log.info("All subsystems ready after %.2fs", time.monotonic() - startup_time)
+        
+        controller = VentController(time.time(), servo_position=90, actuator=move_vent, log=control_log.info)  # Initial servo position (half open)
+        if THRESHOLDS:
+            controller.set_thresholds(**THRESHOLDS)
+        
+        # Cloud commands arrive on the PubNub thread and wait in the mailbox
+        # until the command task picks them up, so they never block sensor reads
+        # (in MULTIPROCESS mode the network process listens and posts to the queue)
+        if CLOUD_COMMANDS and not MULTIPROCESS:
+            start_listener(pubnub, CONTROL_CHANNEL, mailbox)
+            command_log.info("Listening for commands on %s", CONTROL_CHANNEL)
+        
+        # Optional sensor trace recording
+        recorder = TraceRecorder(TRACE_FILE) if TRACE_FILE else None
+        if recorder:
+            startup_log.info("Recording sensor trace to %s", TRACE_FILE)
+        if TELEMETRY_LOG and not MULTIPROCESS:
+            telemetry_log = open(TELEMETRY_LOG, "ab")
+            startup_log.info("Logging telemetry to %s", TELEMETRY_LOG)
+        
+        error_count = 0
+        latest = {}  # Most recent valid sample, published by the publish task
+        temp_history = collections.deque(maxlen=max(1, int(TREND_WINDOW / SAMPLE_PERIOD)))
+        filters = SensorFilters(SENSOR_FILTERS, log=sensor_log.warning) if SENSOR_FILTERS else None
+        layout = None if MULTIPROCESS else Layout(lambda rows: lcd_page(*rows), DISPLAY, PAGES, PAGE_ROTATION)
+        last_published = 0  # Time of the last published sample
+        
+        def command_task():
+            '''Apply any cloud commands received since the last run'''
+            process_commands(mailbox, controller, latency, time.time(), command_log.info)
+        
+        def sample_task():
+            '''Read the sensors, update the vent and refresh the LCD'''
+            nonlocal error_count
+            current_time = time.time()
+            
+            # 1. Read DHT11 temperature/humidity data
+            result = dht_sensor.read()
+            
+            if result.is_valid():
+                temp = result.temperature
+                humidity = result.humidity
+                
+                # Read motion and gas states (warming sensors report nothing)
+                current_motion = check_motion() if is_ready("PIR") else False
+                current_gas = check_gas() if is_ready("MQ-2") else False
+                if recorder:
+                    recorder.record_sample(current_time, temp, humidity, current_motion,
+                                           current_gas if is_ready("MQ-2") else None)
+                
+                # Smooth the readings; rejected outliers keep the previous filtered value
+                if filters:
+                    filtered = filters.apply(temperature=temp, humidity=humidity)
+                    temp, humidity = filtered["temperature"], filtered["humidity"]
+                    if temp is None or humidity is None:
+                        return  # No reading accepted yet
+                
+                # Track motion/gas edges and adjust vent position if needed
+                controller.update(temp, humidity, current_motion, current_gas, current_time)
+                servo_position = controller.servo_position
+                current_reason = controller.current_reason
+                temp_history.append(temp)
+                
+                sample = dict(time=current_time, temp=temp, humidity=humidity, trend=temp - temp_history[0],
+                              vent=servo_position, motion=current_motion, gas=current_gas,
+                              pir_ready=is_ready("PIR"), mq2_ready=is_ready("MQ-2"),
+                              error_count=0, reason=current_reason)
+                # Hand the sample to the display: shared memory for the display
+                # process, or the layout, which redraws only if a value changed
+                if snapshot:
+                    snapshot.write(**sample)
+                else:
+                    layout.update(**page_values(sample))
+                    layout.set_alert(None)
+                
+                sensor_log.info("Temp: %s°C, Humidity: %s%%, Vent: %s°, Gas: %s", temp, humidity,
+                                servo_position, current_gas if is_ready("MQ-2") else "warming")
+                error_count = 0
+                latest.update(sample)
+                    
+            else:
+                if recorder:
+                    recorder.record_failure(current_time)
+                error_count += 1
+                sensor_log.warning("Sensor read failed, attempt: %d", error_count)
+                
+                if snapshot:
+                    # The snapshot field is 16 bits; past that "many" is all the display needs
+                    snapshot.write(**dict(latest, error_count=min(error_count, 0xFFFF)))
+                elif error_count > 5:
+                    layout.set_alert(["Sensor Error!", "Check Connection"])
+            
+            if layout:
+                layout.refresh(current_time)
+        
+        def publish_task():
+            '''Publish the latest sample to PubNub / the collector / the telemetry log'''
+            nonlocal last_published
+            if not latest or latest["time"] == last_published:
+                return  # No new valid sample since the last publish
+            publish_sample(latest, telemetry_log)
+            last_published = latest["time"]
+        
+        def config_task():
+            '''Swap the subsystems whose settings changed in CONFIG_FILE'''
+            nonlocal dht_sensor, filters
+            changes = reloader.poll()
+            restart = changes.pop(RESTART, None)
+            if restart:
+                config_log.warning("Restart needed to apply %s", ", ".join(sorted(restart)))
+            previous = {name: globals()[name] for values in changes.values() for name in values}
+            for subsystem, values in changes.items():
+                globals().update(values)
+                config_log.info("Reloaded %s settings: %s", subsystem, values)
+            
+            if "control" in changes:
+                # Start from the rule table so a removed override is undone too
+                controller.set_thresholds(**{**RULES.thresholds, **THRESHOLDS})
+            if "scheduler" in changes:
+                for task in scheduler.tasks:
+                    if task.name in TASK_PERIODS:
+                        scheduler.set_period(task.name, globals()[TASK_PERIODS[task.name]])
+            if MULTIPROCESS and changes.keys() & {"publish", "display"}:
+                config_log.warning("Display and network processes keep their settings until restart")
+            if "logging" in changes:
+                set_levels(LOG_LEVEL, LOG_LEVELS)
+            if "filters" in changes:
+                filters = SensorFilters(SENSOR_FILTERS, log=sensor_log.warning) if SENSOR_FILTERS else None
+            if "display" in changes and layout:
+                layout.rotation_period = PAGE_ROTATION
+            if "dht" in changes:
+                # Open the new reader first; if that fails the old one keeps running
+                try:
+                    new_sensor = create_dht(DHT_PIN, DHT_BACKEND)
+                except Exception as e:
+                    config_log.error("DHT11 settings not applied, keeping the current reader: %s", e)
+                    for name in changes["dht"]:
+                        globals()[name] = reloader.current[name] = previous[name]
+                else:
+                    if hasattr(dht_sensor, "close"):
+                        dht_sensor.close()
+                    dht_sensor = new_sensor
+            # A moved PIR or MQ-2 warms up again on its new pin; the other
+            # sensors and the servo stay as they are
+            if "pir" in changes:
+                GPIO.cleanup(previous["PIR_PIN"])
+                start_warmup("PIR", pir_init, time.monotonic())
+            if "mq2" in changes:
+                GPIO.cleanup(previous["MQ2_PIN"])
+                start_warmup("MQ-2", mq2_init, time.monotonic())
+        
+        def report_task():
+            for line in scheduler.report_lines():
+                scheduler_log.info(line)
+            if layout:
+                display_log.debug("Glyph cache: %s, layout: %s", glyphs.stats(), layout.stats())
+            if filters:
+                sensor_log.info("Filters: %s", filters.stats())
+        
+        # Every task runs at absolute deadlines, so the work done in a task
+        # no longer stretches the period of the next one
+        scheduler = Scheduler(on_error=lambda task, e: scheduler_log.exception("Task %s failed: %s", task.name, e))
+        scheduler.add("sample", SAMPLE_PERIOD, sample_task)
+        scheduler.add("commands", COMMAND_PERIOD, command_task)
+        if not MULTIPROCESS:
+            scheduler.add("publish", PUBLISH_PERIOD, publish_task, offset=PUBLISH_PERIOD)
+        scheduler.add("report", SCHEDULER_REPORT_PERIOD, report_task, offset=SCHEDULER_REPORT_PERIOD)
+        if reloader:
+            scheduler.add("config", CONFIG_CHECK_PERIOD, config_task, offset=CONFIG_CHECK_PERIOD)
+        
+        startup_log.info("System startup complete, monitoring...")
+        scheduler.run()
+            
+    except KeyboardInterrupt:
+        startup_log.info("Program exited")
+    finally:
+        if recorder:
+            recorder.close()
+        if telemetry_log:
+            telemetry_log.close()
+        if CLOUD_COMMANDS and not MULTIPROCESS:
+            pubnub.stop()
+        for kind, stats in latency.summary().items():
+            command_log.info("%s latency: %s", kind, stats)
+        if scheduler:
+            for line in scheduler.report_lines():
+                scheduler_log.info(line)
+        if MULTIPROCESS:
+            for child in children:
+                child.terminate()  # The display process shows the goodbye screen
+            for child in children:
+                child.join(5)
+            if snapshot:
+                snapshot.close()
+        else:
+            lcd_string("System Shutdown", LCD_LINE_1)
+            lcd_string("Goodbye!", LCD_LINE_2)
+            time.sleep(1)
+        
+        # Clean up and close
+        if 'pwm' in globals():
+            pwm.stop()
+        GPIO.cleanup()
+        startup_log.info("System shut down, GPIO cleaned up")
+        shutdown_logging()
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Custom glyph cache for HD44780-style LCDs (1602A)
+The controller has 8 CGRAM slots for user-defined 5x8 characters. Text
+passed to GlyphCache.encode_page() may contain the symbols in GLYPH_CHARS
+(degree sign, partial bar blocks, trend arrows). Each symbol is mapped to
+a slot, and a glyph is uploaded only if it is not already resident. When
+all slots are taken, the least recently used glyph not needed by the
+page being drawn is replaced. Pages that reuse loaded glyphs send
+exactly the same bytes as plain text.
+
+No hardware access here: the cache talks to the display through a
+write(byte, mode) callable, normally lcd_byte().
+'''
+
+from collections import OrderedDict
+
+CGRAM_SLOTS = 8
+CGRAM_SET = 0x40     # Set CGRAM address command, slot n starts at 0x40 | n << 3
+FULL_BLOCK = 0xFF    # Solid 5x8 block in the character ROM, no CGRAM needed
+UNKNOWN_CHAR = ord("?")
+
+# 5x8 bitmaps, one byte per row, low 5 bits used
+GLYPHS = {
+    "degree":     (0b01100, 0b10010, 0b10010, 0b01100, 0b00000, 0b00000, 0b00000, 0b00000),
+    "bar1":       (0b10000,) * 8,
+    "bar2":       (0b11000,) * 8,
+    "bar3":       (0b11100,) * 8,
+    "bar4":       (0b11110,) * 8,
+    "arrow_up":   (0b00100, 0b01110, 0b10101, 0b00100, 0b00100, 0b00100, 0b00100, 0b00000),
+    "arrow_down": (0b00100, 0b00100, 0b00100, 0b00100, 0b10101, 0b01110, 0b00100, 0b00000),
+    "arrow_flat": (0b00000, 0b00100, 0b00010, 0b11111, 0b00010, 0b00100, 0b00000, 0b00000),
+}
+
+# Characters that can be used in page text and the glyph each one needs
+GLYPH_CHARS = {
+    "°": "degree",
+    "▎": "bar1",
+    "▌": "bar2",
+    "▋": "bar3",
+    "▊": "bar4",
+    "↑": "arrow_up",
+    "↓": "arrow_down",
+    "→": "arrow_flat",
+}
+PARTIAL_BARS = "▎▌▋▊"  # 1 to 4 of the 5 pixel columns filled
+
+def bar_graph(fraction, width):
+    '''Horizontal bar of `width` characters, filled to fraction (0-1), in pixel columns'''
+    columns = int(round(max(0.0, min(1.0, fraction)) * width * 5))
+    full, partial = divmod(columns, 5)
+    bar = "█" * full
+    if partial:
+        bar += PARTIAL_BARS[partial - 1]
+    return bar.ljust(width)
+
+def trend_arrow(delta, threshold=0.5):
+    '''Arrow for a change in a reading: rising, falling or steady'''
+    if delta > threshold:
+        return "↑"
+    if delta < -threshold:
+        return "↓"
+    return "→"
+
+class GlyphCache:
+    '''Track which glyphs are resident in CGRAM and upload them on demand'''
+
+    def __init__(self, write, cmd_mode=False, chr_mode=True, slots=CGRAM_SLOTS):
+        self.write = write
+        self.cmd_mode = cmd_mode
+        self.chr_mode = chr_mode
+        self.slots = slots
+        self.resident = OrderedDict()  # Glyph name -> slot, least recently used first
+        self.uploads = 0
+        self.hits = 0
+        self.evictions = 0
+        self.overflows = 0  # Glyphs dropped because one page needed more than `slots`
+
+    def _upload(self, name, slot):
+        self.write(CGRAM_SET | (slot << 3), self.cmd_mode)
+        for row in GLYPHS[name]:
+            self.write(row, self.chr_mode)
+        self.uploads += 1
+
+    def _slot_for(self, name, pinned):
+        '''Slot holding name, uploading it (and evicting if needed) on a miss'''
+        slot = self.resident.get(name)
+        if slot is not None:
+            self.resident.move_to_end(name)
+            self.hits += 1
+            return slot
+        if len(self.resident) < self.slots:
+            slot = len(self.resident)
+        else:
+            victim = next((old for old in self.resident if old not in pinned), None)
+            if victim is None:
+                self.overflows += 1
+                return None
+            slot = self.resident.pop(victim)
+            self.evictions += 1
+        self._upload(name, slot)
+        self.resident[name] = slot
+        return slot
+
+    def encode_page(self, lines):
+        '''Turn the text lines of one page into character codes
+
+        Every glyph the page needs is made resident first. Glyphs used by
+        this page are never evicted to make room for each other.
+        Returns one list of codes per line.
+        '''
+        pinned = set()
+        for line in lines:
+            for char in line:
+                name = GLYPH_CHARS.get(char)
+                if name:
+                    pinned.add(name)
+        # Load in order of first use so a page that fits always succeeds
+        slots = {}
+        for line in lines:
+            for char in line:
+                name = GLYPH_CHARS.get(char)
+                if name and name not in slots:
+                    slots[name] = self._slot_for(name, pinned)
+
+        pages = []
+        for line in lines:
+            codes = []
+            for char in line:
+                name = GLYPH_CHARS.get(char)
+                if name:
+                    slot = slots[name]
+                    codes.append(UNKNOWN_CHAR if slot is None else slot)
+                elif char == "█":
+                    codes.append(FULL_BLOCK)
+                elif ord(char) < 128:
+                    codes.append(ord(char))
+                else:
+                    codes.append(UNKNOWN_CHAR)
+            pages.append(codes)
+        return pages
+
+    def reset(self):
+        '''Forget resident glyphs (after the LCD has been re-initialized)'''
+        self.resident.clear()
+
+    def stats(self):
+        return {"uploads": self.uploads, "hits": self.hits, "evictions": self.evictions,
+                "overflows": self.overflows, "resident": list(self.resident)}
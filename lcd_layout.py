@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Page layout engine for character LCDs (16x2, 20x4, ...)
+Pages are declared as lines of str.format templates whose fields name
+live values, e.g. Page("climate", ["Temp: {temp}°C", "Hum: {humidity}%"]).
+The program pushes new values with Layout.update() and calls
+Layout.refresh() every tick. The display is rewritten only when the
+rotation slot changes or one of the values used by the visible pages
+changes.
+
+Taller displays show several pages at once: consecutive pages are packed
+into one screen while they fit, so the same declaration gives four
+rotating screens on a 16x2 and two on a 20x4.
+
+No hardware access here: screens go out through a write(rows) callable,
+rows being (text, line address) pairs (function_3_1.lcd_page).
+'''
+
+import string
+
+class Geometry:
+    '''Character display size and the DDRAM address of each line'''
+
+    def __init__(self, width, line_addresses):
+        self.width = width
+        self.line_addresses = tuple(line_addresses)
+        self.height = len(self.line_addresses)
+
+    def __repr__(self):
+        return f"{self.width}x{self.height}"
+
+GEOMETRIES = {
+    "16x2": Geometry(16, (0x80, 0xC0)),
+    "16x4": Geometry(16, (0x80, 0xC0, 0x90, 0xD0)),
+    "20x2": Geometry(20, (0x80, 0xC0)),
+    "20x4": Geometry(20, (0x80, 0xC0, 0x94, 0xD4)),
+}
+
+class Page:
+    '''Named group of template lines; fields are looked up in the live values'''
+
+    def __init__(self, name, lines):
+        self.name = name
+        self.lines = list(lines)
+        self.fields = []
+        for line in self.lines:
+            for _, field, _, _ in string.Formatter().parse(line):
+                if field and field not in self.fields:
+                    self.fields.append(field)
+
+    def render(self, values):
+        return [line.format(**values) for line in self.lines]
+
+class Layout:
+    '''Rotate pages on a display, redrawing only when something visible changed'''
+
+    def __init__(self, write, geometry, pages, rotation_period=5.0):
+        if isinstance(geometry, str):
+            geometry = GEOMETRIES[geometry]
+        self.write = write
+        self.geometry = geometry
+        self.rotation_period = rotation_period
+        self.values = {}
+        self.screens = self._pack(pages)
+        self.alert = None          # Page shown instead of the rotation while set
+        self.shown = None          # (screen key, bound values) currently on the display
+        self.redraws = 0
+        self.skipped = 0
+
+    def _pack(self, pages):
+        '''Group consecutive pages into screens that fit the display height'''
+        screens = []
+        current = []
+        for page in pages:
+            if len(page.lines) > self.geometry.height:
+                raise ValueError(f"Page {page.name} has {len(page.lines)} lines, "
+                                 f"display {self.geometry} has {self.geometry.height}")
+            if sum(len(p.lines) for p in current) + len(page.lines) > self.geometry.height:
+                screens.append(current)
+                current = []
+            current.append(page)
+        if current:
+            screens.append(current)
+        return screens
+
+    def update(self, **values):
+        self.values.update(values)
+
+    def set_alert(self, lines):
+        '''Show fixed lines (e.g. a sensor error) until set_alert(None)'''
+        self.alert = Page("alert", [line.replace("{", "{{").replace("}", "}}") for line in lines]) if lines else None
+
+    def screen_for(self, current_time):
+        if self.alert:
+            return "alert", [self.alert]
+        slot = int(current_time // self.rotation_period) % len(self.screens)
+        return slot, self.screens[slot]
+
+    def refresh(self, current_time):
+        '''Redraw the display if the slot or a bound value changed; return True if redrawn'''
+        key, pages = self.screen_for(current_time)
+        bound = tuple(self.values.get(field) for page in pages for field in page.fields)
+        if self.shown == (key, bound):
+            self.skipped += 1
+            return False
+        try:
+            lines = [line for page in pages for line in page.render(self.values)]
+        except KeyError:
+            return False  # A bound value has not been published yet
+        lines += [""] * (self.geometry.height - len(lines))
+        width = self.geometry.width
+        self.write([(line.ljust(width)[:width], address)
+                    for line, address in zip(lines, self.geometry.line_addresses)])
+        self.shown = (key, bound)
+        self.redraws += 1
+        return True
+
+    def invalidate(self):
+        '''Force a redraw on the next refresh (after the display was cleared or reset)'''
+        self.shown = None
+
+    def stats(self):
+        return {"geometry": repr(self.geometry), "screens": len(self.screens),
+                "redraws": self.redraws, "skipped": self.skipped}
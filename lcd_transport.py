@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+I2C transport for HD44780 character LCDs behind a PCF8574 backpack
+The backpack drives all LCD pins from one 8-bit port, so a whole nibble
+(RS, E and D4-D7 together) is one port byte. Each byte sent to the LCD
+turns into a few port states (E high, then E low, per nibble). The states
+are buffered and written as SMBus block writes, several LCD bytes per
+I2C transaction, instead of a dozen Python GPIO.output() calls per byte.
+
+Backpack wiring (the common PCF8574/PCF8574A modules):
+  P0 = RS, P1 = RW (kept low), P2 = E, P3 = backlight, P4-P7 = D4-D7
+
+Any object with write_i2c_block_data(address, register, data), as in
+smbus/smbus2, works as the bus. FakeBus records transactions and can
+decode them back into LCD bytes, for testing without hardware.
+'''
+
+import time
+
+I2C_ADDRESS = 0x27       # PCF8574; PCF8574A backpacks are usually 0x3F
+I2C_BLOCK_SIZE = 32      # SMBus block limit, plus the register byte = 33 port states per write
+SLOW_COMMAND_DELAY = 0.005  # Clear/home (1.52ms) and the init sequence (4.1ms)
+
+PIN_RS = 0x01
+PIN_E = 0x04
+PIN_BACKLIGHT = 0x08
+
+SLOW_COMMANDS = (0x01, 0x02, 0x03, 0x32, 0x33)  # Clear, home, 4-bit init sequence
+
+def open_bus(bus_number=1):
+    '''Open /dev/i2c-N with smbus2 (or the older smbus module)'''
+    try:
+        from smbus2 import SMBus
+    except ImportError:
+        from smbus import SMBus
+    return SMBus(bus_number)
+
+class PCF8574Transport:
+    '''Buffer LCD bytes as PCF8574 port states and send them in block writes'''
+
+    def __init__(self, bus, address=I2C_ADDRESS, backlight=True, sleep=time.sleep):
+        self.bus = bus
+        self.address = address
+        self.backlight = PIN_BACKLIGHT if backlight else 0
+        self.sleep = sleep
+        self.pending = bytearray()
+        self.state = self.backlight  # Last port state written (or buffered)
+        self.transactions = 0
+        self.bytes_sent = 0
+
+    def _nibble(self, nibble, rs):
+        port = (nibble << 4) | rs | self.backlight
+        if (self.state ^ port) & PIN_RS:
+            # RS must settle before E rises
+            self.pending.append(port)
+        # Data is latched on the falling edge of E
+        self.pending.append(port | PIN_E)
+        self.pending.append(port)
+        self.state = port
+
+    def send(self, bits, mode):
+        '''Queue one byte; mode True = character data, False = command'''
+        rs = PIN_RS if mode else 0
+        self._nibble(bits >> 4, rs)
+        self._nibble(bits & 0x0F, rs)
+        if not mode and bits in SLOW_COMMANDS:
+            # Nothing may follow until the controller has finished
+            self.flush()
+            self.sleep(SLOW_COMMAND_DELAY)
+        elif len(self.pending) > I2C_BLOCK_SIZE:
+            self._write_blocks(full_only=True)
+
+    def _write_blocks(self, full_only=False):
+        step = I2C_BLOCK_SIZE + 1
+        while len(self.pending) >= (step if full_only else 1):
+            block = self.pending[:step]
+            del self.pending[:step]
+            self.bus.write_i2c_block_data(self.address, block[0], list(block[1:]))
+            self.transactions += 1
+            self.bytes_sent += len(block)
+
+    def flush(self):
+        '''Write everything still buffered'''
+        self._write_blocks()
+
+    def set_backlight(self, on):
+        self.backlight = PIN_BACKLIGHT if on else 0
+        self.state = (self.state & ~PIN_BACKLIGHT) | self.backlight
+        self.pending.append(self.state)
+        self.flush()
+
+    def stats(self):
+        return {"transactions": self.transactions, "bytes": self.bytes_sent}
+
+class FakeBus:
+    '''Stand-in for an SMBus that records every block write'''
+
+    def __init__(self):
+        self.transactions = []  # (address, port states)
+
+    def write_i2c_block_data(self, address, register, data):
+        if len(data) > I2C_BLOCK_SIZE:
+            raise ValueError("SMBus block writes are limited to 32 bytes")
+        self.transactions.append((address, bytes([register] + list(data))))
+
+    def port_states(self):
+        return b"".join(states for _, states in self.transactions)
+
+    def decode(self):
+        '''Rebuild the (byte, mode) sequence the LCD would have latched'''
+        decoded = []
+        high = None
+        previous = 0
+        for port in self.port_states():
+            if previous & PIN_E and not port & PIN_E:
+                nibble = previous >> 4
+                if high is None:
+                    high = nibble
+                else:
+                    decoded.append(((high << 4) | nibble, bool(previous & PIN_RS)))
+                    high = None
+            previous = port
+        return decoded
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+pwm_backend.py - 可替换的舵机PWM后端
+1. HardwarePWM：通过 /sys/class/pwm/pwmchipN 使用内核硬件PWM，纳秒级占空比精度，不占用CPU
+2. SoftwarePWM：RPi.GPIO 的软件PWM，作为没有硬件PWM时的后备方案
+
+两者都提供与 GPIO.PWM 相同的 start()/ChangeDutyCycle()/ChangeFrequency()/stop() 接口，
+原有代码无需修改即可切换。硬件PWM需要在 /boot/config.txt 中启用 dtoverlay=pwm 或 pwm-2chan。
+sysfs 根目录可以指定为一个按 sysfs 结构布置的临时目录，便于在电脑上测试。
+'''
+
+import os
+import time
+
+SYSFS_PWM_ROOT = '/sys/class/pwm'
+
+# 可输出硬件PWM的GPIO（BCM编号）-> (pwmchip编号, 通道)
+HARDWARE_PWM_CHANNELS = {
+    12: (0, 0),
+    18: (0, 0),
+    13: (0, 1),
+    19: (0, 1),
+}
+
+EXPORT_TIMEOUT = 1.0  # 等待导出的通道目录出现（udev设置权限）的最长时间（秒）
+
+# 内核硬件PWM（sysfs接口）
+class HardwarePWM:
+    hardware = True
+
+    def __init__(self, chip, channel, frequency, sysfs_root=SYSFS_PWM_ROOT):
+        self.chip_path = os.path.join(sysfs_root, f'pwmchip{chip}')
+        self.path = os.path.join(self.chip_path, f'pwm{channel}')
+        if not os.path.isdir(self.path):
+            self._write_file(os.path.join(self.chip_path, 'export'), channel)
+            deadline = time.monotonic() + EXPORT_TIMEOUT
+            while not os.path.isdir(self.path):
+                if time.monotonic() > deadline:
+                    raise OSError(f"无法导出PWM通道: {self.path}")
+                time.sleep(0.01)
+        self.channel = channel
+        self.period_ns = 0
+        self.duty_ns = 0
+        self.duty_percent = 0.0  # 当前占空比（百分比），改变频率时保持不变
+        self._set_period(frequency)
+
+    @staticmethod
+    def _write_file(path, value):
+        with open(path, 'w') as f:
+            f.write(str(value))
+
+    def _write(self, name, value):
+        self._write_file(os.path.join(self.path, name), value)
+
+    def _set_period(self, frequency):
+        period_ns = int(round(1e9 / frequency))
+        # 与GPIO.PWM一样保持占空比百分比，按新周期重新计算占空时间。
+        # 内核要求占空时间不大于周期：周期变短时先写占空时间，变长时先写周期
+        duty_ns = int(round(period_ns * self.duty_percent / 100))
+        if period_ns < self.period_ns:
+            self._write_duty_ns(duty_ns)
+            self._write('period', period_ns)
+        else:
+            self._write('period', period_ns)
+            self._write_duty_ns(duty_ns)
+        self.period_ns = period_ns
+
+    def _write_duty_ns(self, duty_ns):
+        if duty_ns != self.duty_ns:
+            self._write('duty_cycle', duty_ns)
+            self.duty_ns = duty_ns
+
+    # 直接设置高电平时间（纳秒）
+    def set_pulse_width_ns(self, pulse_ns):
+        pulse_ns = max(0, min(int(pulse_ns), self.period_ns))
+        self.duty_percent = pulse_ns / self.period_ns * 100
+        self._write_duty_ns(pulse_ns)
+
+    # 设置高电平时间（微秒，可带小数）
+    def set_pulse_width_us(self, pulse_us):
+        self.set_pulse_width_ns(round(pulse_us * 1000))
+
+    # 与GPIO.PWM兼容的接口，占空比为百分比
+    def start(self, duty_cycle):
+        self.ChangeDutyCycle(duty_cycle)
+        self._write('enable', 1)
+
+    def ChangeDutyCycle(self, duty_cycle):
+        self.set_pulse_width_ns(round(self.period_ns * duty_cycle / 100))
+        self.duty_percent = max(0.0, min(float(duty_cycle), 100.0))  # 不受纳秒取整影响
+
+    def ChangeFrequency(self, frequency):
+        self._set_period(frequency)
+
+    def stop(self):
+        self._write('enable', 0)
+        try:
+            self._write_file(os.path.join(self.chip_path, 'unexport'), self.channel)
+        except OSError:
+            pass
+
+# RPi.GPIO软件PWM的包装，额外提供按脉宽设置的接口
+class SoftwarePWM:
+    hardware = False
+
+    def __init__(self, pin, frequency):
+        import RPi.GPIO as GPIO
+        GPIO.setup(pin, GPIO.OUT)
+        self.pwm = GPIO.PWM(pin, frequency)
+        self.period_ns = 1e9 / frequency
+
+    def set_pulse_width_ns(self, pulse_ns):
+        self.pwm.ChangeDutyCycle(pulse_ns / self.period_ns * 100)
+
+    def set_pulse_width_us(self, pulse_us):
+        self.set_pulse_width_ns(pulse_us * 1000)
+
+    def start(self, duty_cycle):
+        self.pwm.start(duty_cycle)
+
+    def ChangeDutyCycle(self, duty_cycle):
+        self.pwm.ChangeDutyCycle(duty_cycle)
+
+    def ChangeFrequency(self, frequency):
+        self.pwm.ChangeFrequency(frequency)
+        self.period_ns = 1e9 / frequency
+
+    def stop(self):
+        self.pwm.stop()
+
+# 创建PWM输出
+# backend: 'auto'（有硬件PWM就用，否则用软件PWM）、'hardware' 或 'software'
+def create_pwm(pin, frequency=50, backend='auto', sysfs_root=SYSFS_PWM_ROOT):
+    if backend not in ('auto', 'hardware', 'software'):
+        raise ValueError(f"未知的PWM后端: {backend}")
+
+    if backend != 'software' and pin in HARDWARE_PWM_CHANNELS:
+        chip, channel = HARDWARE_PWM_CHANNELS[pin]
+        try:
+            pwm = HardwarePWM(chip, channel, frequency, sysfs_root)
+            print(f"GPIO{pin} 使用硬件PWM (pwmchip{chip}/pwm{channel})")
+            return pwm
+        except OSError as e:
+            if backend == 'hardware':
+                raise
+            print(f"硬件PWM不可用，改用软件PWM: {e}")
+    elif backend == 'hardware':
+        raise ValueError(f"GPIO{pin} 不支持硬件PWM")
+
+    return SoftwarePWM(pin, frequency)
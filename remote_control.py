@@ -1,240 +1,682 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-
-'''
-servo_control.py - 伺服电机网页远程控制的纯Python后端API服务器
-使用Python内置的http.server模块提供API服务
-'''
-
-import RPi.GPIO as GPIO
-import time
-import socket
-import json
-import os
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
-
-# 伺服电机引脚设置
-SERVO_PIN = 18  # 使用GPIO18作为PWM输出引脚，可以根据实际连接修改
-
-# 伺服电机脉冲宽度范围（微秒）
-MIN_PULSE_WIDTH = 1000  # 对应0度
-MAX_PULSE_WIDTH = 2000  # 对应180度
-MID_PULSE_WIDTH = 1500  # 对应90度
-
-# Web服务器端口
-PORT = 5500
-
-# 存储舵机当前角度
-current_angle = 90
-
-# 将脉冲宽度转换为占空比
-def pulse_width_to_duty_cycle(pulse_width):
-    return pulse_width / 20000 * 100
-
-# 将角度转换为占空比
-def angle_to_duty_cycle(angle):
-    # 限制在0-180度范围内
-    if angle < 0:
-        angle = 0
-    elif angle > 180:
-        angle = 180
-    
-    # 将角度映射到脉冲宽度
-    pulse_width = MIN_PULSE_WIDTH + (MAX_PULSE_WIDTH - MIN_PULSE_WIDTH) * angle / 180
-    
-    # 将脉冲宽度转换为占空比
-    duty_cycle = pulse_width_to_duty_cycle(pulse_width)
-    return duty_cycle
-
-# 初始化GPIO和PWM
-def setup():
-    GPIO.setwarnings(False)
-    GPIO.setmode(GPIO.BCM)
-    GPIO.setup(SERVO_PIN, GPIO.OUT)
-    
-    # 创建PWM实例，频率为50Hz（舵机标准频率）
-    pwm = GPIO.PWM(SERVO_PIN, 50)
-    pwm.start(0)  # 以占空比0开始（不转动）
-    return pwm
-
-# 获取树莓派的IP地址
-def get_ip_address():
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    try:
-        # 不需要真的发送数据，只是需要建立路由
-        s.connect(('10.255.255.255', 1))
-        IP = s.getsockname()[0]
-    except Exception:
-        IP = '127.0.0.1'
-    finally:
-        s.close()
-    return IP
-
-# 设置伺服电机角度
-def set_servo_angle(angle):
-    global current_angle
-    try:
-        angle = int(angle)
-        if angle < 0 or angle > 180:
-            return {"status": "error", "message": "角度必须在0-180之间"}
-        
-        duty_cycle = angle_to_duty_cycle(angle)
-        pwm.ChangeDutyCycle(duty_cycle)
-        current_angle = angle
-        time.sleep(0.5)  # 等待舵机移动到位
-        pwm.ChangeDutyCycle(0)  # 停止PWM信号，防止舵机抖动
-        
-        return {"status": "success", "angle": angle}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
-
-# 设置预设位置
-def set_preset_position(position):
-    if position == 'left':
-        angle = 0
-    elif position == 'center':
-        angle = 90
-    elif position == 'right':
-        angle = 180
-    else:
-        return {"status": "error", "message": "无效的预设位置"}
-    
-    result = set_servo_angle(angle)
-    if result["status"] == "success":
-        result["position"] = position
-    
-    return result
-
-# 执行扫描动作
-def sweep_servo(start_angle, end_angle, step, delay):
-    global current_angle
-    try:
-        start_angle = int(start_angle)
-        end_angle = int(end_angle)
-        step = int(step)
-        delay = float(delay)
-        
-        if start_angle < 0 or start_angle > 180 or end_angle < 0 or end_angle > 180:
-            return {"status": "error", "message": "角度必须在0-180之间"}
-        
-        # 确定步进方向
-        if start_angle <= end_angle:
-            angle_range = range(start_angle, end_angle + 1, step)
-        else:
-            angle_range = range(start_angle, end_angle - 1, -step)
-        
-        # 执行扫描
-        for angle in angle_range:
-            duty_cycle = angle_to_duty_cycle(angle)
-            pwm.ChangeDutyCycle(duty_cycle)
-            current_angle = angle
-            time.sleep(delay)
-        
-        # 停止PWM信号，防止舵机抖动
-        pwm.ChangeDutyCycle(0)
-        
-        return {"status": "success", "start": start_angle, "end": end_angle}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
-
-# HTTP请求处理器
-class ServoRequestHandler(BaseHTTPRequestHandler):
-    def _set_headers(self, content_type='application/json'):
-        self.send_response(200)
-        self.send_header('Content-type', content_type)
-        self.send_header('Access-Control-Allow-Origin', '*')  # 允许跨域请求
-        self.end_headers()
-    
-    def _set_error_headers(self, error_code=400):
-        self.send_response(error_code)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-    
-    def do_GET(self):
-        parsed_path = urlparse(self.path)
-        path = parsed_path.path
-        
-        # 只处理API请求
-        if path == '/api/get_angle':
-            self._set_headers('application/json')
-            response = json.dumps({"angle": current_angle})
-            self.wfile.write(response.encode())
-        else:
-            self._set_error_headers(404)
-            self.wfile.write(json.dumps({"status": "error", "message": "只提供API服务"}).encode())
-    
-    def do_POST(self):
-        content_length = int(self.headers['Content-Length'])
-        post_data = self.rfile.read(content_length)
-        parsed_path = urlparse(self.path)
-        path = parsed_path.path
-        
-        try:
-            data = json.loads(post_data.decode())
-            
-            if path == '/api/set_angle':
-                angle = data.get('angle', 90)
-                response = set_servo_angle(angle)
-                
-            elif path == '/api/preset':
-                position = data.get('position', 'center')
-                response = set_preset_position(position)
-                
-            elif path == '/api/sweep':
-                start_angle = data.get('start', 0)
-                end_angle = data.get('end', 180)
-                step = data.get('step', 10)
-                delay = data.get('delay', 0.1)
-                response = sweep_servo(start_angle, end_angle, step, delay)
-                
-            else:
-                self._set_error_headers(404)
-                response = {"status": "error", "message": "未知的API端点"}
-                
-            self._set_headers('application/json')
-            self.wfile.write(json.dumps(response).encode())
-            
-        except json.JSONDecodeError:
-            self._set_error_headers(400)
-            self.wfile.write(json.dumps({"status": "error", "message": "无效的JSON数据"}).encode())
-    
-    def do_OPTIONS(self):
-        # 处理预检请求
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
-
-# 主函数
-def main():
-    global pwm
-    
-    try:
-        # 设置伺服电机
-        pwm = setup()
-        
-        # 获取IP地址
-        ip_address = get_ip_address()
-        
-        # 启动Web服务器
-        server_address = ('', PORT)
-        httpd = HTTPServer(server_address, ServoRequestHandler)
-        print(f"伺服电机API服务启动！")
-        print(f"API地址: http://{ip_address}:{PORT}")
-        httpd.serve_forever()
-        
-    except KeyboardInterrupt:
-        print("\n程序已退出")
-    finally:
-        # 停止PWM并清理GPIO
-        try:
-            pwm.stop()
-            GPIO.cleanup()
-        except:
-            pass
-
-if __name__ == '__main__':
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+servo_control.py - 伺服电机网页远程控制的纯Python后端API服务器
+使用Python内置的http.server模块提供API服务
+'''
+
+import RPi.GPIO as GPIO
+import dht11
+import time
+import socket
+import json
+import math
+import os
+import threading
+import ws_protocol as ws
+from pwm_backend import create_pwm
+from servo_registry import Servo, ServoRegistry
+from servo_calibration import CALIBRATION_FILE, load_profiles
+from sensor_snapshot import SensorSnapshot, etag_matches
+from shared_snapshot import SharedSnapshot
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# 伺服电机引脚设置
+SERVO_PIN = 18  # 使用GPIO18作为PWM输出引脚，可以根据实际连接修改
+
+# 舵机校准：从校准文件中选用的配置名，决定角度->脉宽映射和角度范围
+# standard: 0-180度对应1000-2000微秒
+SERVO_PROFILE = 'standard'
+
+# 主舵机的角度范围，setup()时由校准配置设置
+MIN_ANGLE = 0
+MAX_ANGLE = 180
+
+# 其他通风口舵机（主舵机id为main，使用SERVO_PIN和SERVO_PROFILE）
+# 每项格式：{"id": "vent2", "pin": 19, "profile": "standard"}
+EXTRA_SERVOS = []
+
+# 传感器引脚，供 /api/sensors 使用
+# 与function_3_1.py同时运行时设为False，避免两个进程同时读取DHT11
+SENSORS_ENABLED = True
+DHT_PIN = 4    # DHT11温湿度传感器
+PIR_PIN = 17   # PIR人体传感器
+MQ2_PIN = 16   # MQ-2烟雾传感器（低电平表示检测到气体）
+# 设为function_3_1.py多进程模式的SNAPSHOT_NAME时，从它的共享内存快照读取传感器，
+# 本进程不再访问传感器GPIO（function_3_1.py需同时运行）
+SENSOR_SNAPSHOT = None
+
+# PWM后端：'auto'（优先使用内核硬件PWM）、'hardware' 或 'software'（RPi.GPIO软件PWM）
+PWM_BACKEND = 'auto'
+
+# Web服务器端口
+PORT = 5500
+
+# 存储舵机当前角度
+current_angle = 90
+
+# 保证同一时间只有一个请求在驱动舵机（服务器为多线程）
+servo_lock = threading.Lock()
+
+# 保持连接（keep-alive）的空闲超时时间（秒）
+KEEP_ALIVE_TIMEOUT = 30
+
+# 预序列化的响应
+# 常用响应预先编码为bytes，避免每次请求都执行json.dumps(...).encode()
+NOT_FOUND_BODY = json.dumps({"status": "error", "message": "只提供API服务"}).encode()
+UNKNOWN_ENDPOINT_BODY = json.dumps({"status": "error", "message": "未知的API端点"}).encode()
+INVALID_JSON_BODY = json.dumps({"status": "error", "message": "无效的JSON数据"}).encode()
+
+# 当前角度响应缓存，在设置角度时与current_angle一起更新（加锁），
+# 读取方只取缓存，不会把旧角度的响应写回缓存
+angle_response_cache = json.dumps({"angle": current_angle}).encode()
+angle_response_lock = threading.Lock()
+
+def set_current_angle(angle):
+    global current_angle, angle_response_cache
+    with angle_response_lock:
+        current_angle = angle
+        angle_response_cache = json.dumps({"angle": angle}).encode()
+
+def get_angle_response():
+    return angle_response_cache
+
+# 校验主舵机角度，返回整数角度，超出范围或不是有限数值时抛出ValueError
+def check_angle(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValueError("角度必须是有限数值")
+    angle = int(value)
+    if angle < MIN_ANGLE or angle > MAX_ANGLE:
+        raise ValueError(f"角度必须在{MIN_ANGLE}到{MAX_ANGLE}之间")
+    return angle
+
+# 舵机注册表，所有舵机由同一个定时循环驱动
+registry = ServoRegistry()
+
+# 传感器快照：后台线程读取传感器，请求只读快照
+dht_sensor = None
+
+def read_sensors():
+    if shared_sensors:
+        _, sample = shared_sensors.read()
+        if not sample or not sample["time"]:
+            return {}  # 采集进程还没有有效数据
+        return {"temperature": sample["temp"], "humidity": sample["humidity"],
+                "motion": sample["motion"], "gas_detected": sample["gas"]}
+    readings = {
+        "motion": bool(GPIO.input(PIR_PIN)),
+        "gas_detected": GPIO.input(MQ2_PIN) == 0,
+    }
+    result = dht_sensor.read()
+    if result.is_valid():  # 读取失败时保留上一次的温湿度
+        readings["temperature"] = result.temperature
+        readings["humidity"] = result.humidity
+    return readings
+
+sensors = SensorSnapshot(read_sensors, ("temperature", "humidity", "motion", "gas_detected", "vent_angle"))
+
+shared_sensors = None  # SENSOR_SNAPSHOT对应的共享内存快照
+
+def setup_sensors():
+    global dht_sensor, shared_sensors
+    if SENSOR_SNAPSHOT:
+        shared_sensors = SharedSnapshot(SENSOR_SNAPSHOT)
+    else:
+        GPIO.setup(PIR_PIN, GPIO.IN)
+        GPIO.setup(MQ2_PIN, GPIO.IN)
+        dht_sensor = dht11.DHT11(pin=DHT_PIN)
+    sensors.start()
+
+# 主舵机目标角度变化时同步旧接口使用的current_angle
+def _on_main_target(angle):
+    set_current_angle(angle)
+    sensors.update(vent_angle=angle)
+
+# 初始化GPIO和PWM
+def setup():
+    global MIN_ANGLE, MAX_ANGLE
+    GPIO.setwarnings(False)
+    GPIO.setmode(GPIO.BCM)
+    
+    # 加载校准配置，编译为查找表
+    profiles = load_profiles(CALIBRATION_FILE)
+    calibration = profiles[SERVO_PROFILE]
+    MIN_ANGLE, MAX_ANGLE = calibration.min_angle, calibration.max_angle
+    # 扩展角度范围的舵机额外提供两端的预设位置
+    if MIN_ANGLE < 0:
+        PRESET_ANGLES['far_left'] = MIN_ANGLE
+    if MAX_ANGLE > 180:
+        PRESET_ANGLES['far_right'] = MAX_ANGLE
+    
+    # 创建PWM实例，频率为50Hz（舵机标准频率）
+    # 硬件PWM不能再用GPIO.setup把引脚设为普通输出，软件PWM后端会自行设置
+    pwm = create_pwm(SERVO_PIN, 50, PWM_BACKEND)
+    pwm.start(0)  # 以占空比0开始（不转动）
+    
+    # 注册主舵机和其他舵机
+    sensors.update(vent_angle=current_angle)
+    registry.add(Servo('main', SERVO_PIN, home=current_angle, pwm=pwm,
+                       on_target=_on_main_target, calibration=calibration))
+    for config in EXTRA_SERVOS:
+        registry.add(Servo(config['id'], config['pin'], backend=PWM_BACKEND,
+                           calibration=profiles[config.get('profile', SERVO_PROFILE)]))
+    return pwm
+
+# 获取树莓派的IP地址
+def get_ip_address():
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        # 不需要真的发送数据，只是需要建立路由
+        s.connect(('10.255.255.255', 1))
+        IP = s.getsockname()[0]
+    except Exception:
+        IP = '127.0.0.1'
+    finally:
+        s.close()
+    return IP
+
+# 舵机运动控制器：多个客户端同时发送目标角度时只执行最新的一个
+# 等待中的旧目标被新目标覆盖（后写者胜出），移动到当前角度的命令直接跳过，不再等待
+class MotionController:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.pending = None  # 等待执行的最新命令
+        self.stats = {"submitted": 0, "executed": 0, "coalesced": 0, "skipped": 0}
+        self.thread = threading.Thread(target=self._run, name='motion-controller', daemon=True)
+    
+    def start(self):
+        self.thread.start()
+    
+    # 提交目标角度，wait为True时等待命令执行、跳过或被覆盖后返回结果
+    def submit(self, angle, wait=True):
+        command = {"angle": angle, "done": threading.Event(), "result": None}
+        with self.cond:
+            self.stats["submitted"] += 1
+            if self.pending is not None:
+                # 尚未执行的旧命令被覆盖，立即通知其等待者
+                self.stats["coalesced"] += 1
+                self._finish(self.pending, {"status": "success", "angle": self.pending["angle"],
+                                            "coalesced": True, "superseded_by": angle})
+            self.pending = command
+            self.cond.notify()
+        if wait:
+            command["done"].wait()
+        return command["result"]
+    
+    def get_stats(self):
+        with self.cond:
+            return dict(self.stats)
+    
+    def _finish(self, command, result):
+        command["result"] = result
+        command["done"].set()
+    
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.pending is None:
+                    self.cond.wait()
+                command = self.pending
+                self.pending = None
+            
+            angle = command["angle"]
+            if angle == current_angle:
+                # 已经在目标角度，无需移动也无需等待
+                with self.cond:
+                    self.stats["skipped"] += 1
+                self._finish(command, {"status": "success", "angle": angle, "skipped": True})
+                continue
+            
+            try:
+                # 由注册表驱动主舵机，等待到位；到位后注册表会停止PWM信号防止抖动
+                with servo_lock:
+                    registry.move({'main': angle})
+                with self.cond:
+                    self.stats["executed"] += 1
+                self._finish(command, {"status": "success", "angle": angle})
+            except Exception as e:
+                self._finish(command, {"status": "error", "message": str(e)})
+
+motion = MotionController()
+
+# 设置伺服电机角度
+def set_servo_angle(angle):
+    try:
+        angle = check_angle(angle)
+        return motion.submit(angle)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+# 协调运动多个舵机：targets为 {舵机ID: 角度}，全部同时开始、同时到达
+# 未知的舵机ID抛出KeyError，由请求处理器返回404
+def move_servos(targets, duration=None):
+    if not isinstance(targets, dict):
+        return {"status": "error", "message": "targets必须是 {舵机ID: 角度} 对象"}
+    try:
+        if 'main' in targets:
+            # 主舵机同时被其他接口驱动，等待正在执行的动作完成
+            with servo_lock:
+                return registry.move(targets, duration)
+        return registry.move(targets, duration)
+    except (ValueError, TypeError, OverflowError) as e:
+        return {"status": "error", "message": str(e)}
+
+# 预设位置对应的角度
+PRESET_ANGLES = {'left': 0, 'center': 90, 'right': 180}
+
+# 设置预设位置
+def set_preset_position(position):
+    if position not in PRESET_ANGLES:
+        return {"status": "error", "message": "无效的预设位置"}
+    angle = PRESET_ANGLES[position]
+    
+    result = set_servo_angle(angle)
+    if result["status"] == "success":
+        result["position"] = position
+    
+    return result
+
+# 执行扫描动作
+def sweep_servo(start_angle, end_angle, step, delay):
+    try:
+        start_angle = check_angle(start_angle)
+        end_angle = check_angle(end_angle)
+        step = int(step)
+        delay = check_seconds(delay, "delay")
+        
+        # 确定步进方向
+        if start_angle <= end_angle:
+            angle_range = range(start_angle, end_angle + 1, step)
+        else:
+            angle_range = range(start_angle, end_angle - 1, -step)
+        
+        # 执行扫描，每一步在delay时间内插值移动
+        with servo_lock:
+            for angle in angle_range:
+                registry.move({'main': angle}, duration=delay)
+        
+        return {"status": "success", "start": start_angle, "end": end_angle}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+# 批量动作脚本的限制
+BATCH_MAX_STEPS = 100      # 单个脚本最多步骤数
+BATCH_MAX_DURATION = 60    # 单个脚本最长执行时间（秒）
+SETTLE_PER_DEGREE = 0.5 / 180  # 每度的到位等待时间，满行程180度等于单次set_angle的0.5秒
+MIN_SETTLE = 0.05          # 最短到位等待时间（秒）
+
+# 校验时间参数（秒），NaN、无穷大、负数或超过BATCH_MAX_DURATION时抛出ValueError
+def check_seconds(value, name):
+    seconds = float(value)
+    if not math.isfinite(seconds) or not 0 <= seconds <= BATCH_MAX_DURATION:
+        raise ValueError(f"{name}必须在0到{BATCH_MAX_DURATION}秒之间")
+    return seconds
+
+# 校验批量动作脚本，返回(执行计划, 错误响应)
+def validate_batch(steps):
+    if not isinstance(steps, list) or not steps:
+        return None, {"status": "error", "message": "steps必须是非空列表"}
+    if len(steps) > BATCH_MAX_STEPS:
+        return None, {"status": "error", "message": f"步骤数不能超过{BATCH_MAX_STEPS}"}
+    
+    plan = []
+    position = current_angle
+    duration = 0.0
+    for index, step in enumerate(steps):
+        try:
+            if not isinstance(step, dict):
+                raise ValueError("步骤必须是JSON对象")
+            kind = step.get('type')
+            if kind == 'move':
+                angle = check_angle(step.get('angle'))
+                plan.append(('move', angle))
+                duration += max(MIN_SETTLE, abs(angle - position) * SETTLE_PER_DEGREE)
+                position = angle
+            elif kind == 'preset':
+                if step.get('position') not in PRESET_ANGLES:
+                    raise ValueError("无效的预设位置")
+                angle = PRESET_ANGLES[step['position']]
+                plan.append(('preset', angle))
+                duration += max(MIN_SETTLE, abs(angle - position) * SETTLE_PER_DEGREE)
+                position = angle
+            elif kind == 'wait':
+                seconds = check_seconds(step.get('seconds', 0), "等待时间")
+                plan.append(('wait', seconds))
+                duration += seconds
+            elif kind == 'sweep':
+                start_angle = check_angle(step.get('start', MIN_ANGLE))
+                end_angle = check_angle(step.get('end', MAX_ANGLE))
+                step_size = int(step.get('step', 10))
+                delay = check_seconds(step.get('delay', 0.1), "delay")
+                if step_size <= 0:
+                    raise ValueError("step必须为正数")
+                if start_angle <= end_angle:
+                    angles = list(range(start_angle, end_angle + 1, step_size))
+                else:
+                    angles = list(range(start_angle, end_angle - 1, -step_size))
+                plan.append(('sweep', angles, delay))
+                duration += max(MIN_SETTLE, abs(start_angle - position) * SETTLE_PER_DEGREE) + len(angles) * delay
+                position = angles[-1]
+            else:
+                raise ValueError("未知的步骤类型")
+        except (TypeError, ValueError, OverflowError) as e:
+            return None, {"status": "error", "message": str(e), "step": index}
+    
+    if duration > BATCH_MAX_DURATION:
+        return None, {"status": "error", "message": f"脚本执行时间不能超过{BATCH_MAX_DURATION}秒"}
+    return plan, None
+
+# 连续执行批量动作计划，中途不停止PWM信号，返回每一步的耗时
+def run_batch(plan):
+    timings = []
+    with servo_lock:
+        begin = time.perf_counter()
+        for index, step in enumerate(plan):
+            step_start = time.perf_counter()
+            kind = step[0]
+            if kind in ('move', 'preset'):
+                angle = step[1]
+                distance = abs(angle - current_angle)
+                registry.move({'main': angle}, duration=max(MIN_SETTLE, distance * SETTLE_PER_DEGREE))  # 按移动距离等待舵机到位
+            elif kind == 'wait':
+                time.sleep(step[1])
+            else:
+                angles, delay = step[1], step[2]
+                # 先移动到扫描起点
+                registry.move({'main': angles[0]}, duration=max(MIN_SETTLE, abs(angles[0] - current_angle) * SETTLE_PER_DEGREE))
+                for angle in angles:
+                    registry.move({'main': angle}, duration=delay)
+            timings.append({
+                "index": index,
+                "type": kind,
+                "angle": current_angle,
+                "start": round(step_start - begin, 4),
+                "duration": round(time.perf_counter() - step_start, 4),
+            })
+        
+        # 注册表只在整个计划结束、舵机静止后才停止PWM信号，防止舵机抖动
+        total = time.perf_counter() - begin
+    
+    return {"status": "success", "angle": current_angle, "steps": timings, "total": round(total, 4)}
+
+# WebSocket实时控制参数
+STREAM_RATE = 50                 # 舵机更新频率（Hz），与50Hz的PWM周期一致
+STREAM_PERIOD = 1.0 / STREAM_RATE
+WS_IDLE_TIMEOUT = 120            # WebSocket连接空闲超时（秒）
+
+# 单个WebSocket客户端的实时控制流：
+# 读线程只记录最新目标角度，本线程以舵机更新频率应用目标并回传实际角度，
+# 来不及应用的旧目标直接被覆盖，因此延迟不超过一个更新周期
+class ServoStream:
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.send_lock = threading.Lock()
+        self.target = None        # (角度, 客户端序号, 收到时间)
+        self.applied = None
+        self.running = True
+        self.updates = 0
+        self.thread = threading.Thread(target=self._run, name='servo-stream', daemon=True)
+    
+    def start(self):
+        self.thread.start()
+    
+    def stop(self):
+        self.running = False
+        self.thread.join()
+    
+    def submit(self, angle, seq=None):
+        self.target = (angle, seq, time.perf_counter())
+    
+    def send(self, opcode, payload):
+        with self.send_lock:
+            self.wfile.write(ws.encode_frame(opcode, payload))
+    
+    def send_json(self, response):
+        self.send(ws.OP_TEXT, json.dumps(response))
+    
+    def _run(self):
+        next_tick = time.monotonic()
+        while self.running:
+            next_tick += STREAM_PERIOD
+            target = self.target
+            try:
+                if target is not None and target[0] != self.applied:
+                    angle, seq, received = target
+                    # 其他请求正在驱动舵机时跳过本周期，下个周期再应用最新目标
+                    # 目标停止变化后由注册表在保持时间结束时停止PWM信号
+                    if servo_lock.acquire(blocking=False):
+                        try:
+                            registry.move({'main': angle}, duration=0, wait=False)
+                        finally:
+                            servo_lock.release()
+                        self.applied = angle
+                        self.updates += 1
+                        response = {"angle": angle, "latency_ms": round((time.perf_counter() - received) * 1000, 2)}
+                        if seq is not None:
+                            response["seq"] = seq
+                        self.send_json(response)
+            except OSError:
+                # 客户端已断开
+                break
+            
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()  # 落后时重新对齐，不补发
+
+# 解析WebSocket控制消息：{"angle": 数值, "seq": 可选序号} 或纯数字文本
+def parse_stream_message(payload):
+    text = payload.decode().strip()
+    if text.startswith('{'):
+        data = json.loads(text)
+        angle, seq = data['angle'], data.get('seq')
+    else:
+        angle, seq = text, None
+    return check_angle(float(angle)), seq
+
+# HTTP请求处理器
+class ServoRequestHandler(BaseHTTPRequestHandler):
+    # 使用HTTP/1.1以支持持久连接，每个响应都必须带Content-Length
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEP_ALIVE_TIMEOUT  # 空闲连接超时后关闭
+    disable_nagle_algorithm = True  # 小响应立即发送，避免keep-alive下的延迟确认等待
+    
+    def _send_body(self, body, code=200, content_type='application/json'):
+        self.send_response(code)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')  # 允许跨域请求
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_json(self, response, code=200):
+        self._send_body(json.dumps(response).encode(), code)
+    
+    def do_GET(self):
+        parsed_path = urlparse(self.path)
+        path = parsed_path.path
+        
+        # 只处理API请求
+        if path == '/api/get_angle':
+            self._send_body(get_angle_response())
+        elif path == '/api/sensors':
+            self._send_sensors()
+        elif path == '/api/motion_stats':
+            self._send_json(motion.get_stats())
+        elif path == '/api/servos':
+            self._send_json({"servos": registry.to_list()})
+        elif path.startswith('/api/servos/'):
+            servo = registry.get(path[len('/api/servos/'):])
+            if servo is None:
+                self._send_json({"status": "error", "message": "未知的舵机ID"}, 404)
+            else:
+                self._send_json(servo.to_dict())
+        elif path == '/api/ws':
+            self._handle_websocket()
+        else:
+            self._send_body(NOT_FOUND_BODY, 404)
+    
+    # 传感器快照，内容未变化时返回304
+    def _send_sensors(self):
+        body, etag = sensors.get()
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')  # 浏览器每次都带ETag重新验证
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Expose-Headers', 'ETag')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _handle_websocket(self):
+        key = self.headers.get('Sec-WebSocket-Key')
+        if self.headers.get('Upgrade', '').lower() != 'websocket' or not key:
+            self._send_json({"status": "error", "message": "需要WebSocket升级请求"}, 400)
+            return
+        
+        # 完成握手，此后该连接只用于WebSocket
+        self.send_response(101)
+        self.send_header('Upgrade', 'websocket')
+        self.send_header('Connection', 'Upgrade')
+        self.send_header('Sec-WebSocket-Accept', ws.accept_key(key))
+        self.end_headers()
+        self.close_connection = True
+        self.connection.settimeout(WS_IDLE_TIMEOUT)
+        
+        stream = ServoStream(self.wfile)
+        stream.start()
+        try:
+            while True:
+                message = ws.read_message(self.rfile)
+                if message is None:
+                    break
+                opcode, payload = message
+                if opcode == ws.OP_CLOSE:
+                    stream.send(ws.OP_CLOSE, payload[:2])
+                    break
+                elif opcode == ws.OP_PING:
+                    stream.send(ws.OP_PONG, payload)
+                elif opcode in (ws.OP_TEXT, ws.OP_BINARY):
+                    try:
+                        angle, seq = parse_stream_message(payload)
+                    except (ValueError, OverflowError, KeyError, TypeError, UnicodeDecodeError) as e:
+                        stream.send_json({"status": "error", "message": str(e)})
+                        continue
+                    stream.submit(angle, seq)
+        except ws.WebSocketError as e:
+            try:
+                stream.send(ws.OP_CLOSE, ws.close_payload(1002, str(e)))
+            except OSError:
+                pass
+        except OSError:
+            pass
+        finally:
+            stream.stop()
+    
+    def do_POST(self):
+        content_length = int(self.headers.get('Content-Length', 0))
+        post_data = self.rfile.read(content_length)
+        parsed_path = urlparse(self.path)
+        path = parsed_path.path
+        
+        try:
+            data = json.loads(post_data.decode())
+            
+            if path == '/api/set_angle':
+                angle = data.get('angle', 90)
+                response = set_servo_angle(angle)
+                
+            elif path == '/api/preset':
+                position = data.get('position', 'center')
+                response = set_preset_position(position)
+                
+            elif path == '/api/sweep':
+                start_angle = data.get('start', MIN_ANGLE)
+                end_angle = data.get('end', MAX_ANGLE)
+                step = data.get('step', 10)
+                delay = data.get('delay', 0.1)
+                response = sweep_servo(start_angle, end_angle, step, delay)
+                
+            elif path == '/api/batch':
+                # 先校验整个脚本，任何一步无效都不执行
+                plan, error = validate_batch(data.get('steps'))
+                if error:
+                    self._send_json(error, 400)
+                    return
+                response = run_batch(plan)
+                
+            elif path == '/api/servos/move':
+                response = move_servos(data.get('targets'), data.get('duration'))
+                
+            elif path.startswith('/api/servos/') and path.endswith('/set_angle'):
+                servo_id = path[len('/api/servos/'):-len('/set_angle')]
+                response = move_servos({servo_id: data.get('angle', 90)}, data.get('duration'))
+                
+            else:
+                self._send_body(UNKNOWN_ENDPOINT_BODY, 404)
+                return
+                
+            self._send_json(response)
+            
+        except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+            self._send_body(INVALID_JSON_BODY, 400)
+        except KeyError as e:
+            self._send_json({"status": "error", "message": f"未知的舵机ID: {e.args[0]}"}, 404)
+    
+    def do_OPTIONS(self):
+        # 处理预检请求
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, If-None-Match')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+# 主函数
+def main():
+    global pwm
+    
+    try:
+        # 设置伺服电机
+        pwm = setup()
+        registry.start()
+        motion.start()
+        if SENSORS_ENABLED:
+            setup_sensors()
+        
+        # 获取IP地址
+        ip_address = get_ip_address()
+        
+        # 启动Web服务器
+        server_address = ('', PORT)
+        # 多线程服务器：保持连接的客户端不会阻塞其他客户端
+        httpd = ThreadingHTTPServer(server_address, ServoRequestHandler)
+        httpd.daemon_threads = True
+        print(f"伺服电机API服务启动！")
+        print(f"API地址: http://{ip_address}:{PORT}")
+        print(f"校准配置: {SERVO_PROFILE}，角度范围: {MIN_ANGLE}° 到 {MAX_ANGLE}°")
+        httpd.serve_forever()
+        
+    except KeyboardInterrupt:
+        print("\n程序已退出")
+    finally:
+        # 停止PWM并清理GPIO
+        try:
+            registry.stop()
+            GPIO.cleanup()
+        except:
+            pass
+
+if __name__ == '__main__':
     main()
\ No newline at end of file
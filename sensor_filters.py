@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Streaming smoothing filters for sensor channels (no hardware dependencies)
+Sits between the DHT11 reads and the vent decision logic so a single
+bogus reading (0% humidity, a one-off 1C jump) cannot move the servo.
+Each channel runs a chain of fixed-memory stages, in this order:
+
+  range/step gate  rejects readings outside the physical range, or
+                   jumping more than max_step from the last accepted one
+                   (after max_rejects rejections in a row the new level
+                   is accepted, so a real step change gets through)
+  median of N      ring buffer plus a sorted window kept with bisect
+  EMA              exponential moving average, O(1)
+
+Channel configuration, e.g.
+  {"temperature": {"range": (0, 50), "max_step": 2, "median": 5, "ema": 0.5}}
+Leave a key out to skip that stage. SensorFilters raises ValueError for a
+configuration it cannot run, so a bad one is caught before any reading.
+'''
+
+import bisect
+import collections
+
+DEFAULT_FILTERS = {
+    # DHT11 measures 0-50C and 20-90%RH; real changes are slow at 1 sample/s
+    "temperature": {"range": (0, 50), "max_step": 2, "max_rejects": 3, "median": 5, "ema": 0.5},
+    "humidity": {"range": (5, 95), "max_step": 10, "max_rejects": 3, "median": 5, "ema": 0.5},
+}
+
+# ===== STAGES =====
+class OutlierGate:
+    '''Reject out-of-range readings and sudden jumps; returns None for a rejected value'''
+
+    def __init__(self, valid_range=None, max_step=None, max_rejects=3):
+        self.valid_range = valid_range
+        self.max_step = max_step
+        self.max_rejects = max_rejects
+        self.last = None       # Last accepted value
+        self.streak = 0        # Consecutive step rejections
+        self.rejected = 0
+        self.last_rejection = None  # Why the latest value was rejected
+
+    def update(self, value):
+        if self.valid_range and not self.valid_range[0] <= value <= self.valid_range[1]:
+            # A glitch, not evidence of a step change: restart the step count
+            self.streak = 0
+            return self._reject(value, "out of range")
+        if (self.max_step is not None and self.last is not None
+                and abs(value - self.last) > self.max_step and self.streak < self.max_rejects):
+            self.streak += 1
+            return self._reject(value, f"jump from {self.last}")
+        self.last = value
+        self.streak = 0
+        return value
+
+    def _reject(self, value, why):
+        self.rejected += 1
+        self.last_rejection = why
+        return None
+
+class MedianFilter:
+    '''Median of the last `size` values'''
+
+    def __init__(self, size):
+        self.window = collections.deque(maxlen=size)
+        self.ordered = []
+
+    def update(self, value):
+        if len(self.window) == self.window.maxlen:
+            del self.ordered[bisect.bisect_left(self.ordered, self.window[0])]
+        self.window.append(value)
+        bisect.insort(self.ordered, value)
+        middle = len(self.ordered) // 2
+        if len(self.ordered) % 2:
+            return self.ordered[middle]
+        return (self.ordered[middle - 1] + self.ordered[middle]) / 2
+
+class EmaFilter:
+    '''Exponential moving average; alpha is the weight of the newest value'''
+
+    def __init__(self, alpha):
+        if not 0 < alpha <= 1:
+            raise ValueError("EMA alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.value = None
+
+    def update(self, value):
+        if self.value is None:
+            self.value = value
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+def _number(value):
+    return not isinstance(value, bool) and isinstance(value, (int, float))
+
+def check_spec(name, spec):
+    '''Raise ValueError unless spec is a usable channel configuration'''
+    if not isinstance(spec, dict):
+        raise ValueError(f"{name}: filter settings must be an object")
+    unknown = set(spec) - {"range", "max_step", "max_rejects", "median", "ema"}
+    if unknown:
+        raise ValueError(f"{name}: unknown filter setting {', '.join(sorted(unknown))}")
+    valid_range = spec.get("range")
+    if valid_range is not None and (not isinstance(valid_range, (list, tuple)) or len(valid_range) != 2
+                                    or not all(map(_number, valid_range)) or valid_range[0] >= valid_range[1]):
+        raise ValueError(f"{name}: range must be [low, high]")
+    max_step = spec.get("max_step")
+    if max_step is not None and (not _number(max_step) or max_step <= 0):
+        raise ValueError(f"{name}: max_step must be a positive number")
+    max_rejects = spec.get("max_rejects", 3)
+    if isinstance(max_rejects, bool) or not isinstance(max_rejects, int) or max_rejects < 0:
+        raise ValueError(f"{name}: max_rejects must be a non-negative integer")
+    median = spec.get("median")
+    if median is not None and (isinstance(median, bool) or not isinstance(median, int) or median < 1):
+        raise ValueError(f"{name}: median must be a positive integer")
+    ema = spec.get("ema")
+    if ema is not None and (not _number(ema) or not 0 < ema <= 1):
+        raise ValueError(f"{name}: ema must be in (0, 1]")
+
+# ===== CHANNELS =====
+class ChannelFilter:
+    '''Filter chain for one sensor channel'''
+
+    def __init__(self, name, valid_range=None, max_step=None, max_rejects=3, median=None, ema=None):
+        self.name = name
+        self.gate = OutlierGate(valid_range, max_step, max_rejects)
+        self.stages = []
+        if median:
+            self.stages.append(MedianFilter(median))
+        if ema:
+            self.stages.append(EmaFilter(ema))
+        self.output = None  # Last filtered value, held while readings are rejected
+        self.accepted = 0
+
+    def update(self, value):
+        '''Filtered value, or the previous one if this reading was rejected (None before any)'''
+        value = self.gate.update(value)
+        if value is None:
+            return self.output
+        for stage in self.stages:
+            value = stage.update(value)
+        self.accepted += 1
+        self.output = round(value, 1)
+        return self.output
+
+    @property
+    def rejected(self):
+        return self.gate.rejected
+
+class SensorFilters:
+    '''Per-channel filter chains built from a configuration dict'''
+
+    def __init__(self, config=DEFAULT_FILTERS, log=None):
+        # log: logger method such as sensor_log.warning, called as log(template, *args)
+        # for every rejected reading; None to stay silent
+        self.log = log
+        self.channels = {}
+        for name, spec in config.items():
+            check_spec(name, spec)
+            self.channels[name] = ChannelFilter(
+                name, spec.get("range"), spec.get("max_step"), spec.get("max_rejects", 3),
+                spec.get("median"), spec.get("ema"))
+
+    def apply(self, **readings):
+        '''Filter one sample; returns {channel: value}, a value is None until a reading is accepted'''
+        filtered = {}
+        for name, value in readings.items():
+            channel = self.channels.get(name)
+            if channel is None:
+                filtered[name] = value
+                continue
+            rejected = channel.rejected
+            filtered[name] = channel.update(value)
+            if channel.rejected != rejected and self.log:
+                self.log("Rejected %s reading %s (%s)", name, value, channel.gate.last_rejection)
+        return filtered
+
+    def stats(self):
+        return {name: {"accepted": channel.accepted, "rejected": channel.rejected}
+                for name, channel in self.channels.items()}
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+sensor_snapshot.py - 后台刷新的传感器快照
+一个后台线程按固定间隔读取传感器，把结果预先序列化为JSON并计算ETag。
+HTTP请求只读取这份快照，不会触发硬件读取；内容不变时ETag不变，
+客户端带If-None-Match轮询时可以直接返回304。
+'''
+
+import hashlib
+import json
+import threading
+import time
+
+REFRESH_INTERVAL = 2.0  # 传感器读取间隔（秒），DHT11两次读取至少间隔1秒
+
+class SensorSnapshot:
+    # read_func() 返回 {字段: 值}，只包含本次成功读取的字段
+    def __init__(self, read_func, fields, interval=REFRESH_INTERVAL):
+        self.read_func = read_func
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.data = dict.fromkeys(fields)
+        self.cached = self._render()  # (body, etag)，整体替换，读取时无需加锁
+        self.thread = threading.Thread(target=self._run, name='sensor-snapshot', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def _render(self):
+        body = json.dumps(self.data, sort_keys=True).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        return body, etag
+
+    # 合并新的字段值，内容有变化时重新序列化
+    def update(self, **fields):
+        with self.lock:
+            changed = False
+            for name, value in fields.items():
+                if self.data.get(name) != value:
+                    self.data[name] = value
+                    changed = True
+            if changed:
+                self.cached = self._render()
+
+    # 返回当前快照 (body, etag)
+    def get(self):
+        return self.cached
+
+    def _run(self):
+        next_read = time.monotonic()
+        while True:
+            try:
+                self.update(**self.read_func())
+            except Exception as e:
+                print(f"传感器读取失败: {e}")
+            next_read += self.interval
+            delay = next_read - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_read = time.monotonic()
+
+# 判断If-None-Match请求头是否与ETag匹配
+def etag_matches(header, etag):
+    if not header:
+        return False
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == '*' or candidate == etag:
+            return True
+    return False
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Sensor trace record-and-replay engine
+1. TraceRecorder writes DHT11 readings/failures, PIR edges and MQ-2 edges
+   with timestamps into a compact binary trace file
+2. replay_trace() feeds a trace back through decide_vent_position() and
+   the VentController at maximum speed and reports vent moves, actuation
+   counts and throughput, optionally with the sensor_filters stage in
+   front of the controller
+
+Trace file layout (little endian):
+  header: magic "VTRC", version (uint8), 3 pad bytes, start time (float64 epoch)
+  record: offset from start in ms (uint32), type (uint8), a (int16), b (uint16)
+  DHT_OK records carry temperature*10 in a and humidity*10 in b,
+  PIR/GAS records carry the new level in a, DHT_FAIL records carry nothing.
+  A REBASE record moves the start time forward by its offset; later offsets
+  count from there (written before the uint32 ms offsets would overflow).
+
+Usage: python3 sensor_trace.py <trace file> [--no-hysteresis] [--filter]
+'''
+
+import struct
+import sys
+import time
+
+from vent_control import VentController
+from sensor_filters import DEFAULT_FILTERS, SensorFilters
+
+# ===== TRACE FORMAT =====
+TRACE_MAGIC = b"VTRC"
+TRACE_VERSION = 2  # Version 1 traces (no REBASE records) are still read
+HEADER = struct.Struct("<4sBxxxd")
+RECORD = struct.Struct("<IBhH")
+MAX_OFFSET_MS = 0xFFFFFFFF  # uint32 offsets cover about 49.7 days
+
+REC_DHT_OK = 1    # Valid DHT11 reading
+REC_DHT_FAIL = 2  # Failed DHT11 reading
+REC_PIR = 3       # PIR output changed level
+REC_GAS = 4       # MQ-2 gas detection changed state
+REC_REBASE = 5    # Later offsets count from start time + this record's offset
+
+# ===== RECORDING =====
+class TraceRecorder:
+    '''Append sensor samples to a binary trace file'''
+
+    def __init__(self, path, start_time=None):
+        self.start_time = time.time() if start_time is None else start_time
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(TRACE_MAGIC, TRACE_VERSION, self.start_time))
+        self.last_motion = None
+        self.last_gas = None
+        self.base_ms = 0  # Milliseconds from start_time moved into REBASE records
+        self.last_offset = 0
+        self.count = 0
+        self.reordered = 0  # Records whose time stepped backwards (NTP) and was held
+
+    def _write(self, current_time, rec_type, a=0, b=0):
+        # Offsets never go backwards and never overflow, so recording can
+        # never raise inside the control loop
+        offset_ms = int(round((current_time - self.start_time) * 1000)) - self.base_ms
+        if offset_ms < self.last_offset:
+            offset_ms = self.last_offset
+            self.reordered += 1
+        while offset_ms > MAX_OFFSET_MS:
+            self.file.write(RECORD.pack(MAX_OFFSET_MS, REC_REBASE, 0, 0))
+            self.base_ms += MAX_OFFSET_MS
+            offset_ms -= MAX_OFFSET_MS
+        self.last_offset = offset_ms
+        self.file.write(RECORD.pack(offset_ms, rec_type, a, b))
+        self.count += 1
+
+    def record_sample(self, current_time, temp, humidity, motion, gas):
+        '''Record one valid loop sample (edges first, then the reading)
+
+        gas is None while the MQ-2 warms up; no gas state is recorded then.
+        '''
+        motion = 1 if motion else 0
+        if motion != self.last_motion:
+            self._write(current_time, REC_PIR, motion)
+            self.last_motion = motion
+        if gas is not None:
+            gas = 1 if gas else 0
+        if gas is not None and gas != self.last_gas:
+            self._write(current_time, REC_GAS, gas)
+            self.last_gas = gas
+        self._write(current_time, REC_DHT_OK, int(round(temp * 10)), int(round(humidity * 10)))
+
+    def record_failure(self, current_time):
+        '''Record a failed DHT11 read'''
+        self._write(current_time, REC_DHT_FAIL)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+# ===== READING =====
+def load_trace(path):
+    '''Load a trace file, return (start_time, raw record bytes)'''
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, start_time = HEADER.unpack_from(data)
+    if magic != TRACE_MAGIC:
+        raise ValueError(f"{path} is not a sensor trace")
+    if version not in (1, TRACE_VERSION):
+        raise ValueError(f"Unsupported trace version {version}")
+    body = data[HEADER.size:]
+    # Ignore a partial record left by an unclean shutdown
+    body = body[:len(body) - len(body) % RECORD.size]
+    return start_time, body
+
+def iter_records(path):
+    '''Yield (timestamp, type, a, b) for every record in a trace'''
+    start_time, body = load_trace(path)
+    for offset_ms, rec_type, a, b in RECORD.iter_unpack(body):
+        if rec_type == REC_REBASE:
+            start_time += offset_ms / 1000
+            continue
+        yield start_time + offset_ms / 1000, rec_type, a, b
+
+# ===== REPLAY =====
+def replay_trace(path, servo_position=90, hysteresis=True, filters=None):
+    '''Replay a trace through the vent controller as fast as possible
+
+    filters: sensor_filters configuration applied to the DHT11 readings, None for raw readings
+    '''
+    start_time, body = load_trace(path)
+    controller = VentController(start_time, servo_position=servo_position, log=None, hysteresis=hysteresis)
+    sensor_filters = SensorFilters(filters) if filters else None
+
+    moves = []
+    samples = 0
+    failures = 0
+    motion = 0
+    gas = 0
+
+    begin = time.perf_counter()
+    for offset_ms, rec_type, a, b in RECORD.iter_unpack(body):
+        if rec_type == REC_DHT_OK:
+            samples += 1
+            current_time = start_time + offset_ms / 1000
+            old_position = controller.servo_position
+            temp, humidity = a / 10, b / 10
+            if sensor_filters:
+                filtered = sensor_filters.apply(temperature=temp, humidity=humidity)
+                temp, humidity = filtered["temperature"], filtered["humidity"]
+                if temp is None or humidity is None:
+                    continue  # Nothing accepted yet
+            if controller.update(temp, humidity, motion, gas, current_time):
+                moves.append((current_time, old_position, controller.servo_position, controller.current_reason))
+        elif rec_type == REC_PIR:
+            motion = a
+        elif rec_type == REC_GAS:
+            gas = a
+        elif rec_type == REC_DHT_FAIL:
+            failures += 1
+        elif rec_type == REC_REBASE:
+            start_time += offset_ms / 1000
+    elapsed = time.perf_counter() - begin
+
+    total = samples + failures
+    return {
+        "samples": samples,
+        "failures": failures,
+        "moves": moves,
+        "actuation_count": controller.actuation_count,
+        "motion_count": controller.motion_count,
+        "moves_avoided_hysteresis": controller.moves_avoided_hysteresis,
+        "moves_avoided_dwell": controller.moves_avoided_dwell,
+        "stall_time_avoided": controller.stall_time_avoided,
+        "elapsed": elapsed,
+        "samples_per_s": total / elapsed if elapsed > 0 else 0.0,
+        "filters": sensor_filters.stats() if sensor_filters else None,
+    }
+
+def print_report(report):
+    '''Print a replay report'''
+    for current_time, old_position, new_position, reason in report["moves"]:
+        time_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(current_time))
+        print(f"[{time_str}] Vent: {old_position}° -> {new_position}° (Reason: {reason})")
+    print(f"Samples: {report['samples']}, Failed reads: {report['failures']}")
+    print(f"Actuations: {report['actuation_count']}, Motion events: {report['motion_count']}")
+    print(f"Moves avoided: {report['moves_avoided_hysteresis']} by hysteresis, "
+          f"{report['moves_avoided_dwell']} by dwell ({report['stall_time_avoided']:.1f}s of servo stall saved)")
+    if report["filters"]:
+        for name, stats in report["filters"].items():
+            print(f"Filter {name}: {stats['accepted']} accepted, {stats['rejected']} rejected")
+    print(f"Replay time: {report['elapsed']:.3f}s ({report['samples_per_s']:.0f} samples/s)")
+
+if __name__ == "__main__":
+    options = sys.argv[2:]
+    if len(sys.argv) < 2 or set(options) - {"--no-hysteresis", "--filter"}:
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(1)
+    print_report(replay_trace(sys.argv[1], hysteresis="--no-hysteresis" not in options,
+                              filters=DEFAULT_FILTERS if "--filter" in options else None))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+servo_calibration.py - 舵机校准表
+校准文件中每个配置是一组实测的 [角度, 脉宽(微秒)] 点。启动时把这些点按0.1度
+的分辨率分段线性插值，编译成一张稠密查找表，之后每次角度转换只需一次查表。
+'''
+
+import json
+import os
+
+RESOLUTION = 0.1       # 查找表的角度分辨率（度）
+PWM_PERIOD_US = 20000  # 50Hz舵机信号的周期（微秒）
+
+# 默认校准文件：与本文件放在同一目录
+CALIBRATION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'servo_calibration.json')
+
+# 一个舵机的角度->脉宽查找表
+class CalibrationTable:
+    def __init__(self, points, resolution=RESOLUTION):
+        points = sorted((float(angle), float(pulse)) for angle, pulse in points)
+        if len(points) < 2:
+            raise ValueError("校准配置至少需要两个点")
+        for (a0, _), (a1, _) in zip(points, points[1:]):
+            if a0 == a1:
+                raise ValueError(f"校准点角度重复: {a0:g}")
+
+        self.points = points
+        self.resolution = resolution
+        self.scale = 1.0 / resolution
+        self.min_angle = _plain(points[0][0])
+        self.max_angle = _plain(points[-1][0])
+        self.min_pulse = _plain(min(pulse for _, pulse in points))
+        self.max_pulse = _plain(max(pulse for _, pulse in points))
+
+        # 按分辨率逐格插值，相邻校准点之间为直线
+        count = int(round((points[-1][0] - points[0][0]) * self.scale)) + 1
+        table = []
+        segment = 0
+        for i in range(count):
+            angle = points[0][0] + i * resolution
+            while segment < len(points) - 2 and angle > points[segment + 1][0]:
+                segment += 1
+            (a0, p0), (a1, p1) = points[segment], points[segment + 1]
+            table.append(p0 + (p1 - p0) * (angle - a0) / (a1 - a0))
+        self.table = table
+
+    # 角度是否在校准范围内
+    def contains(self, angle):
+        return self.min_angle <= angle <= self.max_angle
+
+    # 将角度转换为脉冲宽度（微秒），超出校准范围时抛出ValueError
+    def pulse_us(self, angle):
+        if not self.min_angle <= angle <= self.max_angle:
+            raise ValueError(f"角度必须在{self.min_angle}到{self.max_angle}之间")
+        return self.table[int((angle - self.min_angle) * self.scale + 0.5)]
+
+    # 将角度转换为占空比（百分比），供只支持ChangeDutyCycle的PWM使用
+    def duty_cycle(self, angle):
+        return self.pulse_us(angle) / PWM_PERIOD_US * 100
+
+    # 校准点列表，用于API输出
+    def points_list(self):
+        return [[_plain(angle), _plain(pulse)] for angle, pulse in self.points]
+
+# 由两个端点构造线性校准表
+def linear_table(min_angle, max_angle, min_pulse, max_pulse):
+    return CalibrationTable([(min_angle, min_pulse), (max_angle, max_pulse)])
+
+# 整数值的浮点数显示为整数
+def _plain(value):
+    return int(value) if float(value).is_integer() else value
+
+# 从校准文件加载全部配置，返回 {配置名: CalibrationTable}
+# 文件格式：{"配置名": [[角度, 脉宽], ...], ...}
+def load_profiles(path=CALIBRATION_FILE):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    profiles = {}
+    for name, points in data.items():
+        try:
+            profiles[name] = CalibrationTable(points)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"校准配置{name}无效: {e}")
+    return profiles
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+servo_registry.py - 多舵机注册表与同步协调运动
+每个舵机有自己的引脚和校准表（脉宽范围和角度限制）。所有通道由同一个定时循环驱动：
+一次协调运动中的所有舵机在同一个周期开始、按插值同步前进、在同一个周期到达。
+'''
+
+import math
+import threading
+import time
+
+from pwm_backend import create_pwm
+from servo_calibration import linear_table
+
+TICK_RATE = 50                  # 定时循环频率（Hz），与50Hz的舵机PWM周期一致
+TICK = 1.0 / TICK_RATE
+SETTLE_PER_DEGREE = 0.5 / 180   # 每度的运动时间，满行程180度为0.5秒
+HOLD_TIME = 0.5                 # 到位后保持PWM信号的时间（秒），之后停止信号防止抖动
+HOLD_TICKS = int(round(HOLD_TIME * TICK_RATE))
+
+# 单个舵机通道
+# 指定calibration（servo_calibration.CalibrationTable）时忽略脉宽和角度范围参数，
+# 否则按两个端点构造线性校准表
+class Servo:
+    def __init__(self, servo_id, pin, min_pulse=1000, max_pulse=2000, min_angle=0, max_angle=180,
+                 home=90, pwm=None, backend='auto', on_target=None, calibration=None):
+        if calibration is None:
+            if min_angle >= max_angle:
+                raise ValueError(f"舵机{servo_id}的角度范围无效")
+            calibration = linear_table(min_angle, max_angle, min_pulse, max_pulse)
+        self.id = servo_id
+        self.pin = pin
+        self.calibration = calibration
+        self.min_pulse = calibration.min_pulse
+        self.max_pulse = calibration.max_pulse
+        self.min_angle = calibration.min_angle
+        self.max_angle = calibration.max_angle
+        self.on_target = on_target  # 目标角度变化时的回调
+        if pwm is None:
+            pwm = create_pwm(pin, TICK_RATE, backend)
+            pwm.start(0)
+        self.pwm = pwm
+        self.angle = home           # 当前输出角度（运动中为插值角度）
+        self.target = home          # 最近一次命令的目标角度
+        self.motion = None          # (起始角度, 目标角度, 起始周期, 结束周期)
+        self.release_tick = None    # 到该周期时停止PWM信号
+        self.active = False         # 是否正在输出PWM信号
+
+    # 将角度映射到脉冲宽度（微秒），查校准表
+    def pulse_us(self, angle):
+        return self.calibration.pulse_us(angle)
+
+    def check_angle(self, angle):
+        try:
+            angle = float(angle)
+        except OverflowError:  # 超出浮点范围的整数，如10**400
+            angle = math.inf
+        if not math.isfinite(angle):
+            raise ValueError(f"舵机{self.id}的角度必须是有限数值")
+        if angle.is_integer():
+            angle = int(angle)
+        if angle < self.min_angle or angle > self.max_angle:
+            raise ValueError(f"舵机{self.id}的角度必须在{self.min_angle}-{self.max_angle}之间")
+        return angle
+
+    def output(self, angle):
+        self.pwm.set_pulse_width_us(self.pulse_us(angle))
+        self.angle = angle
+        self.active = True
+
+    def release(self):
+        self.pwm.ChangeDutyCycle(0)
+        self.active = False
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "pin": self.pin,
+            "angle": round(self.angle, 2),
+            "target": self.target,
+            "moving": self.motion is not None,
+            "min_angle": self.min_angle,
+            "max_angle": self.max_angle,
+            "min_pulse": self.min_pulse,
+            "max_pulse": self.max_pulse,
+            "calibration": self.calibration.points_list(),
+        }
+
+# 舵机注册表：一个定时线程驱动所有通道
+class ServoRegistry:
+    def __init__(self):
+        self.servos = {}
+        self.cond = threading.Condition()
+        self.tick = 0
+        self.thread = threading.Thread(target=self._run, name='servo-registry', daemon=True)
+
+    def add(self, servo):
+        with self.cond:
+            if servo.id in self.servos:
+                raise ValueError(f"舵机ID重复: {servo.id}")
+            self.servos[servo.id] = servo
+        return servo
+
+    def get(self, servo_id):
+        return self.servos.get(servo_id)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            for servo in self.servos.values():
+                servo.pwm.stop()
+
+    def to_list(self):
+        with self.cond:
+            return [servo.to_dict() for servo in self.servos.values()]
+
+    # 协调运动：targets为 {舵机ID: 角度}，所有舵机在同一周期开始并同时到达
+    # duration为None时按最远行程计算运动时间；wait为True时等到全部到位再返回
+    def move(self, targets, duration=None, wait=True):
+        if not targets:
+            raise ValueError("至少需要一个目标")
+        with self.cond:
+            # 先校验全部目标，任何一个无效都不运动
+            checked = {}
+            for servo_id, angle in targets.items():
+                servo = self.servos.get(servo_id)
+                if servo is None:
+                    raise KeyError(servo_id)
+                checked[servo] = servo.check_angle(angle)
+
+            if duration is None:
+                duration = max(abs(angle - servo.angle) for servo, angle in checked.items()) * SETTLE_PER_DEGREE
+            duration = float(duration)
+            if not math.isfinite(duration) or duration < 0:
+                raise ValueError("运动时间必须是非负的有限数值")
+            start_tick = self.tick + 1
+            end_tick = start_tick + max(1, math.ceil(duration * TICK_RATE - 1e-9)) - 1
+
+            for servo, angle in checked.items():
+                servo.motion = (servo.angle, angle, start_tick, end_tick)
+                servo.target = angle
+                servo.release_tick = None
+                if servo.on_target:
+                    servo.on_target(angle)
+            self.cond.notify_all()
+
+            if wait:
+                # 运动因输出错误被取消时也返回，不等待不再前进的周期
+                while self.tick < end_tick and any(servo.motion for servo in checked):
+                    self.cond.wait()
+        return {
+            "status": "success",
+            "targets": {servo.id: angle for servo, angle in checked.items()},
+            "duration": round((end_tick - start_tick + 1) * TICK, 3),
+        }
+
+    def _busy(self):
+        return any(servo.motion or servo.release_tick for servo in self.servos.values())
+
+    # 推进一个舵机一个周期
+    def _step(self, servo, tick):
+        if servo.motion:
+            start_angle, end_angle, start_tick, end_tick = servo.motion
+            if tick < start_tick:
+                return
+            progress = (tick - start_tick + 1) / (end_tick - start_tick + 1)
+            servo.output(start_angle + (end_angle - start_angle) * min(1.0, progress))
+            if tick >= end_tick:
+                servo.motion = None
+                servo.release_tick = tick + HOLD_TICKS
+        elif servo.release_tick and tick >= servo.release_tick:
+            servo.release()
+            servo.release_tick = None
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while True:
+            with self.cond:
+                # 没有运动也没有待停止的信号时休眠，直到有新命令
+                while not self._busy():
+                    self.cond.wait()
+                    next_tick = time.monotonic()
+                self.tick += 1
+                tick = self.tick
+                for servo in self.servos.values():
+                    # 单个舵机出错时取消它的运动，定时线程继续运行，等待中的move()不会卡住
+                    try:
+                        self._step(servo, tick)
+                    except Exception as e:
+                        print(f"舵机{servo.id}输出失败，已取消运动: {e}")
+                        servo.motion = None
+                        servo.release_tick = None
+                self.cond.notify_all()
+
+            next_tick += TICK
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()  # 落后时重新对齐
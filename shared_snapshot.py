@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Latest-sample record in shared memory, guarded by a seqlock
+One writer process (sensor acquisition) publishes fixed-layout records
+into a multiprocessing.shared_memory block. Any number of reader
+processes (display, network, HTTP API) read the record in place. Readers
+never take a lock and never block the writer.
+
+Block layout (little endian):
+  sequence (uint32), crc32 of the payload (uint32), payload (fields struct)
+
+The writer makes the sequence odd, writes the payload, then stores the
+payload CRC together with the next even sequence number. A reader accepts
+a record only if the sequence was even and unchanged across its read and
+the CRC matches. Otherwise it retries. Python cannot issue memory
+barriers, so the CRC is what guarantees that a torn read is never
+accepted, even on weakly ordered CPUs.
+'''
+
+import inspect
+import struct
+import time
+import zlib
+from multiprocessing import resource_tracker, shared_memory
+
+HEADER = struct.Struct("<II")
+READ_RETRIES = 100
+# Python < 3.13 has no track= and registers every attached block with the
+# process's resource tracker, which unlinks it when that process exits
+TRACK_PARAMETER = "track" in inspect.signature(shared_memory.SharedMemory).parameters
+
+# Fields of the smart air vent sample record: (name, struct code)
+VENT_FIELDS = (
+    ("time", "d"),          # Epoch time of the sample, 0 before the first one
+    ("temp", "d"),
+    ("humidity", "d"),
+    ("trend", "d"),         # Temperature change over the trend window
+    ("vent", "h"),          # Servo position (degrees)
+    ("motion", "?"),
+    ("gas", "?"),
+    ("pir_ready", "?"),
+    ("mq2_ready", "?"),
+    ("error_count", "H"),   # Consecutive failed DHT11 reads
+    ("reason", "40s"),      # Current vent reason, UTF-8
+)
+
+def _open(name, size, create):
+    if create:
+        try:
+            return shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            pass  # Left over from a crashed run; reuse it
+    if TRACK_PARAMETER:
+        block = shared_memory.SharedMemory(name, track=False)
+    else:
+        block = shared_memory.SharedMemory(name)
+        if not create:
+            # A reader must not take the writer's block down with it on exit
+            resource_tracker.unregister(block._name, "shared_memory")
+    if block.size < size:
+        block.close()
+        raise ValueError(f"Shared memory block {name} is too small for this record layout")
+    return block
+
+class SharedSnapshot:
+    '''Seqlock-protected record in a named shared memory block'''
+
+    def __init__(self, name, fields=VENT_FIELDS, create=False):
+        self.names = [field for field, _ in fields]
+        self.text_fields = {field for field, code in fields if code.endswith("s")}
+        self.payload = struct.Struct("<" + "".join(code for _, code in fields))
+        self.size = HEADER.size + self.payload.size
+        self.owner = create
+        self.block = _open(name, self.size, create)
+        self.buf = self.block.buf
+        self.sequence = HEADER.unpack_from(self.buf)[0] & ~1 if create else 0
+        self.retries = 0  # Reads that had to be repeated because of a concurrent write
+
+    # ===== WRITER =====
+    def write(self, **values):
+        '''Publish a new record (single writer only); missing fields are zero'''
+        payload = []
+        for name in self.names:
+            value = values.get(name, 0)
+            if name in self.text_fields:
+                value = str(value or "").encode()
+            payload.append(value)
+        # Pack first: if a value does not fit, the error leaves the old record intact
+        payload = self.payload.pack(*payload)
+        crc = zlib.crc32(payload)
+        odd = (self.sequence + 1) & 0xFFFFFFFF
+        HEADER.pack_into(self.buf, 0, odd, 0)  # Odd: write in progress
+        self.buf[HEADER.size:self.size] = payload
+        self.sequence = (odd + 1) & 0xFFFFFFFF or 2  # 0 means "never written"
+        HEADER.pack_into(self.buf, 0, self.sequence, crc)
+
+    # ===== READERS =====
+    def read(self):
+        '''Return (sequence, {field: value}) of the latest complete record
+
+        The record is None while nothing has been written yet.
+        '''
+        for _ in range(READ_RETRIES):
+            before = HEADER.unpack_from(self.buf)[0]
+            if before == 0:
+                return 0, None
+            if before & 1:
+                self.retries += 1
+                time.sleep(0)
+                continue
+            values = self.payload.unpack_from(self.buf, HEADER.size)
+            crc = zlib.crc32(self.buf[HEADER.size:self.size])
+            after, stored_crc = HEADER.unpack_from(self.buf)
+            if before == after and crc == stored_crc:
+                record = dict(zip(self.names, values))
+                for name in self.text_fields:
+                    record[name] = record[name].rstrip(b"\0").decode(errors="replace")
+                return before, record
+            self.retries += 1
+            time.sleep(0)
+        raise TimeoutError("Shared snapshot kept changing while being read")
+
+    def read_newer(self, sequence):
+        '''Return (sequence, record) if a record newer than `sequence` was written, else None'''
+        if HEADER.unpack_from(self.buf)[0] == sequence:
+            return None
+        return self.read()
+
+    def close(self):
+        self.buf = None
+        self.block.close()
+        if self.owner:
+            _unlink(self.block)
+
+def _unlink(block):
+    '''Remove the owner's block; a block that is already gone is not an error'''
+    if not TRACK_PARAMETER:
+        # Spawned readers share the owner's resource tracker and unregister the
+        # name when they attach; register it again so unlink() can unregister it
+        resource_tracker.register(block._name, "shared_memory")
+    try:
+        block.unlink()
+    except FileNotFoundError:
+        if not TRACK_PARAMETER:
+            resource_tracker.unregister(block._name, "shared_memory")
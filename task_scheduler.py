@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Deadline-based periodic task scheduler (no hardware dependencies)
+Tasks are kept in a heap ordered by absolute deadline on the monotonic
+clock. The next deadline is always the previous deadline plus the
+period, never "now plus the period", so time spent in a task does not
+make later runs drift.
+
+A task that falls a whole period or more behind skips the deadlines it
+missed, so there is no burst of catch-up runs, and the skipped deadlines
+are counted. Each task records start jitter (start time minus deadline),
+run time, overruns (a run that took longer than the period) and missed
+deadlines.
+'''
+
+import heapq
+import time
+
+class Task:
+    '''One periodic task and its timing statistics'''
+
+    def __init__(self, name, period, func, deadline):
+        self.name = name
+        self.period = period
+        self.func = func
+        self.deadline = deadline
+        self.runs = 0
+        self.overruns = 0
+        self.missed = 0
+        self.errors = 0
+        self.jitter_total = 0.0
+        self.jitter_max = 0.0
+        self.duration_total = 0.0
+        self.duration_max = 0.0
+
+    def stats(self):
+        runs = self.runs or 1
+        return {
+            "period": self.period,
+            "runs": self.runs,
+            "overruns": self.overruns,
+            "missed": self.missed,
+            "errors": self.errors,
+            "jitter_mean_ms": round(self.jitter_total / runs * 1000, 2),
+            "jitter_max_ms": round(self.jitter_max * 1000, 2),
+            "duration_mean_ms": round(self.duration_total / runs * 1000, 2),
+            "duration_max_ms": round(self.duration_max * 1000, 2),
+        }
+
+class Scheduler:
+    '''Run periodic tasks at absolute deadlines from a single thread'''
+
+    def __init__(self, clock=time.monotonic, sleep=time.sleep, on_error=None):
+        # on_error: callable(task, exception) for exceptions raised by a task;
+        # None lets the exception stop the scheduler
+        self.clock = clock
+        self.sleep = sleep
+        self.on_error = on_error
+        self.tasks = []
+        self.heap = []
+        self.running = False
+
+    def add(self, name, period, func, offset=0.0):
+        '''Register func() to run every period seconds, first at now + offset'''
+        if period <= 0:
+            raise ValueError("Task period must be positive")
+        task = Task(name, period, func, self.clock() + offset)
+        self.tasks.append(task)
+        # The index breaks ties between equal deadlines in registration order
+        heapq.heappush(self.heap, (task.deadline, len(self.tasks), task))
+        return task
+
+    def set_period(self, name, period):
+        '''Change the period of a registered task; applies from its next deadline on'''
+        if period <= 0:
+            raise ValueError("Task period must be positive")
+        for task in self.tasks:
+            if task.name == name:
+                task.period = period
+                return task
+        raise KeyError(name)
+
+    def run_next(self):
+        '''Wait for the earliest deadline and run that task once'''
+        deadline, order, task = self.heap[0]
+        delay = deadline - self.clock()
+        if delay > 0:
+            self.sleep(delay)
+
+        start = self.clock()
+        jitter = max(0.0, start - deadline)
+        try:
+            task.func()
+        except Exception as e:
+            task.errors += 1
+            if self.on_error is None:
+                raise
+            self.on_error(task, e)
+        finally:
+            end = self.clock()
+            duration = end - start
+            task.runs += 1
+            task.jitter_total += jitter
+            task.jitter_max = max(task.jitter_max, jitter)
+            task.duration_total += duration
+            task.duration_max = max(task.duration_max, duration)
+            if duration > task.period:
+                task.overruns += 1
+
+            # Drift-free: advance from the deadline, skipping any already in the past
+            next_deadline = deadline + task.period
+            if next_deadline <= end:
+                skipped = int((end - next_deadline) // task.period) + 1
+                task.missed += skipped
+                next_deadline += skipped * task.period
+            task.deadline = next_deadline
+            heapq.heapreplace(self.heap, (next_deadline, order, task))
+
+    def run(self):
+        '''Run tasks until stop() is called (or a task raises)'''
+        self.running = True
+        while self.running and self.heap:
+            self.run_next()
+
+    def stop(self):
+        self.running = False
+
+    def stats(self):
+        return {task.name: task.stats() for task in self.tasks}
+
+    def report_lines(self):
+        '''One human-readable summary line per task'''
+        lines = []
+        for task in self.tasks:
+            stats = task.stats()
+            lines.append(
+                f"{task.name}: {stats['runs']} runs every {task.period:g}s, "
+                f"jitter {stats['jitter_mean_ms']}/{stats['jitter_max_ms']}ms (mean/max), "
+                f"run time {stats['duration_mean_ms']}/{stats['duration_max_ms']}ms, "
+                f"{stats['overruns']} overruns, {stats['missed']} missed, {stats['errors']} errors"
+            )
+        return lines
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Compact binary telemetry encoding for smart air vent samples
+One sample packs into a 14-byte struct (plus the optional device id),
+against well over 100 bytes for the equivalent JSON object. encode_text()
+wraps a record in base64 for text-only transports such as PubNub
+messages. Decoding gives back the same dict the JSON format uses.
+
+Record layout, version 1 (little endian):
+  version (uint8), flags (uint8), time seconds (uint32), time ms (uint16),
+  temperature*10 (int16), humidity*10 (uint16), vent angle (int16),
+  then the device id as UTF-8 filling the rest of the record
+  flags: bit0 motion, bit1 gas detected, bit2 temperature present,
+         bit3 humidity present, bit4 vent angle present,
+         bit5 gas state unknown (MQ-2 still warming up)
+
+Log files hold one record per entry, each prefixed with its length (uint8).
+
+Usage: python3 telemetry_codec.py <log file>   print a telemetry log
+       python3 telemetry_codec.py --bench      compare with JSON
+'''
+
+import base64
+import binascii
+import json
+import struct
+import sys
+import time
+
+CODEC_VERSION = 1
+RECORD = struct.Struct("<BBIHhHh")
+
+FLAG_MOTION = 0x01
+FLAG_GAS = 0x02
+FLAG_TEMPERATURE = 0x04
+FLAG_HUMIDITY = 0x08
+FLAG_VENT = 0x10
+FLAG_GAS_UNKNOWN = 0x20
+
+MAX_DEVICE_LENGTH = 64
+
+# ===== ENCODING =====
+def encode_sample(temperature, humidity, motion, gas_detected, vent_angle=None, timestamp=None, device=""):
+    '''Pack one sample into a binary record (gas_detected None: not known yet)'''
+    if timestamp is None:
+        timestamp = time.time()
+    flags = (FLAG_MOTION if motion else 0) | (FLAG_GAS if gas_detected else 0)
+    if gas_detected is None:
+        flags |= FLAG_GAS_UNKNOWN
+    temp_raw = hum_raw = vent_raw = 0
+    if temperature is not None:
+        flags |= FLAG_TEMPERATURE
+        temp_raw = int(round(temperature * 10))
+    if humidity is not None:
+        flags |= FLAG_HUMIDITY
+        hum_raw = int(round(humidity * 10))
+    if vent_angle is not None:
+        flags |= FLAG_VENT
+        vent_raw = int(round(vent_angle))
+    seconds = int(timestamp)
+    millis = int((timestamp - seconds) * 1000)
+    device_bytes = device.encode()
+    if len(device_bytes) > MAX_DEVICE_LENGTH:
+        raise ValueError(f"Device id longer than {MAX_DEVICE_LENGTH} bytes")
+    return RECORD.pack(CODEC_VERSION, flags, seconds, millis, temp_raw, hum_raw, vent_raw) + device_bytes
+
+def record_text(record):
+    '''Wrap an encoded record in base64 for text transports'''
+    return base64.b64encode(record).decode("ascii")
+
+def encode_text(*args, **kwargs):
+    '''encode_sample() wrapped in base64'''
+    return record_text(encode_sample(*args, **kwargs))
+
+# ===== DECODING =====
+def decode_sample(data):
+    '''Unpack a binary record into the same dict the JSON telemetry uses'''
+    if len(data) < RECORD.size:
+        raise ValueError("Telemetry record too short")
+    version, flags, seconds, millis, temp_raw, hum_raw, vent_raw = RECORD.unpack_from(data)
+    if version != CODEC_VERSION:
+        raise ValueError(f"Unsupported telemetry version {version}")
+    sample = {
+        "motion": bool(flags & FLAG_MOTION),
+        "gas_detected": None if flags & FLAG_GAS_UNKNOWN else bool(flags & FLAG_GAS),
+        "time": seconds + millis / 1000,
+    }
+    if flags & FLAG_TEMPERATURE:
+        sample["temperature"] = temp_raw / 10
+    if flags & FLAG_HUMIDITY:
+        sample["humidity"] = hum_raw / 10
+    if flags & FLAG_VENT:
+        sample["vent_angle"] = vent_raw
+    if len(data) > RECORD.size:
+        sample["device"] = bytes(data[RECORD.size:]).decode()
+    return sample
+
+def decode_text(text):
+    '''Decode a base64 record produced by encode_text()'''
+    try:
+        data = base64.b64decode(text, validate=True)
+    except binascii.Error as e:
+        raise ValueError(f"Invalid base64 telemetry: {e}")
+    return decode_sample(data)
+
+def is_binary(data):
+    '''True if raw bytes look like a binary record rather than JSON text'''
+    return len(data) > 0 and data[0] == CODEC_VERSION
+
+# ===== LOG FILES =====
+def write_log_record(file, record):
+    '''Append one encoded record to an open binary log file'''
+    file.write(bytes((len(record),)) + record)
+
+def read_log(path):
+    '''Yield every decoded sample in a telemetry log'''
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset < len(data):
+        length = data[offset]
+        record = data[offset + 1:offset + 1 + length]
+        if len(record) < length:
+            break  # Partial record left by an unclean shutdown
+        yield decode_sample(record)
+        offset += 1 + length
+
+# ===== BENCHMARK =====
+def benchmark(count=100000):
+    '''Compare payload size and encode time with the JSON format'''
+    sample = {"device": "z728", "temperature": 23.4, "humidity": 56.0, "motion": True,
+              "gas_detected": False, "vent_angle": 90, "time": 1700000000.25}
+    args = (23.4, 56.0, True, False, 90, 1700000000.25, "z728")
+    encoders = (
+        ("JSON", lambda: json.dumps(sample)),
+        ("binary", lambda: encode_sample(*args)),
+        ("base64", lambda: encode_text(*args)),
+    )
+    results = []
+    for name, encode in encoders:
+        begin = time.perf_counter()
+        for _ in range(count):
+            encode()
+        elapsed = time.perf_counter() - begin
+        results.append((name, len(encode()), elapsed / count * 1e6))
+    return results
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--bench"]:
+        for name, size, micros in benchmark():
+            print(f"{name:>6}: {size:3d} bytes, {micros:.2f}us per encode")
+    elif len(sys.argv) == 2:
+        for sample in read_log(sys.argv[1]):
+            time_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sample["time"]))
+            print(f"[{time_str}] {json.dumps(sample)}")
+    else:
+        print("Usage: " + __doc__.strip().split("Usage: ")[1])
+        sys.exit(1)
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Telemetry collector for a fleet of smart air vent nodes
+1. Nodes (function_3_1.py with COLLECTOR_ADDRESS set) send one JSON
+   message per sample over UDP, or POST it (or a list of them) over HTTP
+2. The collector keeps the latest reading and windowed statistics per
+   device in memory
+3. Every FANOUT_INTERVAL seconds one consolidated fleet snapshot is built
+   and fanned out to every Server-Sent Events subscriber and, optionally,
+   published to PubNub as a single message for the whole fleet
+
+Telemetry message (JSON object, or a binary record from telemetry_codec.py):
+  {"device": "z728", "temperature": 23.0, "humidity": 55.0, "motion": false,
+   "gas_detected": false, "vent_angle": 90, "time": 1700000000.0}
+  Only "device" is required; "time" defaults to the receive time.
+  Devices silent for EXPIRE_AFTER seconds are dropped; at most MAX_DEVICES
+  are tracked at once.
+
+HTTP endpoints:
+  POST /telemetry       one message or a list of messages
+  GET  /fleet           latest consolidated snapshot
+  GET  /fleet/<device>  one device from the latest snapshot
+  GET  /stream          Server-Sent Events, one snapshot per interval
+  GET  /stats           collector counters
+
+Usage: python3 telemetry_collector.py [--udp-port N] [--http-port N] [--interval S]
+                                      [--pubnub-channel C --publish-key K --subscribe-key K]
+'''
+
+import argparse
+import json
+import queue
+import socket
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from telemetry_codec import decode_sample, is_binary
+
+# ===== CONFIGURATION =====
+UDP_PORT = 7070
+HTTP_PORT = 7071
+FANOUT_INTERVAL = 5.0    # Seconds between consolidated snapshots
+STALE_AFTER = 30.0       # A device with no message for this long is reported offline
+EXPIRE_AFTER = 3600.0    # A device with no message for this long is forgotten
+MAX_DEVICES = 1024       # Messages from further new devices are rejected
+MAX_DATAGRAM = 2048      # Largest accepted UDP datagram
+SUBSCRIBER_BACKLOG = 4   # Snapshots queued per slow stream subscriber before dropping
+
+READING_FIELDS = ("temperature", "humidity", "motion", "gas_detected", "vent_angle")
+
+# ===== MESSAGE FORMAT =====
+def make_message(device, temperature, humidity, motion, gas_detected, vent_angle=None, timestamp=None):
+    '''Encode one telemetry sample as the bytes a node sends'''
+    message = {
+        "device": device,
+        "temperature": temperature,
+        "humidity": humidity,
+        "motion": bool(motion),
+        "gas_detected": None if gas_detected is None else bool(gas_detected),  # None while warming up
+        "time": time.time() if timestamp is None else timestamp,
+    }
+    if vent_angle is not None:
+        message["vent_angle"] = vent_angle
+    return json.dumps(message, separators=(",", ":")).encode()
+
+# ===== AGGREGATION =====
+class DeviceState:
+    '''Latest reading and statistics for one device'''
+
+    def __init__(self, device, now):
+        self.device = device
+        self.first_seen = now
+        self.last_seen = now
+        self.last_time = None
+        self.latest = {}
+        self.messages = 0
+        self.motion_events = 0
+        self.gas_events = 0
+        self.reset_window()
+
+    def reset_window(self):
+        self.window_count = 0
+        self.window_temp = []
+        self.window_humidity = []
+
+    def add(self, message, now):
+        self.last_seen = now
+        self.last_time = message.get("time", now)
+        self.messages += 1
+        self.window_count += 1
+        # Count rising edges, not samples
+        if message.get("motion") and not self.latest.get("motion"):
+            self.motion_events += 1
+        if message.get("gas_detected") and not self.latest.get("gas_detected"):
+            self.gas_events += 1
+        for field in READING_FIELDS:
+            if field in message:
+                self.latest[field] = message[field]
+        if isinstance(message.get("temperature"), (int, float)):
+            self.window_temp.append(message["temperature"])
+        if isinstance(message.get("humidity"), (int, float)):
+            self.window_humidity.append(message["humidity"])
+
+    def summary(self, now):
+        summary = dict(self.latest)
+        summary.update({
+            "online": now - self.last_seen <= STALE_AFTER,
+            "age": round(now - self.last_seen, 1),
+            "time": self.last_time,
+            "messages": self.messages,
+            "window_messages": self.window_count,
+            "motion_events": self.motion_events,
+            "gas_events": self.gas_events,
+        })
+        if self.window_temp:
+            summary["temperature_min"] = min(self.window_temp)
+            summary["temperature_max"] = max(self.window_temp)
+            summary["temperature_mean"] = round(sum(self.window_temp) / len(self.window_temp), 2)
+        if self.window_humidity:
+            summary["humidity_mean"] = round(sum(self.window_humidity) / len(self.window_humidity), 2)
+        return summary
+
+class TelemetryCollector:
+    '''In-memory per-device aggregation with periodic consolidated fan-out'''
+
+    def __init__(self, interval=FANOUT_INTERVAL, forward=None):
+        self.interval = interval
+        self.forward = forward  # Called with every consolidated snapshot dict
+        self.lock = threading.Lock()
+        self.devices = {}
+        self.subscribers = set()
+        self.snapshot = {"devices": {}, "device_count": 0, "online": 0, "generated": None}
+        self.snapshot_body = json.dumps(self.snapshot).encode()
+        self.stats = {"messages": 0, "udp": 0, "http": 0, "rejected": 0,
+                      "snapshots": 0, "stream_dropped": 0}
+
+    def ingest(self, message, source="udp"):
+        '''Add one decoded message, raise ValueError if it is malformed'''
+        self.ingest_all([message], source)
+
+    def ingest_all(self, messages, source="udp"):
+        '''Add decoded messages, all or none: raise ValueError if any is malformed'''
+        for message in messages:
+            if not isinstance(message, dict):
+                raise ValueError("message must be a JSON object")
+            device = message.get("device")
+            if not isinstance(device, str) or not device:
+                raise ValueError("message needs a device id")
+        now = time.time()
+        with self.lock:
+            new_devices = {message["device"] for message in messages} - self.devices.keys()
+            if len(self.devices) + len(new_devices) > MAX_DEVICES:
+                raise ValueError(f"collector is tracking the maximum of {MAX_DEVICES} devices")
+            for message in messages:
+                device = message["device"]
+                state = self.devices.get(device)
+                if state is None:
+                    state = self.devices[device] = DeviceState(device, now)
+                state.add(message, now)
+            self.stats["messages"] += len(messages)
+            self.stats[source] += len(messages)
+
+    def ingest_bytes(self, data, source="udp"):
+        '''Decode and add a message (or list of messages), return how many were accepted
+
+        A list is accepted or rejected as a whole, so a client can retry it.
+        '''
+        try:
+            if is_binary(data):
+                messages = [decode_sample(data)]
+            else:
+                decoded = json.loads(data)
+                messages = decoded if isinstance(decoded, list) else [decoded]
+            self.ingest_all(messages, source)
+            return len(messages)
+        except (ValueError, UnicodeDecodeError):
+            with self.lock:
+                self.stats["rejected"] += 1
+            raise
+
+    def build_snapshot(self):
+        '''Consolidate all devices into one snapshot and start a new window'''
+        now = time.time()
+        with self.lock:
+            for device in [device for device, state in self.devices.items()
+                           if now - state.last_seen > EXPIRE_AFTER]:
+                del self.devices[device]
+            devices = {}
+            for device, state in self.devices.items():
+                devices[device] = state.summary(now)
+                state.reset_window()
+            self.stats["snapshots"] += 1
+        snapshot = {
+            "generated": now,
+            "device_count": len(devices),
+            "online": sum(1 for summary in devices.values() if summary["online"]),
+            "devices": devices,
+        }
+        self.snapshot = snapshot
+        self.snapshot_body = json.dumps(snapshot).encode()
+        return snapshot
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["devices"] = len(self.devices)
+            stats["subscribers"] = len(self.subscribers)
+        return stats
+
+    # Stream subscribers get a bounded queue; a slow reader loses its oldest snapshot
+    def subscribe(self):
+        q = queue.Queue(SUBSCRIBER_BACKLOG)
+        with self.lock:
+            self.subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self.lock:
+            self.subscribers.discard(q)
+
+    def fan_out(self):
+        '''Build one snapshot and deliver it to every subscriber'''
+        self.build_snapshot()
+        body = self.snapshot_body
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for q in subscribers:
+            while True:
+                try:
+                    q.put_nowait(body)
+                    break
+                except queue.Full:
+                    try:
+                        q.get_nowait()
+                        with self.lock:
+                            self.stats["stream_dropped"] += 1
+                    except queue.Empty:
+                        pass
+        if self.forward:
+            try:
+                self.forward(self.snapshot)
+            except Exception as e:
+                print(f"[Collector] Forward failed: {e}")
+
+    def run_fanout(self):
+        next_time = time.monotonic() + self.interval
+        while True:
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.fan_out()
+            next_time += self.interval
+
+    def start(self):
+        threading.Thread(target=self.run_fanout, name="collector-fanout", daemon=True).start()
+
+# ===== TRANSPORTS =====
+def serve_udp(collector, port=UDP_PORT, host=""):
+    '''Receive telemetry datagrams in a background thread, return the socket'''
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+    sock.bind((host, port))
+
+    def run():
+        while True:
+            data, _ = sock.recvfrom(MAX_DATAGRAM)
+            try:
+                collector.ingest_bytes(data, "udp")
+            except (ValueError, UnicodeDecodeError):
+                pass
+
+    threading.Thread(target=run, name="collector-udp", daemon=True).start()
+    return sock
+
+def make_handler(collector):
+    '''HTTP request handler bound to a collector'''
+
+    class CollectorHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        timeout = 60
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass  # One log line per node message would swamp the console
+
+        def _send_body(self, body, code=200):
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, response, code=200):
+            self._send_body(json.dumps(response).encode(), code)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            data = self.rfile.read(length)
+            if self.path != "/telemetry":
+                self._send_json({"status": "error", "message": "unknown endpoint"}, 404)
+                return
+            try:
+                accepted = collector.ingest_bytes(data, "http")
+            except (ValueError, UnicodeDecodeError) as e:
+                self._send_json({"status": "error", "message": str(e)}, 400)
+                return
+            self._send_json({"status": "success", "accepted": accepted})
+
+        def do_GET(self):
+            if self.path == "/fleet":
+                self._send_body(collector.snapshot_body)
+            elif self.path.startswith("/fleet/"):
+                device = collector.snapshot["devices"].get(self.path[len("/fleet/"):])
+                if device is None:
+                    self._send_json({"status": "error", "message": "unknown device"}, 404)
+                else:
+                    self._send_json(device)
+            elif self.path == "/stats":
+                self._send_json(collector.get_stats())
+            elif self.path == "/stream":
+                self._stream()
+            else:
+                self._send_json({"status": "error", "message": "unknown endpoint"}, 404)
+
+        def _stream(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            self.close_connection = True
+            q = collector.subscribe()
+            try:
+                self.wfile.write(b"data: " + collector.snapshot_body + b"\n\n")
+                while True:
+                    self.wfile.write(b"data: " + q.get() + b"\n\n")
+            except OSError:
+                pass  # Subscriber went away
+            finally:
+                collector.unsubscribe(q)
+
+    return CollectorHandler
+
+def serve_http(collector, port=HTTP_PORT, host=""):
+    '''Serve the HTTP endpoints in a background thread, return the server'''
+    httpd = ThreadingHTTPServer((host, port), make_handler(collector))
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, name="collector-http", daemon=True).start()
+    return httpd
+
+def pubnub_forwarder(channel, publish_key, subscribe_key, uuid="vent-collector"):
+    '''Publish each consolidated snapshot to PubNub as one message (needs the pubnub package)'''
+    from pubnub.pnconfiguration import PNConfiguration
+    from pubnub.pubnub import PubNub
+
+    pnconfig = PNConfiguration()
+    pnconfig.publish_key = publish_key
+    pnconfig.subscribe_key = subscribe_key
+    pnconfig.uuid = uuid
+    pubnub = PubNub(pnconfig)
+
+    def forward(snapshot):
+        envelope = pubnub.publish().channel(channel).message(snapshot).sync()
+        if envelope.status.is_error():
+            print(f"[Collector] PubNub error: {envelope.status.error}")
+
+    return forward
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Telemetry collector for smart air vent nodes")
+    parser.add_argument("--udp-port", type=int, default=UDP_PORT)
+    parser.add_argument("--http-port", type=int, default=HTTP_PORT)
+    parser.add_argument("--interval", type=float, default=FANOUT_INTERVAL)
+    parser.add_argument("--pubnub-channel")
+    parser.add_argument("--publish-key")
+    parser.add_argument("--subscribe-key")
+    args = parser.parse_args()
+
+    forward = None
+    if args.pubnub_channel:
+        forward = pubnub_forwarder(args.pubnub_channel, args.publish_key, args.subscribe_key)
+
+    collector = TelemetryCollector(args.interval, forward)
+    serve_udp(collector, args.udp_port)
+    serve_http(collector, args.http_port)
+    collector.start()
+    print(f"Collecting telemetry on UDP {args.udp_port} and HTTP {args.http_port}")
+    try:
+        while True:
+            time.sleep(args.interval)
+            stats = collector.get_stats()
+            print(f"[Collector] {stats['devices']} devices, {stats['messages']} messages, "
+                  f"{stats['rejected']} rejected, {stats['subscribers']} subscribers")
+    except KeyboardInterrupt:
+        print("\nCollector stopped")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Load test for telemetry_collector.py
+Simulates hundreds of vent nodes on one machine, each sending telemetry at
+a fixed rate over UDP or HTTP (one keep-alive connection per node), with a
+few Server-Sent Events subscribers reading the consolidated stream.
+Reports delivery, loss, request latency and fan-out counts.
+
+Without --host an in-process collector is started on free ports.
+
+Usage: python3 telemetry_loadtest.py [--nodes N] [--rate HZ] [--duration S]
+                                     [--transport udp|http] [--format json|binary]
+                                     [--subscribers N]
+                                     [--host H --udp-port N --http-port N]
+'''
+
+import argparse
+import heapq
+import http.client
+import json
+import random
+import socket
+import threading
+import time
+
+from telemetry_collector import TelemetryCollector, make_message, serve_udp, serve_http
+from telemetry_codec import encode_sample
+
+SENDER_THREADS = 8  # Simulated nodes are spread over this many sender threads
+
+def get_json(host, port, path):
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    try:
+        conn.request("GET", path)
+        return json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+class SimulatedNode:
+    '''One fake vent controller with slowly drifting readings'''
+
+    def __init__(self, index, binary=False):
+        self.device = f"node-{index:04d}"
+        self.binary = binary
+        self.temperature = random.uniform(18, 28)
+        self.humidity = random.uniform(40, 75)
+        self.conn = None
+
+    def next_message(self):
+        self.temperature += random.uniform(-0.2, 0.2)
+        self.humidity += random.uniform(-0.5, 0.5)
+        reading = (round(self.temperature, 1), round(self.humidity, 1),
+                   random.random() < 0.05, random.random() < 0.001, 90)
+        if self.binary:
+            return encode_sample(*reading, device=self.device)
+        return make_message(self.device, *reading)
+
+def run_sender(nodes, args, deadline, results):
+    '''Send from a group of nodes, each on its own evenly phased schedule'''
+    period = 1.0 / args.rate
+    start = time.monotonic()
+    schedule = [(start + random.uniform(0, period), i) for i in range(len(nodes))]
+    heapq.heapify(schedule)
+    sent = sent_bytes = errors = 0
+    latencies = []
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM) if args.transport == "udp" else None
+
+    while schedule:
+        due, i = schedule[0]
+        if due >= deadline:
+            break
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        node = nodes[i]
+        data = node.next_message()
+        try:
+            if sock:
+                sock.sendto(data, (args.host, args.udp_port))
+            else:
+                if node.conn is None:
+                    node.conn = http.client.HTTPConnection(args.host, args.http_port, timeout=10)
+                begin = time.perf_counter()
+                node.conn.request("POST", "/telemetry", body=data)
+                response = node.conn.getresponse()
+                response.read()
+                latencies.append(time.perf_counter() - begin)
+                if response.status != 200:
+                    errors += 1
+            sent += 1
+            sent_bytes += len(data)
+        except OSError:
+            errors += 1
+            node.conn = None
+        heapq.heapreplace(schedule, (due + period, i))
+
+    for node in nodes:
+        if node.conn:
+            node.conn.close()
+    if sock:
+        sock.close()
+    results.append((sent, sent_bytes, errors, latencies))
+
+def run_subscriber(args, deadline, counts):
+    '''Read the consolidated SSE stream until the test ends'''
+    conn = http.client.HTTPConnection(args.host, args.http_port, timeout=5)
+    conn.request("GET", "/stream")
+    response = conn.getresponse()
+    events = 0
+    devices = 0
+    try:
+        while time.monotonic() < deadline:
+            line = response.readline()
+            if not line:
+                break
+            if line.startswith(b"data: "):
+                events += 1
+                devices = json.loads(line[6:])["device_count"]
+    except OSError:
+        pass
+    conn.close()
+    counts.append((events, devices))
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the telemetry collector")
+    parser.add_argument("--nodes", type=int, default=300)
+    parser.add_argument("--rate", type=float, default=1.0, help="messages per second per node")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--transport", choices=("udp", "http"), default="udp")
+    parser.add_argument("--format", choices=("json", "binary"), default="json")
+    parser.add_argument("--subscribers", type=int, default=5)
+    parser.add_argument("--host")
+    parser.add_argument("--udp-port", type=int, default=7070)
+    parser.add_argument("--http-port", type=int, default=7071)
+    args = parser.parse_args()
+
+    if args.host is None:
+        # In-process collector on free ports, fast fan-out so the test sees several snapshots
+        collector = TelemetryCollector(interval=1.0)
+        args.host = "127.0.0.1"
+        args.udp_port = serve_udp(collector, 0, args.host).getsockname()[1]
+        args.http_port = serve_http(collector, 0, args.host).server_address[1]
+        collector.start()
+
+    before = get_json(args.host, args.http_port, "/stats")
+    nodes = [SimulatedNode(i, args.format == "binary") for i in range(args.nodes)]
+    begin = time.monotonic()
+    deadline = begin + args.duration
+
+    counts = []
+    subscribers = [threading.Thread(target=run_subscriber, args=(args, deadline, counts))
+                   for _ in range(args.subscribers)]
+    results = []
+    senders = [threading.Thread(target=run_sender, args=(nodes[i::SENDER_THREADS], args, deadline, results))
+               for i in range(SENDER_THREADS)]
+    for thread in subscribers + senders:
+        thread.start()
+    for thread in senders:
+        thread.join()
+    elapsed = time.monotonic() - begin
+    time.sleep(0.5)  # Let the collector drain its socket buffer
+    after = get_json(args.host, args.http_port, "/stats")
+    for thread in subscribers:
+        thread.join()
+
+    sent = sum(r[0] for r in results)
+    sent_bytes = sum(r[1] for r in results)
+    errors = sum(r[2] for r in results)
+    latencies = [latency for r in results for latency in r[3]]
+    received = after[args.transport] - before[args.transport]
+    lost = max(0, sent - received)
+
+    print(f"Nodes: {args.nodes} over {args.transport.upper()} ({args.format}), {args.rate:g} msg/s each, {elapsed:.1f}s")
+    print(f"Sent: {sent} ({sent / elapsed:.0f} msg/s, {sent_bytes} bytes), errors: {errors}")
+    print(f"Received by collector: {received}, lost: {lost} ({lost / sent * 100 if sent else 0:.2f}%)")
+    print(f"Devices tracked: {after['devices']}, rejected messages: {after['rejected'] - before['rejected']}")
+    if latencies:
+        print(f"HTTP latency: p50 {percentile(latencies, 0.5) * 1000:.2f}ms, "
+              f"p99 {percentile(latencies, 0.99) * 1000:.2f}ms, max {max(latencies) * 1000:.2f}ms")
+    for i, (events, devices) in enumerate(counts):
+        print(f"Subscriber {i}: {events} consolidated snapshots, last covered {devices} devices")
+    print(f"Snapshots dropped for slow subscribers: {after['stream_dropped'] - before['stream_dropped']}")
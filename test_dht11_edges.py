@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+test_dht11_edges.py - decode_edges() 的帧解码测试
+按DHT11时序生成 (timestamp_ns, rising) 边沿序列，不需要树莓派硬件。
+运行：python3 -m pytest test_dht11_edges.py 或 python3 test_dht11_edges.py
+'''
+
+import unittest
+
+from dht11_edges import decode_edges, ERR_NO_ERROR, ERR_MISSING_DATA, ERR_CRC
+
+def frame_edges(frame, lost_edges=0):
+    '''按DHT11时序把5字节帧转换为边沿：80us响应脉冲，每位50us低电平后跟26us(0)或70us(1)高电平'''
+    edges = []
+    t = 1000000
+    # 主机释放总线后，传感器拉低80us，再拉高80us
+    edges.append((t, False))
+    t += 80000
+    edges.append((t, True))
+    t += 80000
+    for byte in frame:
+        for bit in range(7, -1, -1):
+            edges.append((t, False))
+            t += 50000
+            edges.append((t, True))
+            t += 70000 if byte >> bit & 1 else 26000
+    edges.append((t, False))  # 最后一位结束
+    t += 50000
+    edges.append((t, True))  # 释放总线，上拉电阻拉高
+    return edges[lost_edges:]
+
+def checksum(data):
+    return sum(data) & 0xFF
+
+class DecodeEdgesTest(unittest.TestCase):
+    def test_valid_frame(self):
+        data = [55, 0, 23, 4]
+        result = decode_edges(frame_edges(data + [checksum(data)]))
+        self.assertTrue(result.is_valid())
+        self.assertEqual(result.error_code, ERR_NO_ERROR)
+        self.assertEqual(result.humidity, 55.0)
+        self.assertAlmostEqual(result.temperature, 23.4)
+
+    def test_edges_lost_before_response_are_ignored(self):
+        # 切换为输入时可能丢失响应脉冲的边沿，数据位是最后40个高电平脉冲
+        data = [40, 0, 19, 0]
+        result = decode_edges(frame_edges(data + [checksum(data)], lost_edges=3))
+        self.assertTrue(result.is_valid())
+        self.assertEqual((result.humidity, result.temperature), (40.0, 19.0))
+
+    def test_crc_failure(self):
+        data = [55, 0, 23, 4]
+        result = decode_edges(frame_edges(data + [checksum(data) ^ 0x01]))
+        self.assertFalse(result.is_valid())
+        self.assertEqual(result.error_code, ERR_CRC)
+
+    def test_short_frame(self):
+        data = [55, 0, 23, 4]
+        edges = frame_edges(data + [checksum(data)])
+        result = decode_edges(edges[:60])  # 只收到了一半的位
+        self.assertEqual(result.error_code, ERR_MISSING_DATA)
+        self.assertEqual(decode_edges([]).error_code, ERR_MISSING_DATA)
+
+    def test_overlong_pulse_is_missing_data(self):
+        data = [55, 0, 23, 4]
+        edges = frame_edges(data + [checksum(data)])
+        # 把最后一位的高电平拉长到200us，视为帧损坏
+        timestamp, rising = edges[-2]
+        edges[-2] = (timestamp + 200000, rising)
+        edges[-1] = (timestamp + 250000, True)
+        self.assertEqual(decode_edges(edges).error_code, ERR_MISSING_DATA)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+test_lcd_transport.py - PCF8574Transport 的 I2C 传输测试
+通过 FakeBus 记录块写入并解码回LCD字节，不需要树莓派硬件。
+运行：python3 -m pytest test_lcd_transport.py 或 python3 test_lcd_transport.py
+'''
+
+import unittest
+
+from lcd_transport import (PCF8574Transport, FakeBus, I2C_ADDRESS, I2C_BLOCK_SIZE,
+                           PIN_BACKLIGHT, PIN_E, PIN_RS)
+
+LCD_CHR = True
+LCD_CMD = False
+LCD_LINE_1 = 0x80
+LCD_LINE_2 = 0xC0
+
+# 与 function_3_1.lcd_init() 相同的初始化序列
+INIT_SEQUENCE = [0x33, 0x32, 0x06, 0x0C, 0x28, 0x01]
+
+class PCF8574TransportTest(unittest.TestCase):
+    def setUp(self):
+        self.bus = FakeBus()
+        self.sleeps = []
+        self.lcd = PCF8574Transport(self.bus, sleep=self.sleeps.append)
+
+    def send_init(self):
+        for bits in INIT_SEQUENCE:
+            self.lcd.send(bits, LCD_CMD)
+        self.lcd.flush()
+
+    def send_page(self, rows):
+        for line, message in rows:
+            self.lcd.send(line, LCD_CMD)
+            for char in message.ljust(16)[:16]:
+                self.lcd.send(ord(char), LCD_CHR)
+        self.lcd.flush()
+
+    def test_init_sequence_decodes(self):
+        self.send_init()
+        self.assertEqual(self.bus.decode(), [(bits, LCD_CMD) for bits in INIT_SEQUENCE])
+        # 0x33、0x32和清屏是慢命令，各自单独写出并等待
+        self.assertEqual(len(self.sleeps), 3)
+        self.assertEqual(self.bus.transactions[0][0], I2C_ADDRESS)
+
+    def test_page_decodes(self):
+        rows = [(LCD_LINE_1, "Temp: 23.4C"), (LCD_LINE_2, "Humidity: 55.0%")]
+        self.send_init()
+        self.send_page(rows)
+        expected = [(bits, LCD_CMD) for bits in INIT_SEQUENCE]
+        for line, message in rows:
+            expected.append((line, LCD_CMD))
+            expected.extend((ord(char), LCD_CHR) for char in message.ljust(16))
+        self.assertEqual(self.bus.decode(), expected)
+
+    def test_block_writes_stay_within_smbus_limit(self):
+        self.send_page([(LCD_LINE_1, "A" * 16), (LCD_LINE_2, "B" * 16)])
+        sizes = [len(states) for _, states in self.bus.transactions]
+        # 寄存器字节加32个数据字节：每次块写入最多33个端口状态
+        self.assertTrue(all(size <= I2C_BLOCK_SIZE + 1 for size in sizes))
+        self.assertEqual(sizes[:-1], [I2C_BLOCK_SIZE + 1] * (len(sizes) - 1))
+        self.assertEqual(self.lcd.stats(), {"transactions": len(sizes), "bytes": sum(sizes)})
+        with self.assertRaises(ValueError):
+            self.bus.write_i2c_block_data(I2C_ADDRESS, 0, [0] * (I2C_BLOCK_SIZE + 1))
+
+    def test_rs_settles_before_enable(self):
+        self.send_page([(LCD_LINE_1, "RS")])
+        states = self.bus.port_states()
+        for previous, port in zip(states, states[1:]):
+            if port & PIN_E and not previous & PIN_E:
+                self.assertEqual(port & PIN_RS, previous & PIN_RS)
+
+    def test_backlight(self):
+        self.send_init()
+        self.assertTrue(all(port & PIN_BACKLIGHT for port in self.bus.port_states()))
+        self.lcd.set_backlight(False)
+        self.assertFalse(self.bus.port_states()[-1] & PIN_BACKLIGHT)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+test_pwm_backend.py - HardwarePWM 的 sysfs 测试
+在临时目录中按 /sys/class/pwm 的结构布置 pwmchip0，不需要树莓派硬件。
+运行：python3 -m pytest test_pwm_backend.py 或 python3 test_pwm_backend.py
+'''
+
+import os
+import tempfile
+import unittest
+
+from pwm_backend import HardwarePWM
+
+class HardwarePWMTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        channel_path = os.path.join(self.root, 'pwmchip0', 'pwm0')
+        os.makedirs(channel_path)  # 相当于通道已经导出
+        for name in ('export', 'unexport'):
+            open(os.path.join(self.root, 'pwmchip0', name), 'w').close()
+        for name in ('period', 'duty_cycle', 'enable'):
+            with open(os.path.join(channel_path, name), 'w') as f:
+                f.write('0')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, name):
+        with open(os.path.join(self.root, 'pwmchip0', 'pwm0', name)) as f:
+            return int(f.read())
+
+    def test_start_writes_period_duty_and_enable(self):
+        pwm = HardwarePWM(0, 0, 50, sysfs_root=self.root)
+        pwm.start(7.5)
+        self.assertEqual(self.read('period'), 20000000)
+        self.assertEqual(self.read('duty_cycle'), 1500000)
+        self.assertEqual(self.read('enable'), 1)
+
+    def test_change_frequency_keeps_duty_cycle_percentage(self):
+        # 与GPIO.PWM相同：改变频率后占空比（百分比）不变，脉宽随周期变化
+        pwm = HardwarePWM(0, 0, 50, sysfs_root=self.root)
+        pwm.start(10)
+        pwm.ChangeFrequency(100)
+        self.assertEqual(self.read('period'), 10000000)
+        self.assertEqual(self.read('duty_cycle'), 1000000)
+        pwm.ChangeFrequency(25)
+        self.assertEqual(self.read('period'), 40000000)
+        self.assertEqual(self.read('duty_cycle'), 4000000)
+
+    def test_change_frequency_after_pulse_width(self):
+        pwm = HardwarePWM(0, 0, 50, sysfs_root=self.root)
+        pwm.set_pulse_width_us(1500)  # 20ms周期的7.5%
+        pwm.ChangeFrequency(100)
+        self.assertEqual(self.read('duty_cycle'), 750000)
+
+    def test_pulse_width_is_clamped_to_period(self):
+        pwm = HardwarePWM(0, 0, 50, sysfs_root=self.root)
+        pwm.set_pulse_width_ns(30000000)
+        self.assertEqual(self.read('duty_cycle'), 20000000)
+        pwm.ChangeDutyCycle(-5)
+        self.assertEqual(self.read('duty_cycle'), 0)
+
+    def test_stop_disables_and_unexports(self):
+        pwm = HardwarePWM(0, 0, 50, sysfs_root=self.root)
+        pwm.start(5)
+        pwm.stop()
+        self.assertEqual(self.read('enable'), 0)
+        with open(os.path.join(self.root, 'pwmchip0', 'unexport')) as f:
+            self.assertEqual(f.read(), '0')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Vectorized batch evaluator for the vent decision policy (requires NumPy)
+Computes the same positions and reasons as vent_control.decide_vent_position()
+for whole arrays of readings, and for many threshold combinations at once.
+
+Reasons are returned as small integer codes; reason_strings() turns them
+back into the exact strings the scalar function produces.
+
+Usage: python3 vent_batch.py <trace file>
+  Evaluates a grid of thresholds over a recorded sensor trace and prints
+  how often the vent position would change for each combination.
+'''
+
+import itertools
+import sys
+import time
+
+import numpy as np
+
+from vent_control import TEMP_HIGH, TEMP_LOW, HUMIDITY_HIGH, NO_MOTION_CLOSE_TIME
+from sensor_trace import load_trace, RECORD, REC_DHT_OK, REC_PIR, REC_GAS, REC_REBASE
+
+# ===== REASON CODES =====
+REASON_NORMAL = 0
+REASON_GAS = 1
+REASON_HIGH_TEMP = 2
+REASON_LOW_TEMP = 3
+REASON_HIGH_HUMIDITY = 4
+REASON_NO_MOTION = 5
+
+# Positions for each reason code, indexed by code
+REASON_POSITIONS = np.array([90, 180, 180, 0, 180, 0], dtype=np.int16)
+
+# Evaluate at most this many (combination, sample) cells at once to bound memory
+MAX_CELLS = 1 << 22
+
+# ===== BATCH EVALUATION =====
+def evaluate_batch(temp, humidity, motion, gas, no_motion_time,
+                   temp_high=TEMP_HIGH, temp_low=TEMP_LOW, humidity_high=HUMIDITY_HIGH,
+                   no_motion_close_time=NO_MOTION_CLOSE_TIME):
+    '''Return (positions, reason codes) for arrays of readings
+
+    Readings are 1-D arrays of length N. Thresholds are scalars, or 1-D
+    arrays of length K to evaluate K combinations at once, in which case the
+    results have shape (K, N).
+    no_motion_time is current_time - last_motion_time for each sample.
+    '''
+    temp = np.asarray(temp)
+    humidity = np.asarray(humidity)
+    motion = np.asarray(motion, dtype=bool)
+    gas = np.asarray(gas, dtype=bool)
+    no_motion_time = np.asarray(no_motion_time)
+
+    grid = np.ndim(temp_high) or np.ndim(temp_low) or np.ndim(humidity_high) or np.ndim(no_motion_close_time)
+    if grid:
+        # Thresholds become column vectors so they broadcast against the readings
+        temp_high = np.asarray(temp_high).reshape(-1, 1)
+        temp_low = np.asarray(temp_low).reshape(-1, 1)
+        humidity_high = np.asarray(humidity_high).reshape(-1, 1)
+        no_motion_close_time = np.asarray(no_motion_close_time).reshape(-1, 1)
+
+    high_temp = temp > temp_high
+    low_temp = temp < temp_low
+    high_humidity = ~high_temp & ~low_temp & (humidity > humidity_high)
+    no_motion = ~motion & (no_motion_time > no_motion_close_time)
+
+    # Same priority as the scalar if-chain: gas > no motion > humidity > temperature
+    codes = np.select(
+        [gas, no_motion, high_humidity, high_temp, low_temp],
+        [REASON_GAS, REASON_NO_MOTION, REASON_HIGH_HUMIDITY, REASON_HIGH_TEMP, REASON_LOW_TEMP],
+        REASON_NORMAL,
+    ).astype(np.uint8)
+    return REASON_POSITIONS[codes], codes
+
+def threshold_grid(temp_highs=(TEMP_HIGH,), temp_lows=(TEMP_LOW,), humidity_highs=(HUMIDITY_HIGH,),
+                   no_motion_close_times=(NO_MOTION_CLOSE_TIME,)):
+    '''Return the cartesian product of threshold candidates as four 1-D arrays'''
+    combos = np.array(list(itertools.product(temp_highs, temp_lows, humidity_highs, no_motion_close_times)))
+    return combos[:, 0], combos[:, 1], combos[:, 2], combos[:, 3]
+
+def evaluate_grid(temp, humidity, motion, gas, no_motion_time, grid):
+    '''Evaluate every threshold combination in grid, in chunks to bound memory'''
+    temp_high, temp_low, humidity_high, no_motion_close_time = grid
+    count = len(temp_high)
+    chunk = max(1, MAX_CELLS // max(1, len(temp)))
+    positions = np.empty((count, len(temp)), dtype=np.int16)
+    codes = np.empty((count, len(temp)), dtype=np.uint8)
+    for start in range(0, count, chunk):
+        end = start + chunk
+        positions[start:end], codes[start:end] = evaluate_batch(
+            temp, humidity, motion, gas, no_motion_time,
+            temp_high[start:end], temp_low[start:end],
+            humidity_high[start:end], no_motion_close_time[start:end]
+        )
+    return positions, codes
+
+def reason_strings(codes, temp, humidity, no_motion_time):
+    '''Format reason codes into the strings decide_vent_position() returns'''
+    temp = np.asarray(temp).tolist()
+    humidity = np.asarray(humidity).tolist()
+    no_motion_time = np.asarray(no_motion_time).tolist()
+    reasons = []
+    for i, code in enumerate(np.asarray(codes).tolist()):
+        if code == REASON_GAS:
+            reasons.append("Gas/Smoke Detected")
+        elif code == REASON_HIGH_TEMP:
+            reasons.append(f"High temp ({temp[i]}C)")
+        elif code == REASON_LOW_TEMP:
+            reasons.append(f"Low temp ({temp[i]}C)")
+        elif code == REASON_HIGH_HUMIDITY:
+            reasons.append(f"High humidity ({humidity[i]}%)")
+        elif code == REASON_NO_MOTION:
+            reasons.append(f"No motion ({int(no_motion_time[i]//60)}min)")
+        else:
+            reasons.append("Normal ventilation")
+    return reasons
+
+def count_changes(positions):
+    '''Count position changes between consecutive samples (per combination)'''
+    return np.count_nonzero(np.diff(positions, axis=-1), axis=-1)
+
+# ===== TRACE INPUT =====
+def load_trace_arrays(path):
+    '''Turn a sensor trace into reading arrays for evaluate_batch()
+
+    Motion debouncing matches VentController, so no_motion_time is the same
+    value the live controller passes to decide_vent_position().
+    '''
+    start_time, body = load_trace(path)
+    temp, humidity, motion, gas, no_motion_time = [], [], [], [], []
+    level_motion = 0
+    level_gas = 0
+    last_detected_motion = 0
+    last_motion_time = start_time
+    for offset_ms, rec_type, a, b in RECORD.iter_unpack(body):
+        if rec_type == REC_PIR:
+            level_motion = a
+        elif rec_type == REC_GAS:
+            level_gas = a
+        elif rec_type == REC_DHT_OK:
+            current_time = start_time + offset_ms / 1000
+            if level_motion and not last_detected_motion and current_time - last_motion_time > 1:
+                last_motion_time = current_time
+            last_detected_motion = level_motion
+            temp.append(a / 10)
+            humidity.append(b / 10)
+            motion.append(level_motion)
+            gas.append(level_gas)
+            no_motion_time.append(current_time - last_motion_time)
+        elif rec_type == REC_REBASE:
+            start_time += offset_ms / 1000
+    return (np.array(temp), np.array(humidity), np.array(motion, dtype=bool),
+            np.array(gas, dtype=bool), np.array(no_motion_time))
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python3 vent_batch.py <trace file>")
+        sys.exit(1)
+
+    readings = load_trace_arrays(sys.argv[1])
+    grid = threshold_grid(
+        temp_highs=(25, 26, 27, 28),
+        temp_lows=(16, 17, 18, 19),
+        humidity_highs=(65, 70, 75, 80),
+        no_motion_close_times=(180, 300, 600),
+    )
+    begin = time.perf_counter()
+    positions, codes = evaluate_grid(*readings, grid)
+    elapsed = time.perf_counter() - begin
+
+    changes = count_changes(positions)
+    for i in np.argsort(changes, kind="stable"):
+        print(f"TEMP_HIGH={grid[0][i]:g} TEMP_LOW={grid[1][i]:g} HUMIDITY_HIGH={grid[2][i]:g} "
+              f"NO_MOTION_CLOSE_TIME={grid[3][i]:g}: {changes[i]} position changes")
+    cells = positions.size
+    print(f"Evaluated {len(grid[0])} combinations x {len(readings[0])} samples "
+          f"in {elapsed:.3f}s ({cells / elapsed if elapsed > 0 else 0:.0f} decisions/s)")
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Smart air vent control logic (no hardware dependencies)
+Shared by the live controller (function_3_1.py) and the sensor trace
+replay engine (sensor_trace.py), so both run exactly the same decisions.
+'''
+
+import math
+import time
+
+from vent_rules import load_rules
+
+# ===== CONFIGURATION PARAMETERS =====
+# Thresholds and rules are declared in vent_rules.json (see vent_rules.py)
+# The constants below are None if the rule table does not define that threshold
+RULES = load_rules()
+TEMP_HIGH = RULES.thresholds.get("temp_high")  # High temperature threshold (Celsius)
+TEMP_LOW = RULES.thresholds.get("temp_low")    # Low temperature threshold (Celsius)
+HUMIDITY_HIGH = RULES.thresholds.get("humidity_high")  # High humidity threshold (percentage)
+NO_MOTION_CLOSE_TIME = RULES.thresholds.get("no_motion_close_time")  # Time to close vent after no motion (seconds)
+
+# ===== SMART CONTROL LOGIC =====
+# decide_vent_position(temp, humidity, motion_detected, gas_detected, last_motion_time,
+#                      current_time, temp_high=..., temp_low=..., humidity_high=...,
+#                      no_motion_close_time=...) -> (position, reason)
+# compiled from the rule table; thresholds can be overridden per call for tuning
+decide_vent_position = RULES.decide
+OVERRIDE_RULE = "override"  # Active rule while a remote override holds the vent
+
+def check_thresholds(thresholds):
+    '''Raise ValueError unless a merged threshold set is usable'''
+    for name, value in thresholds.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"{name} must be a finite number")
+    if "temp_low" in thresholds and "temp_high" in thresholds and thresholds["temp_low"] >= thresholds["temp_high"]:
+        raise ValueError("temp_low must be below temp_high")
+    if thresholds.get("no_motion_close_time", 0) < 0:
+        raise ValueError("no_motion_close_time must not be negative")
+
+# ===== ACTUATION POLICY =====
+VENT_CHANGE_INTERVAL = 10  # Adjust vent position at most once every 10 seconds
+SERVO_MOVE_TIME = 0.3  # Time a blocking set_angle() call stalls the loop (seconds)
+# Hysteresis bands, minimum dwell times and which rules preempt a dwell are
+# per-rule settings in vent_rules.json ("hysteresis", "dwell", "preempt")
+
+class VentController:
+    '''Motion/gas edge tracking and rate-limited vent decisions'''
+
+    def __init__(self, start_time, servo_position=90, actuator=None, log=print, hysteresis=True, rules=RULES):
+        # actuator: callable(angle) that moves the servo, None for dry runs;
+        # if it raises, the move is not recorded and the error propagates
+        # log: callable(message) for status lines, None to stay silent
+        # hysteresis: apply the rules' hysteresis bands and dwell times
+        # rules: vent_rules.RuleSet the decisions and policy come from
+        self.actuator = actuator
+        self.rules = rules
+        self.log = log
+        self.motion_count = 0
+        self.last_motion_time = start_time  # Initialize to start time
+        self.servo_position = servo_position
+        self.last_detected_motion = False  # Last motion state
+        self.last_detected_gas = False  # Last gas detection state
+        self.last_vent_change_time = 0  # Last vent position change time
+        self.current_reason = "Initial state"  # Current reason for vent position
+        self.actuation_count = 0  # Number of servo moves issued
+        self.hysteresis = hysteresis
+        self.active_rule = None  # Rule currently holding the vent position
+        self.holding = None  # Why a pending move is being held back, if it is
+        self.moves_avoided_hysteresis = 0  # Moves suppressed by the hysteresis bands
+        self.moves_avoided_dwell = 0  # Moves suppressed by rule dwell times
+        self.thresholds = dict(rules.thresholds)
+        self.override = None  # Angle forced by a remote command, None for automatic control
+        self.override_until = None  # Time the override expires, None to hold until cleared
+
+    @property
+    def moves_avoided(self):
+        return self.moves_avoided_hysteresis + self.moves_avoided_dwell
+
+    @property
+    def stall_time_avoided(self):
+        '''Loop stall time saved by the avoided moves (seconds)'''
+        return self.moves_avoided * SERVO_MOVE_TIME
+
+    def _thresholds(self):
+        '''Thresholds widened by the hysteresis band of the active rule'''
+        offsets = self.rules.hysteresis.get(self.active_rule)
+        if not offsets:
+            return {}
+        return {name: self.thresholds[name] + offset for name, offset in offsets.items()}
+
+    def set_thresholds(self, **thresholds):
+        '''Change decision thresholds at runtime (temp_high, temp_low, ...)
+
+        The merged set is checked first; ValueError leaves the thresholds unchanged.
+        '''
+        unknown = set(thresholds) - set(self.thresholds)
+        if unknown:
+            raise ValueError(f"Unknown threshold: {', '.join(sorted(unknown))}")
+        merged = {**self.thresholds, **thresholds}
+        check_thresholds(merged)
+        self.thresholds = merged
+        if self.log:
+            self.log(f"Thresholds changed: {thresholds}")
+
+    def set_override(self, angle, current_time, duration=None):
+        '''Hold the vent at angle until cleared or duration expires; return True if it moved
+
+        Gas detection still opens the vent while an override is active.
+        '''
+        self.override = angle
+        self.override_until = current_time + duration if duration else None
+        if self.last_detected_gas:
+            return False
+        return self._move(angle, f"Override ({angle}°)", OVERRIDE_RULE, current_time)
+
+    def clear_override(self):
+        '''Return to automatic control on the next sample'''
+        if self.override is not None and self.log:
+            self.log("Override cleared, automatic control resumed")
+        self.override = None
+        self.override_until = None
+        self.last_vent_change_time = 0  # Let the next sample re-decide right away
+
+    def _hold(self, why):
+        '''Count one avoided move per held episode, not per sample'''
+        if self.holding != why:
+            if why == "hysteresis":
+                self.moves_avoided_hysteresis += 1
+            else:
+                self.moves_avoided_dwell += 1
+        self.holding = why
+
+    def _time_str(self, current_time):
+        return time.strftime("%H:%M:%S", time.localtime(current_time))
+
+    def update(self, temp, humidity, current_motion, current_gas, current_time):
+        '''Process one valid sensor sample; return True if the vent moved'''
+        # Detect current motion state
+        if current_motion and not self.last_detected_motion:
+            if current_time - self.last_motion_time > 1:  # Avoid consecutive triggers
+                self.motion_count += 1
+                if self.log:
+                    self.log(f"[{self._time_str(current_time)}] Motion detected! Total: {self.motion_count}")
+                self.last_motion_time = current_time
+
+        # Detect current gas state
+        if current_gas and not self.last_detected_gas and self.log:
+            self.log(f"[{self._time_str(current_time)}] Gas/Smoke detected!")
+
+        # Update detection states
+        self.last_detected_motion = current_motion
+        self.last_detected_gas = current_gas
+
+        # A remote override holds the vent until it expires (gas still wins)
+        if self.override is not None:
+            if self.override_until is not None and current_time >= self.override_until:
+                self.clear_override()
+            elif not current_gas:
+                return self._move(self.override, f"Override ({self.override}°)", OVERRIDE_RULE, current_time)
+
+        # Decide vent position
+        if current_time - self.last_vent_change_time <= VENT_CHANGE_INTERVAL:
+            return False
+        thresholds = self._thresholds() if self.hysteresis else {}
+        new_position, reason, rule = self.rules.decide_rule(
+            temp, humidity, current_motion, current_gas,
+            self.last_motion_time, current_time, **{**self.thresholds, **thresholds}
+        )
+
+        # If position needs to change, control servo
+        if new_position == self.servo_position:
+            if thresholds:
+                raw_position, _ = self.rules.decide(
+                    temp, humidity, current_motion, current_gas,
+                    self.last_motion_time, current_time, **self.thresholds
+                )
+                if raw_position != self.servo_position:
+                    self._hold("hysteresis")
+                    return False
+            self.active_rule = rule
+            self.holding = None
+            return False
+        if (self.hysteresis and rule not in self.rules.preempt
+                and current_time - self.last_vent_change_time < self.rules.dwell.get(self.active_rule, 0)):
+            self._hold("dwell")
+            return False
+        return self._move(new_position, reason, rule, current_time)
+
+    def _move(self, new_position, reason, rule, current_time):
+        '''Move the vent for a rule; return True if it moved'''
+        if new_position == self.servo_position:
+            self.current_reason = reason
+            self.active_rule = rule
+            return False
+        if self.log:
+            self.log(f"[{self._time_str(current_time)}] Adjusting vent: {self.servo_position}° -> {new_position}° (Reason: {reason})")
+        if self.actuator:
+            self.actuator(new_position)
+        self.servo_position = new_position
+        self.holding = None
+        self.actuation_count += 1
+        self.current_reason = reason
+        self.active_rule = rule
+        self.last_vent_change_time = current_time
+        return True
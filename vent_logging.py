@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Non-blocking logging for the smart air vent programs
+Logging calls only put the record on a bounded queue (dropping it if the
+queue is full), and a QueueListener thread does the slow part: writing to
+the console and to an optional rotating, gzip-compressed log file. A slow
+SSH session or journald can no longer stall the control loop.
+
+Each subsystem logs under its own "vent.<subsystem>" logger, so levels
+can be set per subsystem. Repeated warnings with the same message
+template (e.g. "Sensor read failed, attempt: %d") are rate limited.
+'''
+
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import time
+
+LOG_QUEUE_SIZE = 10000        # Records waiting for the writer thread before new ones are dropped
+LOG_MAX_BYTES = 1024 * 1024   # Rotate the log file at this size
+LOG_BACKUP_COUNT = 5          # Rotated files kept
+RATE_LIMIT_INTERVAL = 60      # Seconds per rate limit window
+RATE_LIMIT_BURST = 3          # Repeats of one warning template allowed per window
+
+CONSOLE_FORMAT = "[%(asctime)s] %(levelname)s %(name)s: %(message)s"
+CONSOLE_DATE_FORMAT = "%H:%M:%S"
+
+_listener = None
+
+def get_logger(subsystem):
+    '''Logger for one subsystem, e.g. get_logger("sensor") -> "vent.sensor"'''
+    return logging.getLogger(f"vent.{subsystem}")
+
+# ===== QUEUE HANDLER =====
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    '''QueueHandler that never blocks: records are dropped when the queue is full'''
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+# ===== RATE LIMITING =====
+class RateLimitFilter(logging.Filter):
+    '''Let at most `burst` records per message template through per interval
+
+    Only records at min_level or above are limited, so regular status
+    lines pass untouched. The first record after a suppressed run reports
+    how many were dropped.
+    '''
+
+    def __init__(self, interval=RATE_LIMIT_INTERVAL, burst=RATE_LIMIT_BURST, min_level=logging.WARNING):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.min_level = min_level
+        self.windows = {}  # (logger, template) -> [window start, count, suppressed]
+
+    def filter(self, record):
+        if record.levelno < self.min_level:
+            return True
+        now = time.monotonic()
+        key = (record.name, record.msg)
+        window = self.windows.get(key)
+        if window is None or now - window[0] >= self.interval:
+            suppressed = window[2] if window else 0
+            self.windows[key] = [now, 1, 0]
+            if suppressed:
+                record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+                record.args = None
+            return True
+        window[1] += 1
+        if window[1] <= self.burst:
+            return True
+        window[2] += 1
+        return False
+
+# ===== FORMATTING =====
+class JsonFormatter(logging.Formatter):
+    '''One JSON object per line for log files'''
+
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+# ===== FILE ROTATION =====
+def _gzip_namer(name):
+    return name + ".gz"
+
+def _gzip_rotator(source, dest):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+# ===== SETUP =====
+def setup_logging(log_file=None, level="INFO", levels=None, console=True, compress=True,
+                  file_format="json", max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT,
+                  rate_limit=True):
+    '''Route all "vent.*" loggers through a background writer thread
+
+    log_file: path of a rotating log file, None for console only
+    levels: per-subsystem levels, e.g. {"pubnub": "WARNING", "sensor": "DEBUG"}
+    compress: gzip rotated files
+    file_format: "json" (one object per line) or "text"
+    '''
+    global _listener
+    if _listener:
+        shutdown_logging()
+
+    handlers = []
+    if console:
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(logging.Formatter(CONSOLE_FORMAT, CONSOLE_DATE_FORMAT))
+        handlers.append(stream)
+    if log_file:
+        rotating = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        if compress:
+            rotating.namer = _gzip_namer
+            rotating.rotator = _gzip_rotator
+        if file_format == "json":
+            rotating.setFormatter(JsonFormatter())
+        else:
+            rotating.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(rotating)
+
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    if rate_limit:
+        queue_handler.addFilter(RateLimitFilter())
+
+    root = logging.getLogger("vent")
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.propagate = False
+    set_levels(level, levels)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return queue_handler
+
+def set_levels(level="INFO", levels=None):
+    '''Set the overall and per-subsystem levels (also while running)'''
+    logging.getLogger("vent").setLevel(level)
+    for subsystem, subsystem_level in (levels or {}).items():
+        get_logger(subsystem).setLevel(subsystem_level)
+
+def shutdown_logging():
+    '''Flush queued records and stop the writer thread'''
+    global _listener
+    if _listener:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
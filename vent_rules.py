@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+Data-driven vent decision rules (no hardware dependencies)
+The rules live in vent_rules.json: named thresholds, a default position,
+and rules with a name, a priority, conditions, a position and a reason
+template. load_rules() compiles them once into flat Python functions
+(highest priority first, one early return per rule): decide() with the
+signature of vent_control.decide_vent_position(), and decide_rule(), which
+also returns the name of the matched rule. Each decision then runs
+straight-line comparisons with no table lookups, and reasons are inline
+f-strings. Results for rules with a fixed reason are prebuilt tuples, so
+those decisions allocate nothing.
+
+Optional per-rule actuation policy, used by vent_control.VentController:
+  "dwell": 30                   seconds a position entered for this rule is
+                                held before another rule may move the vent
+  "hysteresis": {"temp_high": -1}
+                                threshold offsets applied while this rule
+                                holds the vent, so the reading has to come
+                                back past the threshold before it releases
+  "preempt": true               move even while another rule's dwell runs
+
+Conditions (all must hold):
+  "gas", "not motion"               boolean inputs: gas, motion
+  "temp > temp_high", "humidity < 30"
+      field (temp, humidity, no_motion_time) compared (> < >= <=) with a
+      threshold name or a number
+Reason templates may use {temp}, {humidity} and {no_motion_min}.
+
+Usage: python3 vent_rules.py [--source | --bench] [rules file]
+'''
+
+import json
+import math
+import os
+import random
+import string
+import sys
+import time
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vent_rules.json")
+
+# Condition field -> variable in the compiled function
+NUMERIC_FIELDS = {"temp": "temp", "humidity": "humidity", "no_motion_time": "no_motion_time"}
+BOOLEAN_FIELDS = {"motion": "motion_detected", "gas": "gas_detected"}
+OPERATORS = (">", "<", ">=", "<=")
+# Reason template field -> expression substituted for it
+TEMPLATE_FIELDS = {"temp": "temp", "humidity": "humidity", "no_motion_min": "int(no_motion_time // 60)"}
+RESERVED_NAMES = set(NUMERIC_FIELDS.values()) | set(BOOLEAN_FIELDS.values()) | {
+    "last_motion_time", "current_time"}
+
+DEFAULT_RULE = "normal"  # Rule name reported for the default position
+
+class RuleSet:
+    '''Compiled rules: decide()/decide_rule() plus the configuration they were built from'''
+
+    def __init__(self, thresholds, default, rules, source, decide, decide_rule):
+        self.thresholds = thresholds
+        self.default = default
+        self.rules = rules    # Sorted by priority, highest first
+        self.source = source  # Generated Python source of decide() and decide_rule()
+        self.decide = decide            # -> (position, reason)
+        self.decide_rule = decide_rule  # -> (position, reason, rule name)
+        self.dwell = {rule["name"]: rule.get("dwell", 0) for rule in rules}
+        self.hysteresis = {rule["name"]: rule["hysteresis"] for rule in rules if rule.get("hysteresis")}
+        self.preempt = {rule["name"] for rule in rules if rule.get("preempt")}
+
+def _check_number(value, what):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{what} must be a finite number")
+
+def _operand(token, thresholds):
+    if token in thresholds:
+        return token
+    try:
+        value = float(token)
+    except ValueError:
+        raise ValueError(f"unknown threshold: {token}")
+    if not math.isfinite(value):
+        raise ValueError(f"condition value must be finite: {token}")
+    return repr(value)
+
+def compile_condition(text, thresholds):
+    '''Turn one condition string into a Python expression'''
+    tokens = text.split()
+    if len(tokens) == 1 and tokens[0] in BOOLEAN_FIELDS:
+        return BOOLEAN_FIELDS[tokens[0]]
+    if len(tokens) == 2 and tokens[0] == "not" and tokens[1] in BOOLEAN_FIELDS:
+        return "not " + BOOLEAN_FIELDS[tokens[1]]
+    if len(tokens) == 3 and tokens[0] in NUMERIC_FIELDS and tokens[1] in OPERATORS:
+        return f"{NUMERIC_FIELDS[tokens[0]]} {tokens[1]} {_operand(tokens[2], thresholds)}"
+    raise ValueError(f"invalid condition: {text!r}")
+
+def _result(index, position, reason, constants, rule=None):
+    '''Return statement for a rule; fixed reasons become prebuilt constants
+
+    With a rule name the result carries it as a third value.
+    '''
+    parts = []
+    dynamic = False
+    for literal, field, spec, conversion in string.Formatter().parse(reason):
+        parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is None:
+            continue
+        if field not in TEMPLATE_FIELDS:
+            raise ValueError(f"unknown reason field: {field}")
+        if conversion or "{" in spec:
+            raise ValueError(f"unsupported reason format: {reason!r}")
+        parts.append("{" + TEMPLATE_FIELDS[field] + (":" + spec if spec else "") + "}")
+        dynamic = True
+    suffix = "" if rule is None else "_RULE"
+    if not dynamic:
+        constants[f"_RESULT{index}{suffix}"] = (int(position), reason) + (() if rule is None else (rule,))
+        return f"return _RESULT{index}{suffix}"
+    return f"return {int(position)}, f{''.join(parts)!r}" + ("" if rule is None else f", {rule!r}")
+
+def _check_policy(rule, thresholds):
+    '''Validate the optional dwell/hysteresis/preempt settings of a rule'''
+    dwell = rule.get("dwell", 0)
+    _check_number(dwell, "dwell")
+    if dwell < 0:
+        raise ValueError("dwell must be a non-negative number")
+    hysteresis = rule.get("hysteresis", {})
+    if not isinstance(hysteresis, dict):
+        raise ValueError("hysteresis must be an object of threshold: offset")
+    for name, offset in hysteresis.items():
+        if name not in thresholds:
+            raise ValueError(f"unknown hysteresis threshold: {name}")
+        _check_number(offset, f"hysteresis offset for {name}")
+    if not isinstance(rule.get("preempt", False), bool):
+        raise ValueError("preempt must be true or false")
+
+def _check_rule(rule):
+    '''Validate the position and reason template of a rule (or the default)'''
+    _check_number(rule["position"], "position")
+    if not isinstance(rule["reason"], str):
+        raise ValueError("reason must be a string")
+    if not isinstance(rule.get("name", DEFAULT_RULE), str):
+        raise ValueError("name must be a string")
+    _result(0, rule["position"], rule["reason"], {})  # Checks the reason template
+
+def _function(name, rules, default, params, constants, with_rule):
+    lines = [f"def {name}(temp, humidity, motion_detected, gas_detected, "
+             f"last_motion_time, current_time{params}):",
+             "    no_motion_time = current_time - last_motion_time"]
+    for index, rule in enumerate(rules):
+        lines.append(f"    if {' and '.join(rule['conditions'])}:  # {rule['name']!r}")
+        lines.append("        " + _result(index, rule["position"], rule["reason"], constants,
+                                          rule["name"] if with_rule else None))
+    lines.append("    " + _result("_DEFAULT", default["position"], default["reason"], constants,
+                                  default.get("name", DEFAULT_RULE) if with_rule else None))
+    return lines
+
+def compile_rules(config):
+    '''Build a RuleSet from a rules configuration dict, raise ValueError if it is invalid'''
+    if not isinstance(config, dict):
+        raise ValueError("rules configuration must be an object")
+    thresholds = config.get("thresholds", {})
+    if not isinstance(thresholds, dict):
+        raise ValueError("thresholds must be an object")
+    thresholds = dict(thresholds)
+    for name, value in thresholds.items():
+        if not isinstance(name, str) or not name.isidentifier() or name in RESERVED_NAMES:
+            raise ValueError(f"invalid threshold name: {name}")
+        _check_number(value, f"threshold {name}")
+    default = config.get("default", {"position": 90, "reason": "Normal ventilation"})
+    try:
+        if not isinstance(default, dict):
+            raise ValueError("must be an object")
+        _check_rule(default)
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"default: {e}")
+    rules = config.get("rules", [])
+    if not isinstance(rules, list):
+        raise ValueError("rules must be a list")
+    for index, rule in enumerate(rules):
+        if not isinstance(rule, dict):
+            raise ValueError(f"rules[{index}] must be an object")
+        try:
+            _check_number(rule.get("priority", 0), "priority")
+            if not isinstance(rule.get("name", ""), str):
+                raise ValueError("name must be a string")
+        except ValueError as e:
+            raise ValueError(f"rules[{index}]: {e}")
+    # sorted() is stable, so rules of equal priority keep their file order
+    rules = sorted(rules, key=lambda rule: -rule.get("priority", 0))
+
+    params = "".join(f", {name}={value!r}" for name, value in thresholds.items())
+    names = {default.get("name", DEFAULT_RULE)}
+    for index, rule in enumerate(rules):
+        rule = rules[index] = dict(rule, name=rule.get("name", f"rule {index}"))
+        try:
+            if rule["name"] in names:
+                raise ValueError("duplicate rule name")
+            names.add(rule["name"])
+            rule["conditions"] = [compile_condition(text, thresholds) for text in rule["when"]]
+            if not rule["conditions"]:
+                raise ValueError("no conditions")
+            _check_policy(rule, thresholds)
+            _check_rule(rule)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"rule {rule['name']}: {e}")
+    constants = {}
+    lines = (_function("decide_vent_position", rules, default, params, constants, False) + [""]
+             + _function("decide_vent_rule", rules, default, params, constants, True))
+    source = "\n".join(lines) + "\n"
+
+    namespace = dict(constants)
+    exec(compile(source, "<vent_rules>", "exec"), namespace)
+    decide = namespace["decide_vent_position"]
+    decide.__doc__ = "Decide vent position based on sensor data (thresholds can be overridden for tuning)"
+    decide_rule = namespace["decide_vent_rule"]
+    decide_rule.__doc__ = "Like decide_vent_position(), plus the name of the rule that matched"
+    return RuleSet(thresholds, default, rules, source, decide, decide_rule)
+
+def load_rules(path=RULES_FILE):
+    with open(path, encoding="utf-8") as f:
+        return compile_rules(json.load(f))
+
+# ===== BENCHMARK =====
+def benchmark(decide, count=200000, seed=1):
+    '''Mean cost of one decision (ns) over a spread of inputs hitting every rule'''
+    rng = random.Random(seed)
+    start = 1700000000.0
+    inputs = [(rng.choice((15, 20, 23.5, 28)), rng.choice((50, 75.0)), rng.random() < 0.5,
+               rng.random() < 0.05, start, start + rng.choice((10, 400)))
+              for _ in range(1024)]
+    calls = inputs * (count // len(inputs))
+    begin = time.perf_counter()
+    for args in calls:
+        decide(*args)
+    elapsed = time.perf_counter() - begin
+    return elapsed / len(calls) * 1e9
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    mode = args.pop(0) if args and args[0].startswith("--") else "--bench"
+    if mode not in ("--source", "--bench") or len(args) > 1:
+        print("Usage: " + __doc__.strip().split("Usage: ")[1])
+        sys.exit(1)
+    rules = load_rules(*args)
+    if mode == "--source":
+        print(rules.source)
+    else:
+        print(f"{len(rules.rules)} rules, {benchmark(rules.decide):.0f}ns per decision")
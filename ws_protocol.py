@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+'''
+ws_protocol.py - 基于标准库的最小WebSocket协议实现（RFC 6455）
+提供握手密钥计算、帧读取和帧编码，供舵机API服务器的实时控制通道使用
+'''
+
+import base64
+import hashlib
+import struct
+
+# 握手时使用的固定GUID
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# 帧操作码
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+# 单条消息最大长度（字节），舵机控制消息都很短
+MAX_MESSAGE_SIZE = 64 * 1024
+
+class WebSocketError(Exception):
+    '''协议错误，调用方应关闭连接'''
+
+# 计算握手响应头Sec-WebSocket-Accept
+def accept_key(key):
+    digest = hashlib.sha1((key.strip() + WS_GUID).encode()).digest()
+    return base64.b64encode(digest).decode()
+
+# 精确读取n个字节，连接关闭时返回None
+def _read_exact(rfile, n):
+    data = rfile.read(n)
+    if data is None or len(data) < n:
+        return None
+    return data
+
+# 用掩码还原客户端数据（整数异或，避免逐字节循环）
+def _unmask(data, mask):
+    n = len(data)
+    if n == 0:
+        return data
+    key = (mask * (n // 4 + 1))[:n]
+    return (int.from_bytes(data, 'big') ^ int.from_bytes(key, 'big')).to_bytes(n, 'big')
+
+# 读取一帧，返回(fin, opcode, payload)，连接关闭时返回None
+def read_frame(rfile):
+    header = _read_exact(rfile, 2)
+    if header is None:
+        return None
+    first, second = header
+    fin = bool(first & 0x80)
+    opcode = first & 0x0F
+    masked = bool(second & 0x80)
+    length = second & 0x7F
+
+    if length == 126:
+        ext = _read_exact(rfile, 2)
+        if ext is None:
+            return None
+        length = struct.unpack('!H', ext)[0]
+    elif length == 127:
+        ext = _read_exact(rfile, 8)
+        if ext is None:
+            return None
+        length = struct.unpack('!Q', ext)[0]
+
+    if length > MAX_MESSAGE_SIZE:
+        raise WebSocketError("消息过长")
+    if not masked:
+        raise WebSocketError("客户端帧必须带掩码")
+
+    mask = _read_exact(rfile, 4)
+    payload = _read_exact(rfile, length)
+    if mask is None or payload is None:
+        return None
+    return fin, opcode, _unmask(payload, mask)
+
+# 读取一条完整消息（合并分片），控制帧直接返回，连接关闭时返回None
+def read_message(rfile):
+    fragments = []
+    message_opcode = None
+    size = 0
+    while True:
+        frame = read_frame(rfile)
+        if frame is None:
+            return None
+        fin, opcode, payload = frame
+
+        if opcode >= OP_CLOSE:
+            # 控制帧可以插在分片之间，且本身不能分片
+            if not fin:
+                raise WebSocketError("控制帧不能分片")
+            return opcode, payload
+
+        if opcode == OP_CONTINUATION:
+            if message_opcode is None:
+                raise WebSocketError("意外的续帧")
+        else:
+            if message_opcode is not None:
+                raise WebSocketError("上一条消息尚未结束")
+            message_opcode = opcode
+
+        size += len(payload)
+        if size > MAX_MESSAGE_SIZE:
+            raise WebSocketError("消息过长")
+        fragments.append(payload)
+        if fin:
+            return message_opcode, b''.join(fragments)
+
+# 编码一帧（服务器发出的帧不带掩码）
+def encode_frame(opcode, payload=b''):
+    if isinstance(payload, str):
+        payload = payload.encode()
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x80 | opcode, length)
+    elif length < 65536:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+    return header + payload
+
+# 关闭帧的负载：状态码 + 原因
+def close_payload(code=1000, reason=''):
+    return struct.pack('!H', code) + reason.encode()[:123]